@@ -0,0 +1,42 @@
+"""
+自适应测试（提前停止）。
+
+每次提交一批答案后，按已作答题目计算各维度的累计得分：某维度至少作答 MIN_ITEMS 题，
+且平均得分强度（即 Result.confidence 中的置信度 |score| / 题数 / 2）达到 THRESHOLD，
+就认为该维度的归类已经确定，不再出这个维度的题。所有维度都确定（或题目用完）后直接出结果。
+
+结果仍由 scoring.score_answers 计算：score_detail 与 confidence 的格式与完整作答相同，
+只是提前停止的维度基于较少的题目。
+"""
+import numpy as np
+from django.conf import settings
+
+from .scoring import answers_to_row, score_matrix
+
+
+def _config():
+    return getattr(settings, "MBTI_ADAPTIVE", None) or {}
+
+
+def is_enabled():
+    return bool(_config().get("ENABLED"))
+
+
+def settled_dimensions(key, answers, min_items=None, threshold=None):
+    """返回与 DIMENSIONS 对齐的布尔数组，True 表示该维度已可提前停止。"""
+    config = _config()
+    min_items = config.get("MIN_ITEMS", 8) if min_items is None else min_items
+    threshold = config.get("THRESHOLD", 0.35) if threshold is None else threshold
+    scores, counts = score_matrix(key, answers_to_row(key, answers))
+    strength = np.abs(scores[0]) / np.maximum(counts[0], 1) / 2
+    return (counts[0] >= min_items) & (strength >= threshold)
+
+
+def remaining_questions(snapshot, answers):
+    """按问卷顺序返回仍需作答的题目：未作答且所属维度尚未确定；维度非法（不计分）的题目不再出。"""
+    settled = settled_dimensions(snapshot.key, answers)
+    open_ids = {
+        qid for qid, d in zip(snapshot.key.question_ids, snapshot.key.dim_index.tolist())
+        if not settled[d] and qid not in answers
+    }
+    return tuple(q for q in snapshot.questions if q.id in open_ids)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Questionnaire, Question, Response, Result, TypeProfile
+from django.utils.html import format_html_join
+
+from .models import Attempt, Questionnaire, Question, Response, Result, TypeProfile
 
 
 @admin.register(Questionnaire)
@@ -11,14 +13,53 @@ class QuestionnaireAdmin(admin.ModelAdmin):
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("text", "dimension", "keyed_pole", "weight", "order", "active", "questionnaire")
+    list_display = (
+        "text", "dimension", "keyed_pole", "weight", "order", "active", "questionnaire",
+        "item_mean", "item_variance", "item_total_r", "alpha_if_deleted",
+    )
     list_filter = ("dimension", "active")
     search_fields = ("text",)
     list_editable = ("keyed_pole", "weight", "order", "active")
+    # 项目分析结果（analyze_items 命令生成）随列表一次 JOIN 取出
+    list_select_related = ("questionnaire", "statistic")
+
+    @staticmethod
+    def _statistic(obj, field):
+        statistic = getattr(obj, "statistic", None)
+        value = getattr(statistic, field, None) if statistic else None
+        return "-" if value is None else f"{value:.2f}"
+
+    @admin.display(description="均值", ordering="statistic__mean")
+    def item_mean(self, obj):
+        return self._statistic(obj, "mean")
+
+    @admin.display(description="方差", ordering="statistic__variance")
+    def item_variance(self, obj):
+        return self._statistic(obj, "variance")
+
+    @admin.display(description="题总相关", ordering="statistic__item_total_r")
+    def item_total_r(self, obj):
+        return self._statistic(obj, "item_total_r")
+
+    @admin.display(description="删除后α", ordering="statistic__alpha_if_deleted")
+    def alpha_if_deleted(self, obj):
+        return self._statistic(obj, "alpha_if_deleted")
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """只读列表与详情：记录由提交流程写入，后台只用于查看（仍可删除）。"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Response)
-class ResponseAdmin(admin.ModelAdmin):
+class ResponseAdmin(ReadOnlyAdmin):
+    """旧版逐题作答：提交已改为只写 Attempt，这里只剩尚未迁移（backfill_attempts）的数据。"""
+
     list_display = ("user", "question", "choice", "questionnaire", "created_at")
     list_filter = ("questionnaire", "question__dimension")
     search_fields = ("user__username", "question__text")
@@ -31,6 +72,30 @@ class ResultAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "type_code")
 
 
+@admin.register(Attempt)
+class AttemptAdmin(ReadOnlyAdmin):
+    list_display = ("user", "type_code", "answered", "questionnaire", "created_at")
+    list_filter = ("questionnaire",)
+    search_fields = ("user__username", "type_code")
+    list_select_related = ("user", "questionnaire")
+    readonly_fields = (
+        "user", "questionnaire", "version", "answered", "type_code", "score_detail", "confidence", "created_at",
+        "answer_sheet",
+    )
+    exclude = ("answers",)
+
+    @admin.display(description="答卷")
+    def answer_sheet(self, obj):
+        # 解码打包的答卷，按题目顺序逐题列出（取代原先逐题的作答列表）
+        answers = obj.answer_map()
+        questions = Question.objects.in_bulk(list(answers))
+        rows = []
+        for number, (qid, choice) in enumerate(answers.items(), start=1):
+            question = questions.get(qid)
+            rows.append((number, question.dimension if question else "-", question.text if question else f"#{qid}", choice))
+        return format_html_join("", "<div>{}. [{}] {} — {}</div>", rows)
+
+
 @admin.register(TypeProfile)
 class TypeProfileAdmin(admin.ModelAdmin):
     list_display = ("code", "name")
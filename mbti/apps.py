@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class MbtiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'mbti'
\ No newline at end of file
+    name = 'mbti'
+
+    def ready(self):
+        from . import signals  # noqa: F401
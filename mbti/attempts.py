@@ -0,0 +1,147 @@
+"""
+作答记录（Attempt）的写入与批量读取。
+
+每次提交在同一事务内新增一行 Attempt：整张答卷按问卷版本的题目顺序打包为每题 4 位的字节串
+（80 题只占 40 字节），题目顺序只在 QuestionnaireVersion 中保存一份。提交不再写逐题的 Response 行；
+读取一个用户的作答只需取一行，批量任务（重算、项目分析、导出）按用户取最近一次作答解码，
+尚未迁移的老数据（见 ``backfill_attempts`` 命令）回退到 Response 行。
+"""
+from django.db import transaction
+
+from .models import Attempt, QuestionnaireVersion, Response
+from .scoring import MISSING, pack_answers, unpack_answers
+
+# 问卷版本行创建后不再修改，可以放心地在进程内缓存
+_version_ids = {}    # version -> pk
+_question_ids = {}   # pk -> (question_id, ...)
+
+
+def version_id(version, questionnaire_id, question_ids):
+    """返回问卷版本行的主键，不存在时创建；事务提交后才写入进程缓存，避免缓存回滚掉的行。"""
+    pk = _version_ids.get(version)
+    if pk is not None:
+        return pk
+    row, _ = QuestionnaireVersion.objects.get_or_create(
+        version=version, defaults={"questionnaire_id": questionnaire_id, "question_ids": list(question_ids)},
+    )
+    transaction.on_commit(lambda: _version_ids.setdefault(version, row.pk))
+    return row.pk
+
+
+def build_attempt(user_id, questionnaire_id, version_pk, question_ids, answers, type_code, score_detail, confidence):
+    """按题目顺序打包 {question_id: choice}，返回未保存的 Attempt。"""
+    choices = [answers.get(qid, MISSING) for qid in question_ids]
+    return Attempt(
+        user_id=user_id,
+        questionnaire_id=questionnaire_id,
+        version_id=version_pk,
+        answers=pack_answers(choices),
+        answered=sum(1 for choice in choices if choice != MISSING),
+        type_code=type_code,
+        score_detail=score_detail,
+        confidence=confidence,
+    )
+
+
+def record_attempt(user_id, snapshot, answers, type_code, score_detail, confidence):
+    """在当前事务中记录一次按快照题目顺序打包的作答。"""
+    version_pk = version_id(snapshot.version, snapshot.questionnaire_id, snapshot.question_ids)
+    attempt = build_attempt(
+        user_id, snapshot.questionnaire_id, version_pk, snapshot.question_ids,
+        answers, type_code, score_detail, confidence,
+    )
+    attempt.save(force_insert=True)
+    return attempt
+
+
+def _question_order(version_pks):
+    missing = [pk for pk in version_pks if pk not in _question_ids]
+    if missing:
+        for pk, question_ids in QuestionnaireVersion.objects.filter(pk__in=missing).values_list("pk", "question_ids"):
+            _question_ids[pk] = tuple(question_ids)
+    return _question_ids
+
+
+def decode_answers(version_pk, data):
+    """逐个产出一条作答记录中已作答的 (question_id, choice)，按题目顺序。"""
+    question_ids = _question_order({version_pk})[version_pk]
+    for qid, choice in zip(question_ids, unpack_answers(data, len(question_ids)).tolist()):
+        if choice != MISSING:
+            yield qid, choice
+
+
+def _latest_answered(user_id):
+    return Attempt.objects.filter(user_id=user_id).order_by("-created_at", "-id").values_list("answered", flat=True)
+
+
+def answered_count(user_id):
+    """用户最近一次作答的已答题数；没有作答记录时回退到 Response 行数。"""
+    answered = _latest_answered(user_id).first()
+    return answered if answered is not None else Response.objects.filter(user_id=user_id).count()
+
+
+async def aanswered_count(user_id):
+    """answered_count() 的异步版本。"""
+    answered = await _latest_answered(user_id).afirst()
+    return answered if answered is not None else await Response.objects.filter(user_id=user_id).acount()
+
+
+def _latest_attempts(user_ids):
+    """{user_id: (version_pk, data)}：每个用户最近一次的作答记录。"""
+    latest = {}
+    attempts = (
+        Attempt.objects.filter(user_id__in=user_ids)
+        .order_by("user_id", "-created_at", "-id")
+        .values_list("user_id", "version_id", "answers")
+    )
+    for user_id, version_pk, data in attempts.iterator(chunk_size=2000):
+        latest.setdefault(user_id, (version_pk, data))
+    _question_order({version_pk for version_pk, _ in latest.values()})
+    return latest
+
+
+def _legacy_responses(user_ids):
+    return (
+        Response.objects.filter(user_id__in=user_ids)
+        .values_list("user_id", "question_id", "choice")
+        .iterator(chunk_size=10000)
+    )
+
+
+def latest_answers(user_ids):
+    """
+    逐条产出 (user_id, question_id, choice)：每个用户取最近一次作答解码；
+    没有作答记录的用户回退到 Response 行。
+    """
+    user_ids = list(user_ids)
+    latest = _latest_attempts(user_ids)
+    for user_id, (version_pk, data) in latest.items():
+        for qid, choice in decode_answers(version_pk, data):
+            yield user_id, qid, choice
+
+    rest = [user_id for user_id in user_ids if user_id not in latest]
+    if rest:
+        yield from _legacy_responses(rest)
+
+
+def latest_sheets(user_ids):
+    """
+    逐个产出 (user_id, question_ids, choices)：每个用户最近一次作答的整张答卷。
+
+    question_ids 为作答时的题目顺序（问卷版本），choices 与之等长，未作答为 MISSING；
+    没有作答记录的用户回退到 Response 行（按题目 id 排序），两者都没有的用户不产出。
+    """
+    user_ids = list(user_ids)
+    latest = _latest_attempts(user_ids)
+    for user_id, (version_pk, data) in latest.items():
+        question_ids = _question_ids[version_pk]
+        yield user_id, question_ids, unpack_answers(data, len(question_ids)).tolist()
+
+    rest = [user_id for user_id in user_ids if user_id not in latest]
+    if rest:
+        legacy = {}
+        for user_id, qid, choice in _legacy_responses(rest):
+            legacy.setdefault(user_id, {})[qid] = choice
+        for user_id, answers in legacy.items():
+            question_ids = tuple(sorted(answers))
+            yield user_id, question_ids, [answers[qid] for qid in question_ids]
@@ -0,0 +1,205 @@
+"""
+作答与结果数据的流式导出（``export_data`` 命令与管理员下载接口共用）。
+
+按主键分块读取：每块是一条 "pk > 上一块末尾 ORDER BY pk LIMIT n" 的独立查询，逐行编码为
+CSV 或 JSON Lines，可选 gzip 压缩后逐段输出。任何时刻只持有一个块的数据，内存占用与总行数无关；
+块与块之间不保留游标，SQLite 的读锁在每条查询结束后即释放，导出期间不会阻塞正常的答题写入。
+
+作答（responses）取每个用户最近一次的作答记录（Attempt）逐题展开，每题一行；
+尚未迁移到 Attempt 的用户输出其旧的 Response 行。
+"""
+import csv
+import datetime
+import json
+import zlib
+from dataclasses import dataclass
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .attempts import decode_answers
+from .models import Attempt, Questionnaire, Response, Result
+from .scoring import DIMENSIONS
+
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson; charset=utf-8"}
+CHUNK_SIZE = 2000
+# 编码后的文本攒到这个大小再输出，避免逐行产生大量细小的写操作
+BUFFER_SIZE = 64 * 1024
+
+
+def _localtime(value):
+    return timezone.localtime(value).isoformat() if value is not None else None
+
+
+def _pk_chunks(queryset, chunk_size):
+    """按主键分块产出 values_list 行的列表；queryset 的第一个字段必须是主键。"""
+    queryset = queryset.order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        yield chunk
+
+
+def latest_attempts(filters=None):
+    """符合条件且是该用户最近一次的作答记录。"""
+    newer = Attempt.objects.filter(user_id=OuterRef("user_id")).filter(
+        Q(created_at__gt=OuterRef("created_at")) | Q(created_at=OuterRef("created_at"), pk__gt=OuterRef("pk"))
+    )
+    return Attempt.objects.filter(**(filters or {})).filter(~Exists(newer))
+
+
+def legacy_responses(filters=None):
+    """尚未迁移到 Attempt 的用户留下的 Response 行。"""
+    migrated = Attempt.objects.filter(user_id=OuterRef("user_id"))
+    return Response.objects.filter(**(filters or {})).filter(~Exists(migrated))
+
+
+def _response_rows(filters, chunk_size):
+    attempts = latest_attempts(filters).values_list(
+        "id", "user_id", "questionnaire_id", "version_id", "answers", "created_at",
+    )
+    for chunk in _pk_chunks(attempts, chunk_size):
+        for pk, user_id, qnn_id, version_pk, data, created_at in chunk:
+            created_at = _localtime(created_at)
+            for qid, choice in decode_answers(version_pk, data):
+                yield pk, user_id, qnn_id, qid, choice, created_at
+
+    # 旧数据没有作答记录编号，attempt_id 列留空
+    responses = legacy_responses(filters).values_list(
+        "id", "user_id", "questionnaire_id", "question_id", "choice", "created_at",
+    )
+    for chunk in _pk_chunks(responses, chunk_size):
+        for _, user_id, qnn_id, qid, choice, created_at in chunk:
+            yield None, user_id, qnn_id, qid, choice, _localtime(created_at)
+
+
+def _result_rows(filters, chunk_size):
+    results = Result.objects.filter(**filters).values_list(
+        "id", "user_id", "questionnaire_id", "type_code", "score_detail", "confidence", "created_at",
+    )
+    for chunk in _pk_chunks(results, chunk_size):
+        for pk, user_id, qnn_id, code, detail, confidence, created_at in chunk:
+            detail, confidence = detail or {}, confidence or {}
+            yield (
+                pk, user_id, qnn_id, code,
+                *(detail.get(dim) for dim in DIMENSIONS),
+                *(confidence.get(dim) for dim in DIMENSIONS),
+                _localtime(created_at),
+            )
+
+
+@dataclass(frozen=True)
+class ExportKind:
+    columns: tuple  # 输出列名
+    rows: object    # rows(filters, chunk_size) 逐行产出输出行
+
+
+EXPORT_KINDS = {
+    "responses": ExportKind(
+        columns=("attempt_id", "user_id", "questionnaire_id", "question_id", "choice", "created_at"),
+        rows=_response_rows,
+    ),
+    "results": ExportKind(
+        columns=(
+            "id", "user_id", "questionnaire_id", "type_code",
+            *(f"score_{dim}" for dim in DIMENSIONS),
+            *(f"confidence_{dim}" for dim in DIMENSIONS),
+            "created_at",
+        ),
+        rows=_result_rows,
+    ),
+}
+
+
+def build_filters(questionnaire=None, since=None, until=None):
+    """
+    把导出条件转换为 ORM 过滤参数。
+
+    questionnaire 可以是问卷 id 或 key；since/until 为 YYYY-MM-DD，按本地时区的自然日计算，两端都包含。
+    条件不合法时抛出 ValueError。
+    """
+    filters = {}
+    if questionnaire:
+        lookup = {"pk": int(questionnaire)} if str(questionnaire).isdigit() else {"key": questionnaire}
+        qnn_id = Questionnaire.objects.filter(**lookup).values_list("id", flat=True).first()
+        if qnn_id is None:
+            raise ValueError(f"Unknown questionnaire: {questionnaire}")
+        filters["questionnaire_id"] = qnn_id
+    if since:
+        filters["created_at__gte"] = day_start(since)
+    if until:
+        filters["created_at__lt"] = day_start(until, days=1)
+    return filters
+
+
+def day_start(value, days=0):
+    """YYYY-MM-DD 当天（或其后第 days 天）本地时区零点的时间戳。"""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+    start = datetime.datetime.combine(day + datetime.timedelta(days=days), datetime.time.min)
+    return timezone.make_aware(start)
+
+
+def iter_rows(kind, filters=None, chunk_size=CHUNK_SIZE):
+    """按主键分块逐行产出输出行。"""
+    return EXPORT_KINDS[kind].rows(filters or {}, chunk_size)
+
+
+class _Echo:
+    """csv.writer 的写入目标：直接返回格式化好的一行。"""
+
+    def write(self, value):
+        return value
+
+
+def encode(kind, fmt, rows):
+    """把输出行编码为 UTF-8 字节块（含表头），每块约 BUFFER_SIZE 字节。"""
+    columns = EXPORT_KINDS[kind].columns
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        lines = (writer.writerow(row) for row in rows)
+        header = writer.writerow(columns)
+    elif fmt == "jsonl":
+        lines = (json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+        header = ""
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    buffer, size = [header], len(header)
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    """增量 gzip 压缩字节块（wbits=31 输出带 gzip 头的流，可直接 gunzip）。"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(kind, fmt="csv", compress=False, filters=None, chunk_size=CHUNK_SIZE):
+    chunks = encode(kind, fmt, iter_rows(kind, filters, chunk_size))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(kind, fmt, compress=False):
+    stamp = timezone.localtime().strftime("%Y%m%d")
+    return f"mbti_{kind}_{stamp}.{fmt}" + (".gz" if compress else "")
@@ -0,0 +1,100 @@
+"""
+PDF 中文字体注册表。
+
+字体文件动辄数 MB，解析一次即可：首次生成报告时按顺序探测
+settings.PDF_FONT_PATH、各平台常见中文字体与项目内置字体，注册成功后整个进程复用，
+之后所有报告代码通过 get_pdf_font() 取得已注册的字体名。
+"""
+import os
+import sys
+import threading
+
+from django.conf import settings
+
+# 常见平台字体路径（包含 Windows、Linux(Ubuntu) 与 macOS）
+WINDOWS_CANDIDATES = [
+    r'C:\Windows\Fonts\msyh.ttf',  # 微软雅黑 (TTF)
+    r'C:\Windows\Fonts\msyh.ttc',  # 微软雅黑 (TTC)
+    r'C:\Windows\Fonts\simhei.ttf',  # 黑体
+    r'C:\Windows\Fonts\simsun.ttc',  # 宋体（可能不被TTFont识别）
+    r'C:\Windows\Fonts\simsun.ttf',  # 宋体 (TTF)
+    r'C:\Windows\Fonts\NSimSun.ttf',  # 新宋体
+    r'C:\Windows\Fonts\SIMKAI.TTF',  # 楷体
+]
+
+# Linux 常见中文字体（优先使用 Noto/思源系列，ReportLab 对 OTF/TTF支持更稳定）
+LINUX_CANDIDATES = [
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJKsc-Regular.otf',
+    '/usr/share/fonts/noto-cjk/NotoSansCJKsc-Regular.otf',
+    '/usr/share/fonts/noto/NotoSansCJKsc-Regular.otf',
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/truetype/arphic/ukai.ttf',
+    '/usr/share/fonts/truetype/arphic/uming.ttf',
+]
+
+# macOS 常见中文字体
+MAC_CANDIDATES = [
+    '/System/Library/Fonts/PingFang.ttc',
+    '/System/Library/Fonts/STSong.ttf',
+    '/Library/Fonts/Songti.ttc',
+    '/Library/Fonts/Heiti.ttc',
+]
+
+# 项目内置字体（如存在）：static/fonts/NotoSansCJKsc-Regular.otf
+PROJECT_FONT = os.path.join(settings.BASE_DIR, 'static', 'fonts', 'NotoSansCJKsc-Regular.otf')
+
+FALLBACK_FONT = 'Helvetica'
+CID_FONT = 'STSong-Light'
+
+_lock = threading.Lock()
+_font_name = None
+
+
+def candidate_paths():
+    """按优先级返回候选字体路径；显式配置的 PDF_FONT_PATH 最优先。"""
+    paths = []
+    configured = getattr(settings, 'PDF_FONT_PATH', None)
+    if configured:
+        paths.append(str(configured))
+    paths.extend(WINDOWS_CANDIDATES)
+    if sys.platform.startswith('linux'):
+        paths.extend(LINUX_CANDIDATES)
+    elif sys.platform == 'darwin':
+        paths.extend(MAC_CANDIDATES)
+    paths.append(PROJECT_FONT)
+    # 去重并保持顺序（默认的 PDF_FONT_PATH 与 Windows 候选重复）
+    return list(dict.fromkeys(paths))
+
+
+def _register():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+    for font_path in candidate_paths():
+        try:
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont('CN', font_path))
+                return 'CN'
+        except Exception:
+            # 某些 .ttc 字体包不被 TTFont 支持，继续尝试下一个
+            continue
+    # 若仍未找到可用 TTF/TTC，尝试使用内置的 CJK 字体（不需外部文件）
+    try:
+        pdfmetrics.registerFont(UnicodeCIDFont(CID_FONT))
+        return CID_FONT
+    except Exception:
+        # 字体注册失败时退回默认英文字体（中文可能出现方块）
+        return FALLBACK_FONT
+
+
+def get_pdf_font():
+    """返回已注册的中文字体名；每个进程只在首次调用时探测并解析字体文件。"""
+    global _font_name
+    if _font_name is None:
+        with _lock:
+            if _font_name is None:
+                _font_name = _register()
+    return _font_name
@@ -0,0 +1,122 @@
+"""
+题库的项目分析（item analysis）。
+
+对全部作答矩阵做批量的数组计算：每题的均值与方差、同维度内的校正题总相关
+（该题与同维度其余题目之和的相关系数）、各维度的 Cronbach's alpha 以及"删除该题后的 alpha"。
+
+计算是可合并的：每个数据块只产生充分统计量（计数、和、平方和，以及每个维度的
+叉积矩阵 XᵀX），块与块之间直接相加，最后一次性求出指标。内存只与题目数有关，
+与作答人数无关，可以分块扫描任意规模的作答数据。
+
+相关与 alpha 使用按 keyed_pole 定向后的得分 (choice - 3) * direction，不乘 weight，
+这样方向设错的题目会表现为负的题总相关。
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .scoring import DIMENSIONS, LIKERT_MIDPOINT, MISSING
+
+
+@dataclass
+class _DimensionMoments:
+    columns: np.ndarray  # 该维度的题目在答卷矩阵中的列下标
+    n: int
+    sums: np.ndarray     # (k,) 完整作答者的定向得分之和
+    cross: np.ndarray    # (k, k) 定向得分的叉积矩阵
+
+
+class ItemAccumulator:
+    """项目分析的充分统计量；update() 累加一个答卷矩阵块，merge() 合并另一个累加器。"""
+
+    def __init__(self, key):
+        self.key = key
+        n = len(key)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.sum = np.zeros(n, dtype=np.float64)
+        self.sumsq = np.zeros(n, dtype=np.float64)
+        self.dimensions = {}
+        for d, dim in enumerate(DIMENSIONS):
+            columns = np.flatnonzero(key.dim_index == d)
+            k = len(columns)
+            self.dimensions[dim] = _DimensionMoments(columns, 0, np.zeros(k), np.zeros((k, k)))
+
+    def update(self, matrix):
+        """累加一个 (m, n) 答卷矩阵块，列顺序同计分键，未作答为 MISSING。"""
+        matrix = np.asarray(matrix)
+        if matrix.size == 0:
+            return self
+        answered = matrix != MISSING
+        values = np.where(answered, matrix, 0).astype(np.float64)
+        self.count += answered.sum(axis=0)
+        self.sum += values.sum(axis=0)
+        self.sumsq += (values * values).sum(axis=0)
+
+        keyed = np.where(answered, (values - LIKERT_MIDPOINT) * self.key.direction, 0.0)
+        for moments in self.dimensions.values():
+            if not len(moments.columns):
+                continue
+            # 相关与 alpha 只用该维度全部作答的完整样本
+            complete = answered[:, moments.columns].all(axis=1)
+            block = keyed[np.ix_(complete, moments.columns)]
+            moments.n += len(block)
+            moments.sums += block.sum(axis=0)
+            moments.cross += block.T @ block
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        for dim, moments in self.dimensions.items():
+            theirs = other.dimensions[dim]
+            moments.n += theirs.n
+            moments.sums += theirs.sums
+            moments.cross += theirs.cross
+        return self
+
+    def results(self):
+        """
+        返回 (items, alphas)。
+
+        items: {question_id: {"responses", "mean", "variance", "item_total_r", "alpha_if_deleted", "dimension_alpha"}}
+        alphas: {dimension: alpha}；样本或题目不足时对应指标为 None。
+        """
+        items, alphas = {}, {}
+        for i, qid in enumerate(self.key.question_ids):
+            n = int(self.count[i])
+            mean = self.sum[i] / n if n else None
+            variance = (self.sumsq[i] - self.sum[i] * mean) / (n - 1) if n > 1 else None
+            items[qid] = {
+                "responses": n, "mean": mean, "variance": variance,
+                "item_total_r": None, "alpha_if_deleted": None, "dimension_alpha": None,
+            }
+
+        for dim, moments in self.dimensions.items():
+            k, n = len(moments.columns), moments.n
+            if k == 0 or n < 2:
+                alphas[dim] = None
+                continue
+            cov = (moments.cross - np.outer(moments.sums, moments.sums) / n) / (n - 1)
+            item_var = np.diag(cov)
+            row_sums = cov.sum(axis=1)
+            total_var = row_sums.sum()
+            alpha = _alpha(k, item_var.sum(), total_var)
+            alphas[dim] = alpha
+
+            # 去掉第 i 题后：总分方差 = total - 2 * Σ_j C_ij + C_ii，与其余题之和的协方差 = Σ_j C_ij - C_ii
+            rest_var = total_var - 2 * row_sums + item_var
+            rest_cov = row_sums - item_var
+            for j, column in enumerate(moments.columns):
+                denominator = np.sqrt(item_var[j] * rest_var[j])
+                item = items[self.key.question_ids[column]]
+                item["item_total_r"] = float(rest_cov[j] / denominator) if denominator > 0 else None
+                item["alpha_if_deleted"] = _alpha(k - 1, item_var.sum() - item_var[j], rest_var[j])
+                item["dimension_alpha"] = alpha
+        return items, alphas
+
+
+def _alpha(k, item_variance_sum, total_variance):
+    if k < 2 or total_variance <= 0:
+        return None
+    return float(k / (k - 1) * (1 - item_variance_sum / total_variance))
@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mbti.attempts import latest_answers
+from mbti.item_analysis import ItemAccumulator
+from mbti.models import ItemStatistic, Question, Questionnaire, Result
+from mbti.scoring import DIMENSIONS, compile_questions, fill_matrix
+
+FIELDS = ["responses", "mean", "variance", "item_total_r", "alpha_if_deleted", "dimension_alpha"]
+
+
+class Command(BaseCommand):
+    help = "Compute item means/variances, corrected item-total correlations and Cronbach's alpha per dimension"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questionnaire", help="Questionnaire id or key (defaults to the active one)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Respondents loaded per batch")
+        parser.add_argument("--flag-below", type=float, default=0.2, help="Report items whose item-total r is below this")
+        parser.add_argument("--dry-run", action="store_true", help="Print the report without saving ItemStatistic rows")
+
+    def handle(self, *args, **options):
+        qnn_id = self._questionnaire(options["questionnaire"])
+        questions = Question.objects.filter(active=True)
+        if qnn_id is not None:
+            questions = questions.filter(questionnaire_id=qnn_id)
+        key = compile_questions(
+            questions.order_by("order", "id").values_list("id", "dimension", "keyed_pole", "weight")
+        )
+        if not len(key):
+            raise CommandError("No active questions to analyze")
+
+        total = ItemAccumulator(key)
+        respondents = Result.objects.order_by("pk").values_list("pk", "user_id")
+        if qnn_id is not None:
+            respondents = respondents.filter(questionnaire_id=qnn_id)
+        chunk_size = max(1, options["chunk_size"])
+        scanned = last_pk = 0
+
+        while True:
+            chunk = list(respondents.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            scanned += len(chunk)
+            rows = {user_id: i for i, (_, user_id) in enumerate(chunk)}
+            # 每块单独求充分统计量再合并，内存只与题目数和块大小有关
+            total.merge(ItemAccumulator(key).update(fill_matrix(key, rows, latest_answers(rows.keys()))))
+            self.stdout.write(f"Scanned {scanned} respondents")
+
+        items, alphas = total.results()
+        self._report(key, items, alphas, options["flag_below"])
+
+        if options["dry_run"]:
+            return
+        ItemStatistic.objects.bulk_create(
+            [ItemStatistic(question_id=qid, **{name: stats[name] for name in FIELDS}) for qid, stats in items.items()],
+            update_conflicts=True,
+            unique_fields=["question"],
+            update_fields=FIELDS + ["computed_at"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Saved statistics for {len(items)} questions from {scanned} respondents."))
+
+    @staticmethod
+    def _questionnaire(value):
+        if not value:
+            return Questionnaire.objects.filter(is_active=True).values_list("id", flat=True).first()
+        lookup = {"pk": int(value)} if value.isdigit() else {"key": value}
+        qnn_id = Questionnaire.objects.filter(**lookup).values_list("id", flat=True).first()
+        if qnn_id is None:
+            raise CommandError(f"Unknown questionnaire: {value}")
+        return qnn_id
+
+    def _report(self, key, items, alphas, threshold):
+        for dim in DIMENSIONS:
+            alpha = alphas.get(dim)
+            self.stdout.write(f"{dim}: alpha={'n/a' if alpha is None else f'{alpha:.3f}'}")
+        flagged = [
+            (qid, stats) for qid, stats in items.items()
+            if stats["item_total_r"] is not None and stats["item_total_r"] < threshold
+        ]
+        if not flagged:
+            return
+        positions = key.positions
+        self.stdout.write(self.style.WARNING(f"{len(flagged)} items with item-total r < {threshold}:"))
+        for qid, stats in sorted(flagged, key=lambda item: item[1]["item_total_r"]):
+            dim = DIMENSIONS[key.dim_index[positions[qid]]]
+            alpha = stats["alpha_if_deleted"]
+            self.stdout.write(
+                f"  question {qid} ({dim}): r={stats['item_total_r']:.3f}, "
+                f"alpha if deleted={'n/a' if alpha is None else f'{alpha:.3f}'}"
+            )
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mbti.attempts import build_attempt, version_id
+from mbti.models import Attempt, Question, Response, Result
+from mbti.snapshot import compute_version
+
+
+class Command(BaseCommand):
+    help = "Create one packed Attempt per existing Result from its per-question Response rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Results migrated per transaction")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the results without an attempt")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        pending = Result.objects.exclude(user__attempts__isnull=False)
+        if options["dry_run"]:
+            self.stdout.write(f"Would create attempts for {pending.count()} results.")
+            return
+
+        orders = {}
+        created = last_pk = 0
+        rows = pending.order_by("pk").values_list(
+            "pk", "user_id", "questionnaire_id", "type_code", "score_detail", "confidence", "created_at"
+        )
+        while True:
+            chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+
+            answers = {}
+            for user_id, question_id, choice in Response.objects.filter(
+                user_id__in=[row[1] for row in chunk]
+            ).values_list("user_id", "question_id", "choice").iterator(chunk_size=10000):
+                answers.setdefault(user_id, {})[question_id] = choice
+
+            with transaction.atomic():
+                attempts = []
+                for _, user_id, qnn_id, type_code, score_detail, confidence, created_at in chunk:
+                    if qnn_id not in orders:
+                        orders[qnn_id] = self._order(qnn_id)
+                    version_pk, question_ids = orders[qnn_id]
+                    attempt = build_attempt(
+                        user_id, qnn_id, version_pk, question_ids,
+                        answers.get(user_id, {}), type_code, score_detail, confidence,
+                    )
+                    attempt.created_at = created_at
+                    attempts.append(attempt)
+                Attempt.objects.bulk_create(attempts)
+            created += len(attempts)
+            self.stdout.write(f"Created {created} attempts")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {created} attempts."))
+
+    @staticmethod
+    def _order(qnn_id):
+        # 与问卷快照相同的题目顺序与版本号，迁移出的答卷与新提交的答卷可以互相比较
+        questions = Question.objects.filter(active=True)
+        if qnn_id is not None:
+            questions = questions.filter(questionnaire_id=qnn_id)
+        rows = list(questions.order_by("order", "id").values_list("id", "dimension", "keyed_pole", "weight"))
+        question_ids = [row[0] for row in rows]
+        with transaction.atomic():
+            return version_id(compute_version(qnn_id, rows), qnn_id, question_ids), question_ids
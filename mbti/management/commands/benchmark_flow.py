@@ -0,0 +1,276 @@
+import asyncio
+import io
+import json
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from mbti.middleware import count_queries
+from mbti.models import Question, Questionnaire
+from mbti.snapshot import PER_PAGE
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class EndpointStats:
+    """线程安全地收集每个端点的耗时、SQL 数与错误数。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, queries, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.queries[name].append(queries)
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, wall_seconds):
+        endpoints = {}
+        for name, values in self.latencies.items():
+            ordered = sorted(values)
+            queries = self.queries[name]
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else None,
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                "queries_mean": round(sum(queries) / len(queries), 2),
+                "queries_max": max(queries),
+            }
+        return endpoints
+
+
+def percentile(ordered, pct):
+    """最近秩法百分位数；ordered 必须已排序。"""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Command(BaseCommand):
+    help = "Simulate concurrent users taking the MBTI test end to end and report latency, throughput and SQL counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode", choices=("wsgi", "asgi"), default="wsgi",
+            help="wsgi: one thread per user with the test Client; asgi: one coroutine per user with AsyncClient",
+        )
+        parser.add_argument("--users", type=int, default=20, help="Synthetic users to run through the flow")
+        parser.add_argument("--concurrency", type=int, default=4, help="Users running at the same time")
+        parser.add_argument("--autosave-every", type=int, default=5, help="Answers between save-progress posts")
+        parser.add_argument("--no-pdf", action="store_true", help="Skip the PDF download step")
+        parser.add_argument("--real-hashers", action="store_true", help="Keep the configured password hashers")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic answers")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng_lock = threading.Lock()
+        self.rng = random.Random(options["seed"])
+        self.stats = EndpointStats()
+
+        workdir = tempfile.TemporaryDirectory(prefix="mbti-bench-")
+        overrides = {"MBTI_PDF_CACHE": dict(settings.MBTI_PDF_CACHE or {}, LOCATION=Path(workdir.name) / "pdf")}
+        if not settings.MBTI_PDF_CACHE:
+            overrides["MBTI_PDF_CACHE"] = None
+        if not options["real_hashers"]:
+            overrides["PASSWORD_HASHERS"] = FAST_HASHERS
+
+        # 使用独立的临时 SQLite 文件库（而非内存库），多线程可以共享并真实地竞争写锁
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = str(Path(workdir.name) / "bench.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**overrides):
+                self._seed_questions()
+                started = time.perf_counter()
+                if options["mode"] == "asgi":
+                    asyncio.run(self._run_async())
+                else:
+                    with ThreadPoolExecutor(max_workers=max(1, options["concurrency"])) as pool:
+                        list(pool.map(self._run_user, range(options["users"])))
+                wall = time.perf_counter() - started
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            workdir.cleanup()
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "mode": options["mode"],
+                "async_views": bool((getattr(settings, "MBTI_ASYNC_VIEWS", None) or {}).get("ENABLED")),
+                "users": options["users"],
+                "concurrency": options["concurrency"],
+                "questions": self.question_count,
+                "wall_seconds": round(wall, 3),
+                "journeys_per_second": round(options["users"] / wall, 3) if wall else None,
+            },
+            "endpoints": self.stats.summary(wall),
+        }
+        self._print_table(report)
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(payload, encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    def _seed_questions(self):
+        # 与生产环境相同的导入路径：校验 CSV 后批量写入并激活问卷
+        call_command("import_questions", key="bench", name="benchmark", stdout=io.StringIO())
+        qnn = Questionnaire.objects.get(key="bench")
+        self.question_ids = list(
+            Question.objects.filter(questionnaire=qnn, active=True).order_by("order", "id").values_list("id", flat=True)
+        )
+        self.question_count = len(self.question_ids)
+
+    def _request(self, client, name, method, path, kwargs):
+        # count_queries 同时统计视图在其他线程（sync_to_async）中执行的 SQL
+        with count_queries() as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        self.stats.record(name, elapsed, queries.count, response.status_code < 400)
+        return response
+
+    async def _arequest(self, client, name, method, path, kwargs):
+        # 与 ASGIHandler 相同：每个请求的同步代码在自己的线程中执行，结束时关闭该线程的数据库连接
+        async with ThreadSensitiveContext():
+            with count_queries() as queries:
+                started = time.perf_counter()
+                response = await getattr(client, method)(path, **kwargs)
+                elapsed = time.perf_counter() - started
+            await sync_to_async(connections.close_all)()
+        self.stats.record(name, elapsed, queries.count, response.status_code < 400)
+        return response
+
+    def _run_user(self, index):
+        try:
+            client = Client()
+            steps = self._journey(index)
+            response = None
+            while True:
+                try:
+                    step = steps.send(response)
+                except StopIteration:
+                    break
+                response = self._request(client, *step)
+        finally:
+            # 每个线程持有自己的数据库连接，结束时关闭
+            connection.close()
+
+    async def _run_async(self):
+        slots = asyncio.Semaphore(max(1, self.options["concurrency"]))
+
+        async def run_user(index):
+            async with slots:
+                client = AsyncClient()
+                steps = self._journey(index)
+                response = None
+                while True:
+                    try:
+                        step = steps.send(response)
+                    except StopIteration:
+                        break
+                    response = await self._arequest(client, *step)
+
+        await asyncio.gather(*(run_user(index) for index in range(self.options["users"])))
+
+    def _journey(self, index):
+        """一个用户的完整流程：逐个产出 (端点名, 方法, 路径, 参数)，并接收该请求的响应。"""
+        with self.rng_lock:
+            answers = {qid: self.rng.randint(1, 7) for qid in self.question_ids}
+        username = f"bench_{index}_{int(time.time() * 1000)}"
+        password = "Bench-pass-2025!"
+
+        yield "users:register", "post", reverse("users:register"), {"data": {
+            "username": username, "email": f"{username}@example.com",
+            "password": password, "confirm_password": password,
+        }}
+        yield "users:login", "post", reverse("users:login"), {"data": {
+            "username": username, "password": password,
+        }}
+
+        pages = [self.question_ids[i:i + PER_PAGE] for i in range(0, len(self.question_ids), PER_PAGE)]
+        every = max(1, self.options["autosave_every"])
+        revision = 0
+        for number, page in enumerate(pages, start=1):
+            yield "mbti:test", "get", reverse("mbti:test"), {"data": {"page": number}}
+            if number == len(pages):
+                break
+            # 前端在作答过程中周期性发送新增的答案（增量 + 递增修订号），点击"下一页"时要求立即落库
+            for start in range(0, len(page), every):
+                changes = {f"q_{qid}": str(answers[qid]) for qid in page[start:start + every]}
+                response = yield self._save_progress(revision + 1, changes)
+                revision = _confirmed_revision(response, revision + 1)
+            response = yield self._save_progress(revision + 1, {}, flush=True)
+            revision = _confirmed_revision(response, revision + 1)
+
+        last_page = {f"q_{qid}": str(answers[qid]) for qid in pages[-1]} if pages else {}
+        yield "mbti:submit", "post", reverse("mbti:submit"), {"data": last_page}
+        yield "mbti:result", "get", reverse("mbti:result"), {}
+        if not self.options["no_pdf"]:
+            yield "mbti:result_pdf", "get", reverse("mbti:result_pdf"), {}
+
+    @staticmethod
+    def _save_progress(revision, changes, flush=False):
+        """一次增量保存请求。"""
+        return "mbti:save_progress", "post", reverse("mbti:save_progress"), {
+            "data": json.dumps({"rev": revision, "changes": changes, "flush": flush}),
+            "content_type": "application/json",
+        }
+
+    def _print_table(self, report):
+        out = self.stderr
+        out.write(f"{'endpoint':<22}{'count':>7}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>7}")
+        for name, row in report["endpoints"].items():
+            out.write(
+                f"{name:<22}{row['count']:>7}{row['errors']:>5}{row['throughput_rps']:>9}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['queries_mean']:>7}"
+            )
+        meta = report["meta"]
+        out.write(
+            f"{meta['users']} journeys in {meta['wall_seconds']}s ({meta['journeys_per_second']}/s, "
+            f"{meta['mode']}, async views {'on' if meta['async_views'] else 'off'})"
+        )
+
+
+def _confirmed_revision(response, revision):
+    """服务器确认的修订号；响应无法解析时沿用本次发送的修订号。"""
+    try:
+        return int(response.json()["revision"])
+    except (ValueError, KeyError, TypeError):
+        return revision
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
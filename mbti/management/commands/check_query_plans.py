@@ -0,0 +1,86 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from mbti.export import latest_attempts, legacy_responses
+from mbti.models import Attempt, Question, Response, Result, ResultStatistic, TestProgress
+
+# 各数据库的全表扫描标记：SQLite 的 "SCAN <表>"（含按整个索引扫描），PostgreSQL 的 "Seq Scan on <表>"
+SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (\w+)"),
+    "postgresql": re.compile(r"\bSeq Scan on (\w+)"),
+}
+
+
+def full_scans(queryset, using=connection):
+    """
+    对查询执行 EXPLAIN，返回 (执行计划, 被全表扫描的表名列表)。
+
+    不支持的数据库返回 (None, None)；本命令与 mbti/tests.py 共用这一判定。
+    """
+    pattern = SCAN_PATTERNS.get(using.vendor)
+    if pattern is None:
+        return None, None
+    plan = queryset.explain()
+    tables = set(using.introspection.table_names())
+    return plan, sorted({table for table in pattern.findall(plan) if table in tables})
+
+
+def hot_queries():
+    """请求路径、管理后台与批量任务中的热点查询；参数取值不影响执行计划。"""
+    today = datetime.date.today()
+    start = datetime.datetime(today.year, today.month, today.day, tzinfo=datetime.timezone.utc)
+    return [
+        ("questionnaire snapshot", Question.objects.filter(questionnaire_id=1, active=True)
+            .order_by("order", "id").values_list("id", "text", "dimension", "keyed_pole", "weight")),
+        ("progress by user", TestProgress.objects.filter(user_id=1).values_list("version", "answers", "revision")),
+        ("legacy responses by user", Response.objects.filter(user_id=1).values_list("question_id", "choice")),
+        ("result by user", Result.objects.filter(user_id=1)),
+        ("latest attempt by user", Attempt.objects.filter(user_id=1)
+            .order_by("-created_at", "-id").values_list("answered", flat=True)[:1]),
+        ("latest attempts", Attempt.objects.filter(user_id__in=[1, 2])
+            .order_by("user_id", "-created_at", "-id").values_list("user_id", "version_id", "answers")),
+        ("admin attempts by questionnaire", Attempt.objects.filter(questionnaire_id=1).order_by("-pk")[:100]),
+        ("admin responses by questionnaire", Response.objects.filter(questionnaire_id=1).order_by("-pk")[:100]),
+        ("admin responses by dimension", Response.objects.filter(question__dimension="IE").order_by("-pk")[:100]),
+        ("admin results by questionnaire", Result.objects.filter(questionnaire_id=1).order_by("-pk")[:100]),
+        ("export responses", latest_attempts({
+            "questionnaire_id": 1, "created_at__gte": start, "created_at__lt": start + datetime.timedelta(days=1),
+        }).filter(pk__gt=0).order_by("pk").values_list("pk", "user_id", "version_id", "answers")[:5000]),
+        ("export legacy responses", legacy_responses({"questionnaire_id": 1, "created_at__gte": start})
+            .filter(pk__gt=0).order_by("pk").values_list("pk", "user_id", "question_id", "choice")[:5000]),
+        ("export results", Result.objects.filter(
+            questionnaire_id=1, created_at__gte=start, pk__gt=0,
+        ).order_by("pk").values_list("pk", "user_id", "type_code")[:5000]),
+        ("stats bucket", ResultStatistic.objects.filter(questionnaire_id=1, day=today, type_code="INTJ")),
+        ("stats daily", ResultStatistic.objects.filter(day__gte=today - datetime.timedelta(days=29))
+            .values("day").annotate(t_count=Sum("count")).order_by()),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the hot queries and exit non-zero if any of them falls back to a full table scan"
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SCAN_PATTERNS:
+            self.stdout.write(self.style.WARNING(f"No scan detection for the {connection.vendor} backend; skipped."))
+            return
+
+        failures = []
+        for name, queryset in hot_queries():
+            plan, scans = full_scans(queryset)
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FAIL  {name}: full scan of {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"ok    {name}")
+            if scans or options["verbosity"] >= 2:
+                for line in plan.splitlines():
+                    self.stdout.write(f"        {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries use a full table scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mbti.export import CHUNK_SIZE, EXPORT_KINDS, FORMATS, build_filters, encode, gzip_chunks, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Stream responses or results to CSV / JSON Lines, optionally gzip-compressed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORT_KINDS), help="What to export")
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip")
+        parser.add_argument("--questionnaire", help="Questionnaire id or key")
+        parser.add_argument("--since", help="First day to include, YYYY-MM-DD (local time)")
+        parser.add_argument("--until", help="Last day to include, YYYY-MM-DD (local time)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per query")
+        parser.add_argument("--output", default="-", help="Output file, '-' for stdout")
+
+    def handle(self, *args, **options):
+        try:
+            filters = build_filters(options["questionnaire"], options["since"], options["until"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        kind = options["kind"]
+        exported = 0
+
+        def counted(rows):
+            nonlocal exported
+            for row in rows:
+                exported += 1
+                yield row
+
+        chunks = encode(kind, options["format"], counted(iter_rows(kind, filters, max(1, options["chunk_size"]))))
+        if options["gzip"]:
+            chunks = gzip_chunks(chunks)
+
+        to_stdout = options["output"] == "-"
+        out = sys.stdout.buffer if to_stdout else open(options["output"], "wb")
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if to_stdout:
+                out.flush()
+            else:
+                out.close()
+
+        # 数据可能写到了标准输出，统计信息一律写标准错误
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported} {kind}."))
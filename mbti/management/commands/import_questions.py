@@ -0,0 +1,151 @@
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from mbti import snapshot
+from mbti.models import Question, Questionnaire
+from mbti.scoring import POLE_PAIRS
+
+FIELDS = ("dimension", "keyed_pole", "weight", "order", "active")
+MAX_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Sync the question bank from a CSV file: validate every row, then bulk insert/update/deactivate in one transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "csv", nargs="?",
+            default=str(Path(settings.BASE_DIR) / "data" / "questions_open_mbti_cn.csv"),
+            help="CSV with columns text,dimension,keyed_pole,weight,order",
+        )
+        parser.add_argument("--key", default="mbti_open_v1", help="Questionnaire key to sync into")
+        parser.add_argument("--name", default="MBTI测试（开放版）", help="Questionnaire name")
+        parser.add_argument("--no-activate", action="store_true", help="Do not make this the active questionnaire")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the inserts, updates and deactivations")
+
+    def handle(self, *args, **options):
+        rows = self._read(options["csv"])
+        qnn = Questionnaire.objects.filter(key=options["key"]).first()
+        existing = {}
+        if qnn is not None:
+            for pk, text, *values in Question.objects.filter(questionnaire=qnn).values_list("id", "text", *FIELDS):
+                existing[text] = (pk, dict(zip(FIELDS, values)))
+
+        inserts, updates, changed_fields = [], [], set()
+        for text, values in rows.items():
+            if text not in existing:
+                inserts.append((text, values))
+                continue
+            pk, current = existing[text]
+            diff = {name: value for name, value in values.items() if current[name] != value}
+            if diff:
+                updates.append((pk, text, diff))
+                changed_fields.update(diff)
+        deactivations = [
+            (pk, text) for text, (pk, current) in existing.items() if text not in rows and current["active"]
+        ]
+
+        unchanged = len(rows) - len(inserts) - len(updates)
+        self._report(inserts, updates, deactivations, unchanged, options)
+        if options["dry_run"]:
+            return
+
+        with transaction.atomic():
+            if qnn is None:
+                # 模型默认启用；--no-activate 时新建的问卷不能与当前启用的问卷同时生效
+                qnn = Questionnaire.objects.create(
+                    key=options["key"], name=options["name"], description="开放版平衡题库",
+                    is_active=not options["no_activate"],
+                )
+            elif qnn.name != options["name"]:
+                qnn.name = options["name"]
+                qnn.save(update_fields=["name"])
+
+            Question.objects.bulk_create(
+                [Question(text=text, questionnaire=qnn, **values) for text, values in inserts], batch_size=500
+            )
+            if updates:
+                Question.objects.bulk_update(
+                    [Question(pk=pk, text=text, questionnaire=qnn, **rows[text]) for pk, text, _ in updates],
+                    sorted(changed_fields),
+                    batch_size=500,
+                )
+            if deactivations:
+                Question.objects.filter(pk__in=[pk for pk, _ in deactivations]).update(active=False)
+
+            if not options["no_activate"]:
+                Questionnaire.objects.exclude(pk=qnn.pk).filter(is_active=True).update(is_active=False)
+                if not qnn.is_active:
+                    qnn.is_active = True
+                    qnn.save(update_fields=["is_active"])
+
+            # 批量写入不触发 post_save 信号，需要显式让题库快照失效（事务提交后生效）
+            snapshot.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(f"Synced questionnaire {qnn.key}."))
+
+    def _read(self, path):
+        """逐行读取并校验 CSV，返回 {text: 字段}；任何一行不合法都不做修改。"""
+        try:
+            f = open(path, encoding="utf-8-sig", newline="")
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+
+        rows, errors = {}, []
+        with f:
+            reader = csv.DictReader(f)
+            missing = {"text", "dimension", "keyed_pole"} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"{path}: missing columns {', '.join(sorted(missing))}")
+            for index, row in enumerate(reader, start=1):
+                line = reader.line_num
+                text = (row.get("text") or "").strip()
+                dimension = (row.get("dimension") or "").strip().upper()
+                pole = (row.get("keyed_pole") or "").strip().upper()
+                try:
+                    weight = int((row.get("weight") or "").strip() or 1)
+                    order = int((row.get("order") or "").strip() or index)
+                except ValueError:
+                    errors.append(f"line {line}: weight and order must be integers")
+                    continue
+                if not text:
+                    errors.append(f"line {line}: empty text")
+                elif text in rows:
+                    errors.append(f"line {line}: duplicate text {text!r}")
+                elif dimension not in POLE_PAIRS:
+                    errors.append(f"line {line}: unknown dimension {dimension!r}")
+                elif pole not in POLE_PAIRS[dimension]:
+                    errors.append(f"line {line}: keyed_pole {pole!r} does not belong to {dimension}")
+                elif weight < 1:
+                    errors.append(f"line {line}: weight must be at least 1")
+                else:
+                    rows[text] = {
+                        "dimension": dimension, "keyed_pole": pole, "weight": weight, "order": order, "active": True,
+                    }
+
+        if errors:
+            shown = "\n".join(errors[:MAX_ERRORS])
+            more = f"\n... and {len(errors) - MAX_ERRORS} more" if len(errors) > MAX_ERRORS else ""
+            raise CommandError(f"{path}: {len(errors)} invalid rows\n{shown}{more}")
+        if not rows:
+            raise CommandError(f"{path}: no questions found")
+        return rows
+
+    def _report(self, inserts, updates, deactivations, unchanged, options):
+        prefix = "Would apply" if options["dry_run"] else "Applying"
+        self.stdout.write(
+            f"{prefix}: {len(inserts)} inserts, {len(updates)} updates, "
+            f"{len(deactivations)} deactivations, {unchanged} unchanged"
+        )
+        if options["verbosity"] < 2 and not options["dry_run"]:
+            return
+        for text, _ in inserts:
+            self.stdout.write(f"  + {text}")
+        for _, text, diff in updates:
+            self.stdout.write(f"  ~ {text} ({', '.join(f'{k}={v}' for k, v in sorted(diff.items()))})")
+        for _, text in deactivations:
+            self.stdout.write(f"  - {text}")
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mbti.profiling import hotspots, load_profiles
+
+
+class Command(BaseCommand):
+    help = "Aggregate sampled view profiles into a collapsed-stack file or a top-N hotspot report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Profile directory (defaults to MBTI_PROFILING['DIR'])")
+        parser.add_argument("--view", help="Only include profiles of this view, e.g. submit or result_pdf")
+        parser.add_argument("--format", choices=["top", "collapsed"], default="top")
+        parser.add_argument("--top", type=int, default=25, help="Rows in the hotspot report")
+        parser.add_argument("--output", help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        config = getattr(settings, "MBTI_PROFILING", None) or {}
+        directory = Path(options["dir"] or config.get("DIR") or Path(settings.BASE_DIR) / "var" / "profiles")
+        if not directory.is_dir():
+            raise CommandError(f"Profile directory {directory} does not exist")
+
+        stacks, files = load_profiles(directory, options["view"])
+        if not stacks:
+            raise CommandError(f"No profiles found in {directory}")
+
+        if options["format"] == "collapsed":
+            # 可直接交给 flamegraph.pl / speedscope 渲染
+            text = "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        else:
+            text = self._top(stacks, options["top"])
+
+        if options["output"]:
+            Path(options["output"]).write_text(text, encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Aggregated {files} profiles into {options['output']}"))
+        else:
+            self.stdout.write(text, ending="")
+
+    @staticmethod
+    def _top(stacks, limit):
+        total = sum(stacks.values())
+        self_counts, total_counts = hotspots(stacks)
+        lines = [f"{total} samples", f"{'self%':>7}{'total%':>8}  frame"]
+        for frame, count in self_counts.most_common(limit):
+            lines.append(f"{count / total:>7.1%}{total_counts[frame] / total:>8.1%}  {frame}")
+        return "\n".join(lines) + "\n"
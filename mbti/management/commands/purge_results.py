@@ -1,13 +1,92 @@
-from django.core.management.base import BaseCommand
-from mbti.models import Result, Response
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from mbti.export import build_filters, day_start
+from mbti.models import Attempt, Result, ResultStatistic, Response
+from mbti.stats import StatsDelta
 
 
 class Command(BaseCommand):
-    help = "Delete all MBTI test results and responses"
+    help = "Delete MBTI test results, responses and attempts in small primary-key batches, optionally filtered"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questionnaire", help="Only rows of this questionnaire (id or key)")
+        parser.add_argument("--before", help="Only rows created before this day, YYYY-MM-DD (local time)")
+        parser.add_argument(
+            "--user", action="append", default=[], help="Only rows of this user (username or id); repeatable"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would be deleted")
 
     def handle(self, *args, **options):
-        resp_count = Response.objects.count()
-        res_count = Result.objects.count()
-        Response.objects.all().delete()
-        Result.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS(f"Purged {resp_count} responses and {res_count} results."))
\ No newline at end of file
+        try:
+            filters = build_filters(options["questionnaire"])
+            if options["before"]:
+                filters["created_at__lt"] = day_start(options["before"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["user"]:
+            filters["user_id__in"] = self._user_ids(options["user"])
+
+        responses = Response.objects.filter(**filters)
+        results = Result.objects.filter(**filters)
+        attempts = Attempt.objects.filter(**filters)
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would delete {responses.count()} responses, {results.count()} results "
+                f"and {attempts.count()} attempts."
+            )
+            return
+
+        self.batch_size = max(1, options["batch_size"])
+        self.pause = max(0.0, options["pause"])
+        resp_count = self._purge("responses", responses, ("pk",))
+        res_count = self._purge(
+            "results", results, ("pk", "questionnaire_id", "created_at", "type_code", "score_detail"), stats=True
+        )
+        attempt_count = self._purge("attempts", attempts, ("pk",))
+        # 统计分桶减到 0 后不再有意义
+        ResultStatistic.objects.filter(count__lte=0).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {resp_count} responses, {res_count} results and {attempt_count} attempts."
+        ))
+
+    def _purge(self, label, queryset, fields, stats=False):
+        """
+        按主键分批删除：每批先取出一批主键，再在一个短事务中按主键删除（不经 Django 的级联收集器，
+        不把整行读入内存），两批之间释放写锁，正常的答题提交可以穿插进行。
+        """
+        total = queryset.count()
+        rows = queryset.order_by("pk").values_list(*fields)
+        deleted = last_pk = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk)[:self.batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            with transaction.atomic():
+                count, _ = queryset.model.objects.filter(pk__in=[row[0] for row in batch]).delete()
+                if stats:
+                    delta = StatsDelta()
+                    for _, qnn_id, created_at, type_code, score_detail in batch:
+                        delta.add(qnn_id, created_at, type_code, score_detail, sign=-1)
+                    delta.apply()
+            deleted += count
+            self.stdout.write(f"Deleted {deleted}/{total} {label}")
+            if self.pause:
+                time.sleep(self.pause)
+        return deleted
+
+    @staticmethod
+    def _user_ids(values):
+        ids = {int(value) for value in values if value.isdigit()}
+        names = {value for value in values if not value.isdigit()}
+        found = dict(User.objects.filter(username__in=names).values_list("username", "id"))
+        missing = sorted(names - found.keys())
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(missing)}")
+        return sorted(ids | set(found.values()))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mbti.models import Result, ResultStatistic
+from mbti.stats import StatsDelta
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized result statistics from the Result table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Results read per query")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        stats = StatsDelta()
+        scanned = 0
+        last_pk = 0
+        rows = Result.objects.order_by("pk").values_list("pk", "questionnaire_id", "created_at", "type_code", "score_detail")
+
+        # 先在内存中按分桶汇总（内存只与分桶数有关），最后在一个短事务内整体替换统计表
+        while True:
+            chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            scanned += len(chunk)
+            for _, qnn_id, created_at, type_code, score_detail in chunk:
+                stats.add(qnn_id, created_at, type_code, score_detail)
+            self.stdout.write(f"Scanned {scanned} results")
+
+        buckets = stats.instances()
+        with transaction.atomic():
+            ResultStatistic.objects.all().delete()
+            ResultStatistic.objects.bulk_create(buckets, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(buckets)} statistic buckets from {scanned} results."))
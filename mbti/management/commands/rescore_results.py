@@ -0,0 +1,102 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mbti.attempts import latest_sheets
+from mbti.models import Question, Result
+from mbti.scoring import MISSING, compile_questions, score_matrix, summarize
+from mbti.stats import StatsDelta
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every MBTI result with the current question keys, scoring each user's latest answer sheet "
+        "against the questions it was answered on"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Results scored per batch")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many results would change")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        dry_run = options["dry_run"]
+        keys = {}
+        scanned = changed = skipped = 0
+        last_pk = 0
+
+        while True:
+            chunk = list(
+                Result.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only(
+                    "id", "user_id", "questionnaire_id", "type_code", "score_detail", "confidence", "created_at"
+                )[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            scanned += len(chunk)
+
+            stats = StatsDelta()
+            updates, unscored = self._rescore(keys, chunk, stats)
+            changed += len(updates)
+            skipped += unscored
+            if updates and not dry_run:
+                # 结果与统计表在同一事务中更新，保持一致
+                with transaction.atomic():
+                    Result.objects.bulk_update(updates, ["type_code", "score_detail", "confidence"])
+                    stats.apply()
+            self.stdout.write(f"Scanned {scanned} results, {changed} changed, {skipped} skipped")
+
+        verb = "would change" if dry_run else "updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {scanned} results; {changed} {verb}; {skipped} skipped without scorable answers."
+        ))
+
+    def _rescore(self, keys, results, stats):
+        """返回 (需要更新的结果, 跳过的结果数)。"""
+        by_user = {result.user_id: result for result in results}
+        # 按答卷的题目集合（问卷版本）分组，每组编译一次计分键
+        groups = {}
+        for user_id, question_ids, choices in latest_sheets(by_user.keys()):
+            groups.setdefault(question_ids, []).append((by_user[user_id], choices))
+
+        updates = []
+        scored = 0
+        for question_ids, sheets in groups.items():
+            if question_ids not in keys:
+                keys[question_ids] = self._compile(question_ids)
+            key, columns = keys[question_ids]
+            choices = np.asarray([sheet for _, sheet in sheets], dtype=np.int16).reshape(len(sheets), -1)
+            matrix = choices[:, columns]
+            scores, counts = score_matrix(key, matrix)
+            # 答卷里有题目已无法计分（题目被删除或维度无效）、或一题都没答的，保留原结果
+            scorable = (matrix != MISSING).sum(axis=1)
+            complete = (scorable > 0) & (scorable == (choices != MISSING).sum(axis=1))
+            for i, (result, _) in enumerate(sheets):
+                if not complete[i]:
+                    continue
+                scored += 1
+                code, detail, confidence = summarize(scores[i], counts[i])
+                if (code, detail, confidence) != (result.type_code, result.score_detail, result.confidence):
+                    stats.add_result(result, sign=-1)
+                    result.type_code, result.score_detail, result.confidence = code, detail, confidence
+                    stats.add_result(result)
+                    updates.append(result)
+        return updates, len(results) - scored
+
+    @staticmethod
+    def _compile(question_ids):
+        """
+        按答卷自身的题目集合编译计分键（采用题目当前的 keyed_pole/weight，停用的题目同样计分）。
+
+        返回 (计分键, 计分键各题在答卷中的列下标)。
+        """
+        rows = {
+            row[0]: row
+            for row in Question.objects.filter(pk__in=question_ids).values_list("id", "dimension", "keyed_pole", "weight")
+        }
+        key = compile_questions(rows[qid] for qid in question_ids if qid in rows)
+        position = {qid: i for i, qid in enumerate(question_ids)}
+        return key, np.asarray([position[qid] for qid in key.question_ids], dtype=np.intp)
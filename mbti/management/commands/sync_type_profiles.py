@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from mbti import profiles as profile_registry
+from mbti.models import TypeProfile
+from mbti.scoring import POLE_PAIRS
+
+
+def _valid_code(code):
+    return len(code) == 4 and all(code[i] in POLE_PAIRS[dim] for i, dim in enumerate(POLE_PAIRS))
+
+
+class Command(BaseCommand):
+    help = "Sync the 16 TypeProfile rows from a versioned JSON data file, writing only profiles whose content changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?",
+            default=str(Path(settings.BASE_DIR) / "data" / "type_profiles.json"),
+            help='JSON file: {"version": N, "profiles": {"INTJ": {field: text, ...}, ...}}',
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+
+    def handle(self, *args, **options):
+        version, profiles = self._load(options["path"])
+        existing = {profile.code: profile for profile in TypeProfile.objects.all()}
+
+        creates, updates, changed_fields, report = [], [], set(), []
+        for code, values in profiles.items():
+            digest = TypeProfile.hash_content(values)
+            profile = existing.get(code)
+            if profile is None:
+                creates.append(TypeProfile(code=code, content_hash=digest, **values))
+                report.append(f"  + {code}")
+                continue
+            if profile.content_hash == digest:
+                continue
+            changed = [f for f in TypeProfile.CONTENT_FIELDS if getattr(profile, f) != values[f]]
+            for field in changed:
+                setattr(profile, field, values[field])
+            profile.content_hash = digest
+            updates.append(profile)
+            changed_fields.update(changed)
+            # 只缺摘要（旧数据）的档案仅补写摘要列
+            report.append(f"  ~ {code}: {', '.join(changed) if changed else 'content_hash'}")
+
+        unchanged = len(profiles) - len(creates) - len(updates)
+        prefix = "Would sync" if options["dry_run"] else "Synced"
+        for line in report:
+            self.stdout.write(line)
+        for code in sorted(existing.keys() - profiles.keys()):
+            self.stdout.write(self.style.WARNING(f"  ? {code} is not in the data file (left untouched)"))
+        if not options["dry_run"] and (creates or updates):
+            with transaction.atomic():
+                TypeProfile.objects.bulk_create(creates)
+                if updates:
+                    TypeProfile.objects.bulk_update(updates, sorted(changed_fields | {"content_hash"}))
+                # 批量写入不触发 post_save 信号，需要显式让档案注册表失效（事务提交后生效）
+                profile_registry.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} type profiles v{version}: {len(creates)} created, {len(updates)} updated, {unchanged} unchanged."
+        ))
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        version = data.get("version") if isinstance(data, dict) else None
+        profiles = data.get("profiles") if isinstance(data, dict) else None
+        if not isinstance(version, int) or not isinstance(profiles, dict):
+            raise CommandError(f'{path}: expected {{"version": <int>, "profiles": {{...}}}}')
+
+        cleaned = {}
+        for code, values in profiles.items():
+            if not _valid_code(code):
+                raise CommandError(f"{path}: invalid type code {code!r}")
+            unknown = set(values) - set(TypeProfile.CONTENT_FIELDS)
+            if unknown:
+                raise CommandError(f"{path}: {code} has unknown fields {', '.join(sorted(unknown))}")
+            # 数据文件是全量描述：未列出的字段视为空
+            cleaned[code] = {f: values.get(f) or "" for f in TypeProfile.CONTENT_FIELDS}
+        return version, cleaned
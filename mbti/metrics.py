@@ -0,0 +1,120 @@
+"""
+进程内指标注册表，输出 Prometheus 文本格式（见 metrics_view）。
+
+只实现本项目需要的 Counter 与 Histogram；指标按进程独立统计，
+多进程部署时由抓取端按实例聚合。
+"""
+import threading
+
+# 请求/SQL 耗时（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# 单次请求的 SQL 条数
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+# PDF 文件大小（字节）
+SIZE_BUCKETS = (16_384, 65_536, 131_072, 262_144, 524_288, 1_048_576, 4_194_304)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}  # key -> [各桶计数..., sum, count]
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, [("le", _format_value(bound))]), count
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, key, [("le", "+Inf")]), state[-1]
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), state[-2]
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), state[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "mbti_requests_total", "Requests handled, by URL name, method and status code.", ("view", "method", "status")))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "mbti_request_duration_seconds", "Request latency by URL name.", ("view",)))
+SQL_QUERIES = REGISTRY.register(Histogram(
+    "mbti_sql_queries_per_request", "SQL statements executed per request.", ("view",), QUERY_COUNT_BUCKETS))
+SQL_TIME = REGISTRY.register(Histogram(
+    "mbti_sql_duration_seconds", "Total SQL time spent per request.", ("view",)))
+SESSION_WRITES = REGISTRY.register(Counter(
+    "mbti_session_writes_total", "Requests that caused the session to be saved.", ("view",)))
+PDF_RENDER_LATENCY = REGISTRY.register(Histogram(
+    "mbti_pdf_render_duration_seconds", "Time spent building a PDF report with ReportLab."))
+PDF_SIZE = REGISTRY.register(Histogram(
+    "mbti_pdf_size_bytes", "Size of rendered PDF reports.", buckets=SIZE_BUCKETS))
+PDF_CACHE = REGISTRY.register(Counter(
+    "mbti_pdf_cache_requests_total", "PDF cache lookups by outcome.", ("result",)))
@@ -0,0 +1,90 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+# 当前请求的计数器；上下文变量会随 sync_to_async 传入执行 ORM 的线程，
+# 异步视图在其他线程中发出的 SQL 也能计入发起它的请求
+_counters = contextvars.ContextVar("mbti_query_counters", default=())
+
+
+class QueryCounter:
+    """统计一段代码内的 SQL 条数与耗时。"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    counters = _counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for counter in counters:
+            counter.count += 1
+            counter.duration += elapsed
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created 信号处理函数：为每个线程的数据库连接挂上计数钩子（见 signals.py）。"""
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+@contextmanager
+def count_queries():
+    """在 with 块内（包括其中 sync_to_async 调用的线程）统计 SQL；可以嵌套使用。"""
+    counter = QueryCounter()
+    token = _counters.set(_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+class MetricsMiddleware:
+    """按 URL 名称（如 mbti:test、mbti:submit）记录请求耗时、SQL 条数/耗时与会话写入。"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with count_queries() as queries:
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with count_queries() as queries:
+            response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    @staticmethod
+    def _record(request, response, elapsed, queries):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        metrics.REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.REQUEST_LATENCY.observe(elapsed, view=view)
+        metrics.SQL_QUERIES.observe(queries.count, view=view)
+        metrics.SQL_TIME.observe(queries.duration, view=view)
+        session = getattr(request, "session", None)
+        if session is not None and session.modified:
+            metrics.SESSION_WRITES.inc(view=view)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mbti', '0004_testprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testprogress',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
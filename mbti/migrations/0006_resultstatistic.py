@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mbti', '0005_testprogress_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type_code', models.CharField(max_length=4)),
+                ('count', models.IntegerField(default=0)),
+                ('sum_ie', models.FloatField(default=0)),
+                ('sum_sn', models.FloatField(default=0)),
+                ('sum_tf', models.FloatField(default=0)),
+                ('sum_jp', models.FloatField(default=0)),
+                ('sumsq_ie', models.FloatField(default=0)),
+                ('sumsq_sn', models.FloatField(default=0)),
+                ('sumsq_tf', models.FloatField(default=0)),
+                ('sumsq_jp', models.FloatField(default=0)),
+                ('questionnaire', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='mbti.questionnaire')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('questionnaire', 'day', 'type_code'), name='unique_result_statistic')],
+            },
+        ),
+    ]
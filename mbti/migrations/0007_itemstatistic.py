@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mbti', '0006_resultstatistic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.IntegerField(default=0)),
+                ('mean', models.FloatField(blank=True, null=True, verbose_name='均值')),
+                ('variance', models.FloatField(blank=True, null=True, verbose_name='方差')),
+                ('item_total_r', models.FloatField(blank=True, null=True, verbose_name='题总相关')),
+                ('alpha_if_deleted', models.FloatField(blank=True, null=True, verbose_name='删除后α')),
+                ('dimension_alpha', models.FloatField(blank=True, null=True, verbose_name='维度α')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistic', to='mbti.question')),
+            ],
+        ),
+    ]
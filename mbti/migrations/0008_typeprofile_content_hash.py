@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mbti', '0007_itemstatistic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='typeprofile',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mbti', '0009_attempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('active', True)), fields=['questionnaire', 'order', 'id'], name='mbti_question_qnn_order'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['dimension'], name='mbti_question_dimension'),
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['questionnaire', 'created_at'], name='mbti_response_qnn_created'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['questionnaire', 'created_at'], name='mbti_result_qnn_created'),
+        ),
+        migrations.AddIndex(
+            model_name='resultstatistic',
+            index=models.Index(fields=['day'], name='mbti_resultstat_day'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+import hashlib
+import json
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .scoring import unpack_answers
 
 
 class Questionnaire(models.Model):
@@ -25,11 +31,23 @@ class Question(models.Model):
         Questionnaire, on_delete=models.CASCADE, related_name="questions", null=True, blank=True
     )
 
+    class Meta:
+        indexes = [
+            # 问卷快照：按问卷取启用的题目并按 (order, id) 排序；只收录启用题目的部分索引直接给出顺序
+            models.Index(
+                fields=["questionnaire", "order", "id"], condition=models.Q(active=True), name="mbti_question_qnn_order"
+            ),
+            # 作答管理列表按 question__dimension 筛选
+            models.Index(fields=["dimension"], name="mbti_question_dimension"),
+        ]
+
     def __str__(self):
         return self.text
 
 
 class Response(models.Model):
+    """旧版逐题作答。提交只写 Attempt，这里只剩尚未迁移的数据（见 mbti/attempts.py）。"""
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice = models.IntegerField()  # 1..5 Likert
@@ -37,7 +55,12 @@ class Response(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # (user, question) 唯一索引同时服务按用户读取作答与提交时的 upsert
         unique_together = ("user", "question")
+        indexes = [
+            # 导出、清理与管理列表按问卷和时间范围筛选
+            models.Index(fields=["questionnaire", "created_at"], name="mbti_response_qnn_created"),
+        ]
 
 
 class Result(models.Model):
@@ -48,6 +71,9 @@ class Result(models.Model):
     questionnaire = models.ForeignKey(Questionnaire, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["questionnaire", "created_at"], name="mbti_result_qnn_created")]
+
 
 class TypeProfile(models.Model):
     code = models.CharField(max_length=4, unique=True)  # 16类类型码
@@ -67,6 +93,122 @@ class TypeProfile(models.Model):
     career_suggestions = models.TextField(blank=True, verbose_name="职业建议")
     life_philosophy = models.TextField(blank=True, verbose_name="生活哲学")
     communication_style = models.TextField(blank=True, verbose_name="沟通风格")
+    # 上述内容字段的摘要：保存时自动计算，用于同步时跳过未变化的档案、以及按内容失效的缓存
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    CONTENT_FIELDS = (
+        "name", "description", "strengths", "growth",
+        "personality_traits", "work_style", "interpersonal_relations", "emotional_expression",
+        "decision_making", "stress_management", "learning_style", "career_suggestions",
+        "life_philosophy", "communication_style",
+    )
 
     def __str__(self):
-        return self.code
\ No newline at end of file
+        return self.code
+
+    @classmethod
+    def hash_content(cls, values):
+        """对 {字段: 文本} 计算内容摘要；缺失的字段按空字符串处理。"""
+        payload = json.dumps({f: values.get(f) or "" for f in cls.CONTENT_FIELDS}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.hash_content({f: getattr(self, f) for f in self.CONTENT_FIELDS})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
+
+class TestProgress(models.Model):
+    """进行中的作答进度：每题 1 字节、按题目在问卷中的位置排列，0 表示未作答。"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.SET_NULL, null=True, blank=True)
+    version = models.CharField(max_length=16)  # 问卷快照版本，题目变动后旧进度作废
+    answers = models.BinaryField()
+    revision = models.PositiveIntegerField(default=0)  # 客户端单调递增的修订号，用于拒绝过期的增量
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ResultStatistic(models.Model):
+    """
+    结果的物化统计：按 (问卷, 日期, 类型码) 汇总的人数，以及各维度得分的累计和与平方和。
+
+    在提交事务内随 Result 的新增/变更增量维护（见 mbti/stats.py），看板只读这张小表；
+    与 Result 不一致时可用 ``rebuild_stats`` 命令重建。
+    """
+
+    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE, null=True, blank=True)
+    day = models.DateField()  # 最近一次提交的本地日期
+    type_code = models.CharField(max_length=4)
+    count = models.IntegerField(default=0)
+    sum_ie = models.FloatField(default=0)
+    sum_sn = models.FloatField(default=0)
+    sum_tf = models.FloatField(default=0)
+    sum_jp = models.FloatField(default=0)
+    sumsq_ie = models.FloatField(default=0)
+    sumsq_sn = models.FloatField(default=0)
+    sumsq_tf = models.FloatField(default=0)
+    sumsq_jp = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["questionnaire", "day", "type_code"], name="unique_result_statistic"),
+        ]
+        # 看板不限问卷时按日期范围取每日提交数
+        indexes = [models.Index(fields=["day"], name="mbti_resultstat_day")]
+
+
+class ItemStatistic(models.Model):
+    """题目的项目分析结果，由 ``analyze_items`` 命令写入，在题目管理列表中展示。"""
+
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name="statistic")
+    responses = models.IntegerField(default=0)
+    mean = models.FloatField(null=True, blank=True, verbose_name="均值")
+    variance = models.FloatField(null=True, blank=True, verbose_name="方差")
+    # 校正题总相关：与同维度其余题目之和的相关系数，为负通常意味着 keyed_pole 设反
+    item_total_r = models.FloatField(null=True, blank=True, verbose_name="题总相关")
+    alpha_if_deleted = models.FloatField(null=True, blank=True, verbose_name="删除后α")
+    dimension_alpha = models.FloatField(null=True, blank=True, verbose_name="维度α")
+    computed_at = models.DateTimeField(auto_now=True)
+
+
+class QuestionnaireVersion(models.Model):
+    """问卷的一个版本：记录按问卷顺序排列的题目 id，作答记录中的答卷向量按此顺序解码。"""
+
+    version = models.CharField(max_length=16, unique=True)  # 与问卷快照的版本号一致
+    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.SET_NULL, null=True, blank=True)
+    question_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.version
+
+
+class Attempt(models.Model):
+    """
+    一次完整的作答：整张答卷按问卷版本的题目顺序打包为二进制向量（每题 4 位，0 表示未作答），
+    连同计分结果保存为一行。每次提交新增一行，保留重测历史（见 mbti/attempts.py）。
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="attempts")
+    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.SET_NULL, null=True, blank=True)
+    version = models.ForeignKey(QuestionnaireVersion, on_delete=models.PROTECT)
+    answers = models.BinaryField()
+    answered = models.PositiveSmallIntegerField(default=0)  # 已作答题数
+    type_code = models.CharField(max_length=4)
+    score_detail = models.JSONField(default=dict)
+    confidence = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "-created_at"], name="mbti_attempt_user_created")]
+
+    def choices(self):
+        """按题目顺序解码出的选项列表，0 表示未作答。"""
+        return unpack_answers(self.answers, len(self.version.question_ids)).tolist()
+
+    def answer_map(self):
+        """{question_id: choice}，只包含已作答的题目。"""
+        return {qid: choice for qid, choice in zip(self.version.question_ids, self.choices()) if choice}
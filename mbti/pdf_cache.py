@@ -0,0 +1,129 @@
+"""
+PDF 报告缓存。
+
+缓存键由 mbti.reports.report_cache_key 按报告输入内容计算，内容变化即换键，
+因此不会读到过期报告；旧条目由按容量的 LRU 淘汰回收。存储后端可通过
+settings.MBTI_PDF_CACHE["BACKEND"] 替换，只需实现 get/set/exists/delete_prefix 四个方法。
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+SUFFIX = ".pdf"
+
+
+class FileSystemPdfStore:
+    """本地目录存储；以文件 mtime 作为最近使用时间，超过 max_bytes 时淘汰最久未用的文件。"""
+
+    def __init__(self, location, max_bytes=256 * 1024 * 1024):
+        self.location = Path(location)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # 目录总大小的近似值，首次写入时统计
+
+    def _path(self, key):
+        return self.location / f"{key}{SUFFIX}"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # 命中即刷新为最近使用
+        except OSError:
+            pass
+        return data
+
+    def exists(self, key):
+        return self._path(key).is_file()
+
+    def set(self, key, data):
+        self.location.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再原子替换，避免并发读取到半个文件
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.location, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # 覆盖已有文件时容量只增加差值
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete_prefix(self, prefix):
+        if not self.location.is_dir():
+            return
+        for path in self.location.glob(f"{prefix}*{SUFFIX}"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._size = None
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.location) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # 淘汰到容量的 90%，避免每次写入都触发目录扫描
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                total -= size
+        self._size = total
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pdf_store():
+    """按配置返回进程内唯一的存储实例；未配置 MBTI_PDF_CACHE 时返回 None（不缓存）。"""
+    global _store
+    config = getattr(settings, "MBTI_PDF_CACHE", None)
+    if not config:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                options = {k.lower(): v for k, v in config.items() if k != "BACKEND"}
+                _store = import_string(config["BACKEND"])(**options)
+    return _store
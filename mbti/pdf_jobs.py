@@ -0,0 +1,135 @@
+"""
+PDF 报告的后台渲染队列（可选，见 settings.MBTI_PDF_ASYNC）。
+
+渲染在进程内的线程池中执行，不依赖外部消息队列；任务号即报告的缓存键，
+渲染完成后写入 PDF 缓存，下载仍走 result_pdf_view 的缓存命中路径。
+同一份报告重复请求会复用同一个任务；排队数达到上限时拒绝入队，由视图引导用户查看网页版结果。
+
+异步视图（settings.MBTI_ASYNC_VIEWS）同步渲染时使用 PdfRenderPool：请求在事件循环中等待
+线程池返回结果，CPU 密集的渲染不会阻塞其他连接，同样在排队数达到上限时抛出 QueueFull。
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .pdf_cache import get_pdf_store
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class PdfJobQueue:
+    def __init__(self, workers=2, max_pending=16):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mbti-pdf")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, job_id, render, *args):
+        """
+        提交渲染任务；render(*args) 返回 PDF 字节。队列已满时抛出 QueueFull。
+
+        渲染结果只写入 PDF 缓存，未配置缓存时拒绝入队（get_job_queue() 此时返回 None，正常不会走到这里）。
+        """
+        store = get_pdf_store()
+        if store is None:
+            raise ImproperlyConfigured("Background PDF rendering requires settings.MBTI_PDF_CACHE")
+        with self._lock:
+            future = self._jobs.get(job_id)
+            if future is not None and not future.done():
+                return job_id
+            pending = sum(1 for f in self._jobs.values() if not f.done())
+            if pending >= self.max_pending:
+                raise QueueFull(job_id)
+            # 已完成/失败的任务记录在这里顺带清理，注册表大小受 max_pending 约束
+            self._jobs = {k: f for k, f in self._jobs.items() if not f.done()}
+            self._jobs[job_id] = self._executor.submit(self._run, store, job_id, render, args)
+        return job_id
+
+    @staticmethod
+    def _run(store, job_id, render, args):
+        try:
+            if not store.exists(job_id):
+                store.set(job_id, render(*args))
+        except Exception:
+            # 失败只在这里记录一次；status() 轮询时只返回 FAILED
+            logger.exception("PDF render job %s failed", job_id)
+            raise
+
+    def status(self, job_id):
+        """返回 PENDING/DONE/FAILED；本进程不认识且缓存中也没有该报告时返回 None。只读，不产生日志。"""
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is not None:
+            if not future.done():
+                return PENDING
+            if future.exception() is not None:
+                return FAILED
+        # 多进程部署时状态请求可能落到其他进程：以缓存中是否已有文件为准
+        store = get_pdf_store()
+        return DONE if store is not None and store.exists(job_id) else None
+
+
+class PdfRenderPool:
+    def __init__(self, workers=2, max_pending=16):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mbti-pdf-render")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def render(self, render, *args):
+        """在线程池中执行 render(*args) 并返回其结果；正在渲染与排队的任务达到上限时抛出 QueueFull。"""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+        try:
+            future = self._executor.submit(render, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 名额在渲染真正结束时归还：请求被取消（客户端断开）后线程仍在渲染，不能提前放出名额
+        future.add_done_callback(lambda f: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+_pool = None
+
+
+def get_job_queue():
+    """异步模式开启且配置了 PDF 缓存时返回进程内唯一队列，否则返回 None（同步渲染）。"""
+    global _queue
+    config = getattr(settings, "MBTI_PDF_ASYNC", None) or {}
+    if not config.get("ENABLED") or get_pdf_store() is None:
+        return None
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = PdfJobQueue(
+                    workers=config.get("WORKERS", 2),
+                    max_pending=config.get("MAX_PENDING", 16),
+                )
+    return _queue
+
+
+def get_render_pool():
+    """异步视图使用的进程内唯一渲染线程池，大小见 settings.MBTI_ASYNC_VIEWS。"""
+    global _pool
+    config = getattr(settings, "MBTI_ASYNC_VIEWS", None) or {}
+    if _pool is None:
+        with _queue_lock:
+            if _pool is None:
+                _pool = PdfRenderPool(
+                    workers=config.get("PDF_WORKERS", 2),
+                    max_pending=config.get("PDF_MAX_PENDING", 16),
+                )
+    return _pool
@@ -0,0 +1,77 @@
+"""
+类型档案（TypeProfile）的进程级注册表。
+
+16 条档案几乎不变，却在每次查看结果、导出报告时被读取。首次访问时一次性加载全部档案，
+之后直接按类型码取用；TypeProfile 的 post_save/post_delete 信号（见 mbti/signals.py）
+以及绕过信号的批量写入（sync_type_profiles 命令）调用 invalidate() 后重新加载。
+
+与问卷快照相同，失效时在跨进程共享的缓存（snapshot.generation_cache()）中写入新的"代号"，
+其他 worker 与运行管理命令的进程都能感知。
+注册表中的实例被所有请求共享，只能读取，不要修改或保存。
+"""
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from .snapshot import aget_generation, generation_cache
+
+GENERATION_KEY = "mbti:type_profiles:generation"
+
+_lock = threading.Lock()
+_registry = None  # (generation, {code: TypeProfile})
+
+
+def _load():
+    from .models import TypeProfile
+
+    profiles = {}
+    for profile in TypeProfile.objects.all():
+        # 迁移前的旧数据可能还没有内容摘要，补算后才能作为片段缓存的版本号
+        if not profile.content_hash:
+            profile.content_hash = TypeProfile.hash_content({f: getattr(profile, f) for f in TypeProfile.CONTENT_FIELDS})
+        profiles[profile.code] = profile
+    return profiles
+
+
+def _profiles():
+    global _registry
+    cache = generation_cache()
+    generation = cache.get(GENERATION_KEY)
+    registry = _registry
+    if registry is not None and generation is not None and registry[0] == generation:
+        return registry[1]
+    with _lock:
+        if generation is None:
+            cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+            generation = cache.get(GENERATION_KEY)
+        registry = _registry
+        if registry is None or registry[0] != generation:
+            registry = (generation, _load())
+            _registry = registry
+    return registry[1]
+
+
+def get_profile(code):
+    """返回类型码对应的档案，不存在时返回 None；仅在失效后的首次访问时查询数据库。"""
+    return _profiles().get(code)
+
+
+async def aget_profile(code):
+    """get_profile() 的异步版本：注册表有效时直接返回，需要重新加载时在线程中查询数据库。"""
+    registry = _registry
+    if registry is not None and registry[0] == await aget_generation(GENERATION_KEY):
+        return registry[1].get(code)
+    return await sync_to_async(get_profile)(code)
+
+
+def invalidate():
+    """标记注册表失效；在事务提交后生效。"""
+
+    def bump():
+        global _registry
+        generation_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+        _registry = None
+
+    transaction.on_commit(bump)
@@ -0,0 +1,188 @@
+"""
+按需开启的采样式性能剖析。
+
+被 @profile_view 装饰的视图，在 settings.MBTI_PROFILING 开启后按 SAMPLE_RATE 抽样请求；
+管理员也可以在 URL 上加 ?profile=1 强制剖析当次请求。剖析期间由后台线程每隔 INTERVAL
+秒抓取一次请求线程的调用栈，结束后以 flame graph 的折叠栈格式（"a;b;c 次数"）写入 DIR，
+再用 ``python manage.py profile_report`` 汇总。
+
+异步视图把耗时工作交给线程池时（如 PDF 渲染），用 profile_worker() 包装交出的函数，
+工作线程上的栈会并入同一份剖析结果；否则只能采到空转的事件循环线程。
+"""
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+SUFFIX = ".collapsed"
+
+# 正在剖析的异步请求的工作线程采样结果；由 profile_worker() 包装的函数写入
+_worker_stacks = contextvars.ContextVar("mbti_profile_worker_stacks", default=None)
+_worker_lock = threading.Lock()
+
+
+def _config():
+    return getattr(settings, "MBTI_PROFILING", None) or {}
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    base_dir = str(settings.BASE_DIR)
+    if filename.startswith(base_dir):
+        filename = os.path.relpath(filename, base_dir)
+    else:
+        filename = "/".join(Path(filename).parts[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """在后台线程中周期性抓取目标线程的调用栈并计数。"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mbti-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+
+def should_profile(request):
+    config = _config()
+    user = getattr(request, "user", None)
+    if request.GET.get("profile") == "1" and user is not None and user.is_staff:
+        return True
+    return bool(config.get("ENABLED")) and random.random() < config.get("SAMPLE_RATE", 0.01)
+
+
+def _interval():
+    return _config().get("INTERVAL", 0.005)
+
+
+def profile_worker(func):
+    """
+    包装交给线程池执行的函数：当前异步请求正在剖析时，在执行它的工作线程上另起采样器，
+    结束后把栈并入该请求的剖析结果；未剖析时原样返回 func。须在请求的上下文中调用。
+    """
+    stacks = _worker_stacks.get()
+    if stacks is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        sampler = StackSampler(threading.get_ident(), _interval())
+        sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            with _worker_lock:
+                stacks.update(sampler.stacks)
+
+    return wrapper
+
+
+def write_profile(name, stacks):
+    directory = Path(_config().get("DIR") or Path(settings.BASE_DIR) / "var" / "profiles")
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = directory / f"{name}-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}{SUFFIX}"
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+def profile_view(name):
+    """视图装饰器：被抽中的请求在执行期间进行栈采样，结果写入剖析目录。"""
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            # 异步视图：这里采样的是事件循环线程，栈中也会出现同时运行的其他请求；
+            # 交给线程池的工作由 profile_worker() 在工作线程上采样，结束时合并
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not should_profile(request):
+                    return await view(request, *args, **kwargs)
+                worker_stacks = Counter()
+                token = _worker_stacks.set(worker_stacks)
+                sampler = StackSampler(threading.get_ident(), _interval())
+                sampler.start()
+                try:
+                    return await view(request, *args, **kwargs)
+                finally:
+                    sampler.stop()
+                    _worker_stacks.reset(token)
+                    with _worker_lock:
+                        stacks = sampler.stacks + worker_stacks
+                    if stacks:
+                        write_profile(name, stacks)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not should_profile(request):
+                return view(request, *args, **kwargs)
+            sampler = StackSampler(threading.get_ident(), _interval())
+            sampler.start()
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                sampler.stop()
+                if sampler.stacks:
+                    write_profile(name, sampler.stacks)
+
+        return wrapper
+
+    return decorator
+
+
+def load_profiles(directory, name=None):
+    """合并目录下的折叠栈文件；name 用于只汇总某个视图。"""
+    stacks = Counter()
+    files = 0
+    for path in sorted(Path(directory).glob(f"{name or '*'}-*{SUFFIX}")):
+        files += 1
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks, files
+
+
+def hotspots(stacks):
+    """返回 (自身采样数, 包含子调用的采样数) 两个 Counter，键为帧标签。"""
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for frame in set(frames):  # 递归调用只计一次
+            total_counts[frame] += count
+    return self_counts, total_counts
@@ -0,0 +1,365 @@
+"""
+作答进度存储。
+
+每个进行中的答卷是一个定长字节向量（每题 1 字节，按快照中的题目位置排列，0 表示未作答），
+自动保存只原地修改内存中的向量；落库会被合并：距上次落库超过 FLUSH_INTERVAL 秒、
+前端翻页/提交时显式要求、或后台线程定期巡检时才写一次 TestProgress 行。
+
+读取、以及对已落库（没有未写出修改）的条目应用增量之前，都会重新读一次数据库
+（单行主键查询），所以另一个进程写入的进度和修订号在这里可见；有未写出修改的条目
+只在本进程内合并，直到落库。
+
+写入采用增量协议：客户端只发送变化的答案并附带单调递增的修订号，
+修订号不大于当前值的增量被拒绝（STALE），内容无变化的增量不触碰存储（NOOP）。
+落库是以上次读到的修订号为条件的 UPDATE，数据库中的修订号因此只增不减。
+条件不成立说明其他进程已写过这一行：重新读出后，把本进程改过的题目合并到库中的
+向量上再重试（两边改了同一题时，修订号更高的一方为准），不会覆盖其他进程的修改。
+立即落库的请求（flush）若在写入时发现库中的修订号不低于本次修订号，同样返回 STALE。
+
+异步视图使用 aread()/aupdate()：内存中的读写直接在事件循环内完成，
+只有需要读库或落库时才切换到线程中执行。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import TestProgress
+
+MIN_CHOICE = 1
+MAX_CHOICE = 7
+
+APPLIED = "applied"
+NOOP = "noop"
+STALE = "stale"
+
+# 条件写入连续失败（其他进程反复抢先写入）时放弃本轮，条目保持脏标记留给下一次落库
+WRITE_ATTEMPTS = 3
+
+
+@dataclass
+class _Entry:
+    version: str
+    questionnaire_id: object
+    vector: bytearray
+    revision: int = 0
+    stored: object = None  # 上次读到/写入的数据库修订号；None 表示库中没有这一行
+    base: bytes = b""      # 与 stored 对应的库中向量，合并时用来判断其他进程改过哪些题
+    touched: dict = field(default_factory=dict)  # 落库后改过的 {位置: 修订号}
+    dirty: bool = False
+    cleared: bool = False  # 已被 clear() 丢弃：不再写入，也不会重新挂回
+    last_flush: float = field(default_factory=time.monotonic)
+
+
+def _config():
+    return getattr(settings, "MBTI_PROGRESS", None) or {}
+
+
+class ProgressStore:
+    def __init__(self, flush_interval=5.0, max_entries=10000):
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # 串行化"收集脏条目 + 写库"与 clear()：落库在释放 _lock 后进行，
+        # 否则 clear() 删除的行可能被一次已经开始的落库写回
+        self._flush_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flusher = None
+
+    # ---- 读取 ----
+    def read(self, user_id, snapshot):
+        """返回 ({question_id: choice}, revision)，只包含已作答的题目。"""
+        return self._snapshot_answers(self._entry(user_id, snapshot, reload=True), snapshot)
+
+    async def aread(self, user_id, snapshot):
+        """read() 的异步版本。"""
+        entry = self._cached(user_id, snapshot, reload=True)
+        if entry is None:
+            entry = await sync_to_async(self._entry)(user_id, snapshot, reload=True)
+        return self._snapshot_answers(entry, snapshot)
+
+    def answers(self, user_id, snapshot):
+        """{question_id: choice}，只包含已作答的题目。"""
+        return self.read(user_id, snapshot)[0]
+
+    # ---- 写入 ----
+    def update(self, user_id, snapshot, answers, revision=None, flush=False):
+        """
+        把增量 {question_id: choice} 原地写入答卷向量；不属于当前问卷或取值越界的条目被忽略。
+
+        revision 为客户端修订号：不大于当前修订号时拒绝（STALE）；为 None 时视为
+        "当前修订号 + 1"（服务端内部调用）。返回 (APPLIED/NOOP/STALE, 当前修订号)；
+        flush=True 时立即落库；落库时发现其他进程已写入不低于 revision 的修订号，同样返回 STALE。
+        """
+        entry = self._entry(user_id, snapshot, reload=True)
+        status, current, due = self._apply(user_id, entry, snapshot, answers, revision, flush)
+        if due:
+            status, current = self._after_flush(entry, status, current, revision, self._flush([user_id]))
+        return status, current
+
+    async def aupdate(self, user_id, snapshot, answers, revision=None, flush=False):
+        """update() 的异步版本。"""
+        entry = self._cached(user_id, snapshot, reload=True)
+        if entry is None:
+            entry = await sync_to_async(self._entry)(user_id, snapshot, reload=True)
+        status, current, due = self._apply(user_id, entry, snapshot, answers, revision, flush)
+        if due:
+            conflicts = await sync_to_async(self._flush)([user_id])
+            status, current = self._after_flush(entry, status, current, revision, conflicts)
+        return status, current
+
+    def flush(self, user_id=None):
+        """把未落库的修改写入数据库，返回写出的条目数；user_id 为空时写出全部。"""
+        return len(self._flush([user_id] if user_id is not None else None))
+
+    def clear(self, user_id):
+        """
+        提交完成后丢弃进度。
+
+        会等待正在进行的落库结束，应在提交的事务之外调用（见 views._save_submission），
+        以免持有数据库写锁时等待后台线程。
+        """
+        with self._flush_lock:
+            with self._lock:
+                entry = self._entries.pop(user_id, None)
+                if entry is not None:
+                    entry.cleared = True
+        # 此后的落库都看不到该条目，删除的行不会被写回
+        TestProgress.objects.filter(user_id=user_id).delete()
+
+    # ---- 内部 ----
+    def _flush(self, ids=None):
+        """
+        写出 ids（None 为全部）中的脏条目，返回 {user_id: 冲突时库中的修订号或 None}。
+
+        各条目分别以条件 UPDATE 写入，见 _write()。
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = []
+                for uid in (ids if ids is not None else list(self._entries)):
+                    entry = self._entries.get(uid)
+                    if entry is not None and entry.dirty:
+                        pending.append((uid, entry, bytes(entry.vector), entry.revision, dict(entry.touched)))
+            written = [(item, self._write(*item)) for item in pending]
+            now = time.monotonic()
+            with self._lock:
+                for (uid, entry, data, revision, touched), outcome in written:
+                    entry.last_flush = now
+                    if outcome is not None:
+                        self._synced(uid, entry, touched, *outcome[:2])
+        return {item[0]: outcome[2] for item, outcome in written if outcome is not None}
+
+    def _write(self, user_id, entry, data, revision, touched):
+        """
+        条件写入一条进度，返回 (库中的向量, 修订号, 冲突时读到的修订号或 None)。
+
+        向量为 None 表示库中的行已被删除（答卷已在其他进程提交），本进程的修改作废；
+        多次重试仍失败时返回 None，条目保持脏标记。
+        """
+        with self._lock:
+            stored, base = entry.stored, entry.base
+        conflict = None
+        for _ in range(WRITE_ATTEMPTS):
+            fields = {
+                "questionnaire_id": entry.questionnaire_id, "version": entry.version,
+                "answers": data, "revision": revision,
+            }
+            if stored is None:
+                try:
+                    with transaction.atomic():
+                        TestProgress.objects.create(user_id=user_id, **fields)
+                    return data, revision, conflict
+                except IntegrityError:
+                    pass  # 其他进程抢先建了行
+            elif TestProgress.objects.filter(user_id=user_id, revision=stored).update(
+                updated_at=timezone.now(), **fields
+            ):
+                return data, revision, conflict
+
+            # 其他进程已写过：读出当前行，把本进程改过的题目合并上去后重试
+            row = TestProgress.objects.filter(user_id=user_id).values_list("version", "answers", "revision").first()
+            if row is None:
+                if stored is not None:
+                    return None, 0, conflict  # 行被删除：答卷已经提交
+                continue
+            if row[2] >= revision:
+                conflict = row[2]
+            merged = bytearray(row[1]) if row[0] == entry.version and len(row[1]) == len(data) else None
+            if merged is not None:
+                for pos, changed_at in touched.items():
+                    # 对方没改过这题，或本进程的修改更新
+                    if changed_at > row[2] or len(base) != len(data) or merged[pos] == base[pos]:
+                        merged[pos] = data[pos]
+                data = bytes(merged)
+            # 修订号必须高于库中的值，后续的条件写入才能判断出这次写入
+            stored, base, revision = row[2], bytes(row[1]), max(revision, row[2] + 1)
+        return None
+
+    def _synced(self, user_id, entry, touched, vector, revision):
+        """落库成功后更新内存条目；调用方持有 self._lock。"""
+        if vector is None:
+            entry.cleared = True
+            if self._entries.get(user_id) is entry:
+                del self._entries[user_id]
+            return
+        entry.stored, entry.base = revision, vector
+        for pos, changed_at in touched.items():
+            if entry.touched.get(pos) == changed_at:
+                del entry.touched[pos]
+        # 写库期间又改过的题目保留内存中的值，其余采用合并后的库中值
+        for pos, choice in enumerate(vector):
+            if pos not in entry.touched:
+                entry.vector[pos] = choice
+        entry.revision = max(entry.revision, revision)
+        entry.dirty = bool(entry.touched)
+
+    def _after_flush(self, entry, status, current, revision, conflicts):
+        """
+        立即落库的请求：其他进程已写入不低于该请求的修订号时返回 STALE 与库中的修订号。
+
+        修改已按修订号合并进库，返回 409 是为了让客户端采用新的修订号并重发未确认的修改。
+        """
+        conflict = next(iter(conflicts.values()), None)
+        if revision is None or conflict is None or revision > conflict:
+            return status, current
+        with self._lock:
+            return STALE, max(entry.revision, conflict)
+
+    def _current(self, user_id, snapshot):
+        # 调用方持有 self._lock；题库版本不一致的内存条目视为不存在
+        entry = self._entries.get(user_id)
+        return entry if entry is not None and entry.version == snapshot.version else None
+
+    def _cached(self, user_id, snapshot, reload=False):
+        """不访问数据库地返回可直接使用的内存条目；需要（重新）读库时返回 None。"""
+        with self._lock:
+            entry = self._current(user_id, snapshot)
+            if entry is not None and (entry.dirty or not reload):
+                self._entries.move_to_end(user_id)
+                return entry
+        return None
+
+    def _entry(self, user_id, snapshot, reload=False):
+        """返回内存中的条目；不存在（或 reload 且没有未落库修改）时从数据库载入。"""
+        entry = self._cached(user_id, snapshot, reload)
+        if entry is not None:
+            return entry
+        loaded = self._load(user_id, snapshot)
+        with self._lock:
+            entry = self._current(user_id, snapshot)
+            if entry is not None and entry.dirty:
+                return entry  # 读库期间本进程又有新的修改，以内存为准
+            if entry is not None:
+                # NOOP 增量只推进内存中的修订号，重新读库时不能退回
+                loaded.revision = max(loaded.revision, entry.revision)
+            self._remember(user_id, loaded)
+            return loaded
+
+    def _snapshot_answers(self, entry, snapshot):
+        with self._lock:
+            vector, revision = bytes(entry.vector), entry.revision
+        answers = {q.id: vector[i] for i, q in enumerate(snapshot.questions) if vector[i]}
+        return answers, revision
+
+    def _apply(self, user_id, entry, snapshot, answers, revision, flush):
+        """在内存中应用增量，返回 (状态, 当前修订号, 是否需要立即落库)。"""
+        positions = snapshot.positions
+        with self._lock:
+            if entry.cleared:
+                return NOOP, entry.revision, False  # 答卷已提交，迟到的自动保存不再生效
+            if revision is not None and revision <= entry.revision:
+                return STALE, entry.revision, False
+            changes = []
+            for qid, choice in answers.items():
+                pos = positions.get(qid)
+                if pos is not None and MIN_CHOICE <= choice <= MAX_CHOICE and entry.vector[pos] != choice:
+                    changes.append((pos, choice))
+            if not changes:
+                if revision is not None:
+                    entry.revision = revision  # 只推进内存中的修订号，不产生写入
+                due = flush and entry.dirty
+                status = NOOP
+            else:
+                entry.revision = revision if revision is not None else entry.revision + 1
+                for pos, choice in changes:
+                    entry.vector[pos] = choice
+                    entry.touched[pos] = entry.revision
+                entry.dirty = True
+                if self._entries.get(user_id) is not entry:
+                    self._remember(user_id, entry)  # 条目在加锁前被淘汰：重新挂回，保证会被落库
+                due = flush or time.monotonic() - entry.last_flush >= self.flush_interval
+                status = APPLIED
+            current = entry.revision
+            dirty = entry.dirty
+        if dirty and not due:
+            self._ensure_flusher()
+        return status, current, due
+
+    def _load(self, user_id, snapshot):
+        row = TestProgress.objects.filter(user_id=user_id).values_list("version", "answers", "revision").first()
+        revision = row[2] if row is not None else 0
+        if row is not None and row[0] == snapshot.version and len(row[1]) == len(snapshot):
+            vector = bytearray(row[1])
+        else:
+            # 没有进度或题库已变动：从空白答卷开始（修订号保留，客户端无需重置计数）
+            vector = bytearray(len(snapshot))
+        return _Entry(
+            version=snapshot.version, questionnaire_id=snapshot.questionnaire_id, vector=vector, revision=revision,
+            stored=row[2] if row is not None else None, base=bytes(vector),
+        )
+
+    def _remember(self, user_id, entry):
+        # 调用方持有 self._lock
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.dirty:
+                break  # 未落库的条目交给后台线程写出后再淘汰
+            self._entries.popitem(last=False)
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="mbti-progress-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                # 数据库短暂不可用（如 SQLite 写锁超时）：条目仍是脏的，下一轮重试
+                pass
+            finally:
+                close_old_connections()
+            with self._lock:
+                if not any(e.dirty for e in self._entries.values()):
+                    self._flusher = None
+                    return
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_progress_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = _config()
+                _store = ProgressStore(
+                    flush_interval=config.get("FLUSH_INTERVAL", 5.0),
+                    max_entries=config.get("MAX_ENTRIES", 10000),
+                )
+    return _store
@@ -0,0 +1,417 @@
+"""
+PDF 报告生成与缓存键。
+
+报告内容只取决于结果、类型档案、用户名与作答题数，因此可以按这些内容的哈希做缓存
+（见 mbti/pdf_cache.py）；修改报告版式时请递增 REPORT_TEMPLATE_VERSION 使旧缓存失效。
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+
+from . import metrics
+from .fonts import get_pdf_font
+from .models import TypeProfile
+
+# 报告版式版本号：改动下方排版/文案后递增，旧的缓存条目即不再命中
+REPORT_TEMPLATE_VERSION = 1
+
+PROFILE_FIELDS = TypeProfile.CONTENT_FIELDS
+
+
+def report_cache_key(result, profile, username, response_count):
+    """按报告的全部输入内容计算缓存键：同样的输入必然生成同样的 PDF。"""
+    payload = {
+        'version': REPORT_TEMPLATE_VERSION,
+        'username': username,
+        'response_count': response_count,
+        'type_code': result.type_code,
+        'score_detail': result.score_detail,
+        'confidence': result.confidence,
+        'created_at': result.created_at.isoformat() if result.created_at else None,
+        'profile': {f: getattr(profile, f, '') for f in PROFILE_FIELDS} if profile else None,
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    # 以用户 id 作为前缀，结果变化时可以按前缀清理该用户的旧报告
+    return f"u{result.user_id}-{digest.hexdigest()[:32]}"
+
+
+def render_result_pdf(result, profile, username, response_count):
+    """
+    生成 PDF 报告并返回字节内容。
+
+    与用户无关的部分（类型档案各章节、维度说明、通用建议）按类型预先构建并缓存，
+    每次请求只构建基本信息、分数表格与个性化建议。
+    """
+    # 延迟导入报告库；未安装时抛出 ImportError，由调用方给出友好降级
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.units import inch
+
+    # 中文字体由进程级注册表解析一次，避免每次请求解析字体文件
+    base_font = get_pdf_font()
+
+    styles = _build_styles(base_font)
+    sections = _type_sections(result.type_code, profile, base_font)
+
+    # 构建文档
+    from io import BytesIO
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=50, bottomMargin=50, title='MBTI人格测试报告')
+    story = []
+    
+    # 添加标题
+    story.append(Paragraph('MBTI人格测试报告', styles['title']))
+    story.append(Spacer(1, 30))
+    
+    # 基本信息表格
+    story.append(Paragraph('基本信息', styles['heading']))
+    basic_data = [
+        ['用户名', username],
+        ['测试时间', result.created_at.strftime('%Y年%m月%d日 %H:%M') if hasattr(result, 'created_at') else '—'],
+        ['人格类型', f"{result.type_code} - {getattr(profile, 'name', '未知类型') if profile else '未知类型'}"],
+        ['测试题目数', response_count]
+    ]
+    
+    basic_table = Table(basic_data, colWidths=[2*inch, 4*inch])
+    basic_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), base_font),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(basic_table)
+    story.append(Spacer(1, 20))
+    
+    # 类型描述（按类型预构建）
+    story.extend(_copy(sections['overview']))
+    
+    # 维度分析表格
+    story.append(Paragraph('维度分析', styles['heading']))
+    
+    dimension_data = [['维度', '分数', '置信度', '倾向']] + [
+        [
+            k, 
+            f"{v:+.2f}", 
+            f"{result.confidence.get(k, 0):.2f}",
+            {'IE': ('内向', '外向'), 'SN': ('感觉', '直觉'), 'TF': ('思考', '情感'), 'JP': ('判断', '知觉')}[k][1 if v > 0 else 0]
+        ] for k, v in result.score_detail.items()
+    ]
+    
+    dimension_table = Table(dimension_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1.5*inch])
+    dimension_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), base_font),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(dimension_table)
+    story.append(Spacer(1, 20))
+    
+    # 多维度深度分析（按类型预构建）
+    story.extend(_copy(sections['analysis']))
+    
+    # 详细维度分析：维度标题、说明与倾向解释按 (维度, 字母) 预构建，只有分数行按用户生成
+    story.append(Paragraph('维度详细分析', styles['heading']))
+    
+    for dim_code, score in result.score_detail.items():
+        if dim_code in DIMENSION_EXPLANATIONS:
+            confidence = result.confidence.get(dim_code, 0)
+            chosen_letter = TYPE_MAP[dim_code][1] if score > 0 else TYPE_MAP[dim_code][0]
+            title, description, tendency = _dimension_block(dim_code, chosen_letter, base_font)
+            score_text = f"您的分数：{score:+.2f}，置信度：{confidence:.2f}"
+            story.extend(_copy([title, description]))
+            story.append(Paragraph(f"<b>{score_text}</b>", styles['score']))
+            story.extend(_copy([tendency]))
+    
+    # 综合分析
+    story.append(Paragraph('综合人格分析', styles['heading']))
+    
+    # 计算整体倾向强度
+    total_strength = sum(abs(score) for score in result.score_detail.values()) / len(result.score_detail)
+    avg_confidence = sum(result.confidence.values()) / len(result.confidence) if result.confidence else 0
+    
+    overall_analysis = f"""
+    根据您的测试结果，您的人格类型为 {result.type_code}。
+    
+    整体特征强度：{total_strength:.2f}（范围0-4，数值越高表示特征越明显）
+    平均置信度：{avg_confidence:.2f}（范围0-1，数值越高表示结果越可靠）
+    
+    这意味着您在各个维度上的倾向性{'较为明显' if total_strength > 2 else '相对温和'}，
+    测试结果的可靠性{'较高' if avg_confidence > 0.7 else '中等' if avg_confidence > 0.5 else '需要进一步验证'}。
+    """
+    
+    story.append(Paragraph(overall_analysis, styles['normal']))
+    story.append(Spacer(1, 15))
+    
+    # 发展建议增强版
+    story.append(Paragraph('个人发展建议', styles['heading']))
+    
+    # 基于分数提供个性化建议
+    development_suggestions = []
+    
+    for dim_code, score in result.score_detail.items():
+        confidence = result.confidence.get(dim_code, 0)
+        if confidence < 0.6:  # 低置信度的维度
+            if dim_code == 'IE':
+                development_suggestions.append("在内外向维度上，您可能处于平衡状态。建议在不同情境下尝试不同的行为模式，找到最适合的能量获取方式。")
+            elif dim_code == 'SN':
+                development_suggestions.append("在感觉-直觉维度上，您展现出灵活性。建议培养既关注细节又把握大局的能力。")
+            elif dim_code == 'TF':
+                development_suggestions.append("在思考-情感维度上，您能够平衡理性和感性。建议在决策时综合考虑逻辑分析和人际影响。")
+            elif dim_code == 'JP':
+                development_suggestions.append("在判断-知觉维度上，您具有适应性。建议根据情况需要，灵活运用计划性和开放性。")
+    
+    if development_suggestions:
+        story.append(Paragraph("基于您的测试结果，以下是个性化的发展建议：", styles['normal']))
+        for i, suggestion in enumerate(development_suggestions, 1):
+            story.append(Paragraph(f"{i}. {suggestion}", styles['suggestion']))
+    
+    # 原有的发展建议（按类型预构建）
+    story.extend(_copy(sections['growth']))
+    
+    story.append(Spacer(1, 20))
+
+    # 页脚信息
+    story.append(Spacer(1, 30))
+    story.append(Paragraph('本报告由MBTI人格测试系统生成', styles['footer']))
+    story.append(Paragraph(f"生成时间：{result.created_at.strftime('%Y年%m月%d日 %H:%M:%S') if hasattr(result, 'created_at') else '—'}", styles['footer']))
+
+    started = time.perf_counter()
+    doc.build(story)
+    pdf = buffer.getvalue()
+    metrics.PDF_RENDER_LATENCY.observe(time.perf_counter() - started)
+    metrics.PDF_SIZE.observe(len(pdf))
+    return pdf
+
+
+TYPE_MAP = {
+    'IE': ('I', 'E'),
+    'SN': ('S', 'N'),
+    'TF': ('T', 'F'),
+    'JP': ('J', 'P'),
+}
+
+ANALYSIS_SECTIONS = (
+    ('性格特点', 'personality_traits'),
+    ('工作风格', 'work_style'),
+    ('人际关系', 'interpersonal_relations'),
+    ('情感表达', 'emotional_expression'),
+    ('决策方式', 'decision_making'),
+    ('压力管理', 'stress_management'),
+    ('学习方式', 'learning_style'),
+    ('职业建议', 'career_suggestions'),
+    ('生活哲学', 'life_philosophy'),
+    ('沟通风格', 'communication_style'),
+)
+
+# 为每个维度提供详细解释
+DIMENSION_EXPLANATIONS = {
+    'IE': {
+        'name': '外向性 vs 内向性',
+        'description': '这个维度反映了你获取能量的方式和注意力的方向。',
+        'I': '内向型：从内部世界获取能量，喜欢独处思考，更关注内心世界。',
+        'E': '外向型：从外部世界获取能量，喜欢与人交往，思考时倾向于外化表达。'
+    },
+    'SN': {
+        'name': '感觉 vs 直觉',
+        'description': '这个维度反映了你收集和处理信息的偏好方式。',
+        'S': '感觉型：关注具体事实和细节，相信经验和实际观察，注重现实。',
+        'N': '直觉型：关注可能性和模式，相信灵感和想象，注重未来潜力。'
+    },
+    'TF': {
+        'name': '思考 vs 情感',
+        'description': '这个维度反映了你做决策时的主要考虑因素。',
+        'T': '思考型：基于逻辑分析做决策，重视客观标准和公平原则。',
+        'F': '情感型：基于价值观和人际关系做决策，重视和谐与个人价值。'
+    },
+    'JP': {
+        'name': '判断 vs 知觉',
+        'description': '这个维度反映了你对外部世界的态度和生活方式偏好。',
+        'J': '判断型：喜欢有计划和结构的生活，倾向于做决定和完成任务。',
+        'P': '知觉型：喜欢灵活和开放的生活，倾向于保持选择余地和适应变化。'
+    }
+}
+
+
+def _copy(flowables):
+    # 预构建的段落已完成标记解析；浅拷贝后再交给 doc.build，
+    # 排版过程写入的宽高等状态落在副本上，可被多个请求并发复用
+    return [copy.copy(f) for f in flowables]
+
+
+@lru_cache(maxsize=8)
+def _build_styles(base_font):
+    """按字体构建一次全部段落样式。"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontName=base_font,
+        fontSize=10,
+        spaceAfter=8,
+        leftIndent=20,
+        rightIndent=20
+    )
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontName=base_font,
+            fontSize=20,
+            spaceAfter=30,
+            alignment=1,  # 居中
+            textColor=colors.darkblue
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontName=base_font,
+            fontSize=14,
+            spaceAfter=12,
+            spaceBefore=20,
+            textColor=colors.darkblue,
+            borderWidth=1,
+            borderColor=colors.lightgrey,
+            borderPadding=5,
+            backColor=colors.lightgrey
+        ),
+        'normal': normal_style,
+        'section_title': ParagraphStyle(
+            'SectionTitle',
+            parent=normal_style,
+            fontSize=12,
+            textColor=colors.darkblue,
+            spaceAfter=6,
+            leftIndent=10,
+            fontName=base_font
+        ),
+        'dimension_title': ParagraphStyle(
+            'DimensionTitle',
+            parent=normal_style,
+            fontSize=13,
+            textColor=colors.darkred,
+            spaceAfter=8,
+            spaceBefore=15,
+            fontName=base_font,
+            bold=True
+        ),
+        'score': ParagraphStyle(
+            'ScoreText',
+            parent=normal_style,
+            fontSize=11,
+            textColor=colors.darkgreen,
+            spaceAfter=6,
+            leftIndent=20,
+            fontName=base_font
+        ),
+        'tendency': ParagraphStyle(
+            'TendencyText',
+            parent=normal_style,
+            fontSize=10,
+            leftIndent=20,
+            rightIndent=20,
+            spaceAfter=10,
+            fontName=base_font,
+            backColor=colors.lightgrey,
+            borderWidth=1,
+            borderColor=colors.grey,
+            borderPadding=8
+        ),
+        'suggestion': ParagraphStyle(
+            'SuggestionText',
+            parent=normal_style,
+            leftIndent=30,
+            rightIndent=20,
+            spaceAfter=8,
+            fontName=base_font
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontName=base_font,
+            fontSize=8,
+            alignment=1,
+            textColor=colors.grey
+        ),
+    }
+
+
+_sections_lock = threading.Lock()
+_sections = {}
+# 16 种类型 × 少量字体/档案版本，超过上限时整体清空重建
+MAX_CACHED_SECTIONS = 64
+
+
+def _type_sections(type_code, profile, base_font):
+    """返回按类型预构建的静态段落；以档案内容摘要为键，档案修改后自动换键重建。"""
+    digest = hashlib.sha1(
+        json.dumps([getattr(profile, f, '') for f in PROFILE_FIELDS], ensure_ascii=False).encode('utf-8')
+    ).hexdigest() if profile else None
+    key = (type_code, digest, base_font)
+    sections = _sections.get(key)
+    if sections is None:
+        sections = _build_type_sections(profile, base_font)
+        with _sections_lock:
+            if len(_sections) >= MAX_CACHED_SECTIONS:
+                _sections.clear()
+            _sections[key] = sections
+    return sections
+
+
+def _build_type_sections(profile, base_font):
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = _build_styles(base_font)
+    growth = getattr(profile, 'growth', '') or '—'
+    description = getattr(profile, 'description', '') or '—'
+
+    overview = (
+        Paragraph('性格概述', styles['heading']),
+        Paragraph(description, styles['normal']),
+        Spacer(1, 20),
+    )
+
+    analysis = [Paragraph('多维度深度分析', styles['heading'])]
+    for section_title, field in ANALYSIS_SECTIONS:
+        content = getattr(profile, field, '') if profile else ''
+        if content:  # 只显示有内容的部分
+            analysis.append(Paragraph(f"• {section_title}", styles['section_title']))
+            analysis.append(Paragraph(content, styles['normal']))
+            analysis.append(Spacer(1, 10))
+
+    growth_block = ()
+    if growth:
+        growth_block = (
+            Paragraph("通用发展建议：", styles['normal']),
+            Paragraph(growth, styles['normal']),
+        )
+    return {'overview': overview, 'analysis': tuple(analysis), 'growth': growth_block}
+
+
+@lru_cache(maxsize=32)
+def _dimension_block(dim_code, letter, base_font):
+    """维度标题、说明与所选字母的倾向解释；共 4 维 × 2 字母种组合。"""
+    from reportlab.platypus import Paragraph
+
+    styles = _build_styles(base_font)
+    dim_info = DIMENSION_EXPLANATIONS[dim_code]
+    return (
+        Paragraph(f"{dim_info['name']} ({dim_code})", styles['dimension_title']),
+        Paragraph(dim_info['description'], styles['normal']),
+        Paragraph(dim_info.get(letter, ''), styles['tendency']),
+    )
@@ -0,0 +1,163 @@
+"""
+MBTI 计分引擎。
+
+把题目编译为定长数组（维度下标、方向、权重），对单份答卷或整批答卷矩阵做一次
+向量化计算。视图提交与批量重算（``rescore_results`` 命令）共用同一套逻辑，
+保证两条路径的结果完全一致。
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+DIMENSIONS = ("IE", "SN", "TF", "JP")
+POLE_PAIRS = {
+    "IE": ("I", "E"),
+    "SN": ("S", "N"),
+    "TF": ("T", "F"),
+    "JP": ("J", "P"),
+}
+# Likert 选项中点：choice - LIKERT_MIDPOINT 即为该题的原始分
+LIKERT_MIDPOINT = 3
+# 答卷矩阵中表示"未作答"的取值
+MISSING = 0
+
+
+@dataclass(frozen=True)
+class ScoringKey:
+    """编译后的计分键：按题目顺序排列的并行数组。"""
+
+    question_ids: tuple
+    dim_index: np.ndarray   # (n,) 维度在 DIMENSIONS 中的下标
+    direction: np.ndarray   # (n,) +1 表示题目倾向第二极性（E/N/F/P），否则 -1
+    weight: np.ndarray      # (n,) 题目权重，最小为 1
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    @property
+    def positions(self):
+        """question_id -> 在数组中的下标"""
+        return {qid: i for i, qid in enumerate(self.question_ids)}
+
+
+def compile_questions(questions):
+    """
+    将题目编译为 ScoringKey。
+
+    questions 可以是 Question 实例，也可以是 (id, dimension, keyed_pole, weight) 元组，
+    顺序即答卷矩阵的列顺序；维度非法的题目会被跳过（与旧逻辑一致，不参与计分）。
+    """
+    ids, dims, dirs, weights = [], [], [], []
+    for q in questions:
+        if isinstance(q, tuple):
+            qid, dimension, keyed_pole, weight = q
+        else:
+            qid, dimension, keyed_pole, weight = q.id, q.dimension, q.keyed_pole, q.weight
+        if dimension not in POLE_PAIRS:
+            continue
+        ids.append(qid)
+        dims.append(DIMENSIONS.index(dimension))
+        dirs.append(1 if keyed_pole == POLE_PAIRS[dimension][1] else -1)
+        weights.append(max(1, weight or 0))
+    return ScoringKey(
+        question_ids=tuple(ids),
+        dim_index=np.asarray(dims, dtype=np.intp),
+        direction=np.asarray(dirs, dtype=np.int8),
+        weight=np.asarray(weights, dtype=np.int32),
+    )
+
+
+def answers_to_row(key, answers):
+    """把 {question_id: choice} 转为与 key 对齐的一行答卷，未作答的位置为 MISSING。"""
+    row = np.full(len(key), MISSING, dtype=np.int16)
+    positions = key.positions
+    for qid, choice in answers.items():
+        pos = positions.get(qid)
+        if pos is not None:
+            row[pos] = choice
+    return row
+
+
+def fill_matrix(key, rows, answers):
+    """
+    把 (user_id, question_id, choice) 三元组填入答卷矩阵。
+
+    rows 为 {user_id: 行下标}；不属于计分键的题目被忽略。
+    """
+    positions = key.positions
+    matrix = np.full((len(rows), len(key)), MISSING, dtype=np.int16)
+    user_idx, col_idx, choices = [], [], []
+    for user_id, question_id, choice in answers:
+        pos = positions.get(question_id)
+        if pos is not None:
+            user_idx.append(rows[user_id])
+            col_idx.append(pos)
+            choices.append(choice)
+    matrix[user_idx, col_idx] = choices
+    return matrix
+
+
+def pack_answers(choices):
+    """把按题目顺序排列的选项（0..15，0 为未作答）打包为每题 4 位的字节串，偶数位置占高 4 位。"""
+    values = np.asarray(choices, dtype=np.int16)
+    if values.size and (values.min() < 0 or values.max() > 0x0F):
+        raise ValueError("choices must fit in 4 bits")
+    values = values.astype(np.uint8)
+    if len(values) % 2:
+        values = np.append(values, np.uint8(MISSING))
+    return ((values[0::2] << 4) | values[1::2]).astype(np.uint8).tobytes()
+
+
+def unpack_answers(data, length):
+    """pack_answers 的逆运算，返回长度为 length 的 uint8 数组。"""
+    packed = np.frombuffer(bytes(data), dtype=np.uint8)
+    values = np.empty(len(packed) * 2, dtype=np.uint8)
+    values[0::2] = packed >> 4
+    values[1::2] = packed & 0x0F
+    return values[:length]
+
+
+def score_matrix(key, matrix):
+    """
+    对答卷矩阵 (m, n) 批量计分。
+
+    返回 (scores, counts)，形状均为 (m, 4)，列顺序同 DIMENSIONS。
+    标准化计分：raw = choice - 3；正分恒指向维度的第二极性（E/N/F/P）。
+    """
+    matrix = np.asarray(matrix, dtype=np.int32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    answered = matrix != MISSING
+    raw = np.where(answered, matrix - LIKERT_MIDPOINT, 0)
+    # 每题对各维度的贡献矩阵 (n, 4)：one-hot(维度) * 方向 * 权重
+    loadings = np.zeros((len(key), len(DIMENSIONS)), dtype=np.int32)
+    loadings[np.arange(len(key)), key.dim_index] = key.direction * key.weight
+    membership = np.zeros((len(key), len(DIMENSIONS)), dtype=np.int32)
+    membership[np.arange(len(key)), key.dim_index] = 1
+    scores = raw @ loadings
+    counts = answered.astype(np.int32) @ membership
+    return scores.astype(np.float64), counts
+
+
+def summarize(scores, counts):
+    """
+    把一行分数转为 (type_code, score_detail, confidence)，格式与 Result 字段一致。
+
+    约定 v>0 代表维度第二极性（如 IE 中的 E），v<=0 代表第一极性（如 I）。
+    置信度按每维度平均绝对分值归一化到 0..1。
+    """
+    score_detail, confidence, letters = {}, {}, []
+    for i, dim in enumerate(DIMENSIONS):
+        v = float(scores[i])
+        n = max(int(counts[i]), 1)
+        score_detail[dim] = v
+        # 每题最大绝对分值=2*weight，这里按weight最小值1近似；平均绝对值/2归一到[0,1]
+        confidence[dim] = min(1.0, max(0.0, (abs(v) / n) / 2))
+        letters.append(POLE_PAIRS[dim][1] if v > 0 else POLE_PAIRS[dim][0])
+    return "".join(letters), score_detail, confidence
+
+
+def score_answers(key, answers):
+    """对单份答卷 {question_id: choice} 计分，返回 (type_code, score_detail, confidence)。"""
+    scores, counts = score_matrix(key, answers_to_row(key, answers))
+    return summarize(scores[0], counts[0])
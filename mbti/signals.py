@@ -0,0 +1,31 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import profiles, snapshot
+from .middleware import install_query_counter
+from .models import Question, Questionnaire, Result, TypeProfile
+from .pdf_cache import get_pdf_store
+
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=Questionnaire)
+def invalidate_questionnaire_snapshot(sender, **kwargs):
+    snapshot.invalidate()
+
+
+@receiver([post_save, post_delete], sender=TypeProfile)
+def invalidate_type_profiles(sender, **kwargs):
+    profiles.invalidate()
+
+
+@receiver(post_save, sender=Result)
+def discard_cached_reports(sender, instance, **kwargs):
+    # 缓存键按内容寻址，旧报告本就不会再命中；这里顺手释放该用户占用的空间
+    store = get_pdf_store()
+    if store:
+        store.delete_prefix(f"u{instance.user_id}-")
+
+
+# 每个线程的数据库连接在创建时挂上 SQL 计数钩子（MetricsMiddleware / count_queries）
+connection_created.connect(install_query_counter, dispatch_uid="mbti_query_counter")
@@ -0,0 +1,170 @@
+"""
+当前启用问卷的进程级快照。
+
+题库一年只改几次，却在每次翻页、提交时被读取。这里把启用问卷编译为不可变快照
+（有序题目、分页切片所需数据、计分键），只有在 Question/Questionnaire 的
+post_save/post_delete 信号触发后才重建（见 mbti/signals.py）。
+
+为了让多进程部署（多个 worker，以及在独立进程中运行的 import_questions 等管理命令）也能感知变更，
+失效时会在跨进程共享的缓存（settings.CACHES 中的 "mbti_generations"）中写入新的"代号"；
+各进程读取快照前比对代号，不一致即重建。未配置该缓存时退回 default，此时代号只在本进程可见。
+"""
+import gzip
+import hashlib
+import json
+import threading
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import cached_property
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .scoring import ScoringKey, compile_questions
+
+GENERATION_KEY = "mbti:questionnaire:generation"
+GENERATION_CACHE = "mbti_generations"
+PER_PAGE = 10
+
+# 模板只需要 id 与 text；其余字段用于编译计分键
+QuestionItem = namedtuple("QuestionItem", ["id", "text", "dimension", "keyed_pole", "weight"])
+
+
+@dataclass(frozen=True)
+class QuestionnaireSnapshot:
+    generation: str
+    questionnaire_id: object
+    questions: tuple
+    key: ScoringKey
+    version: str
+
+    @property
+    def question_ids(self):
+        return tuple(q.id for q in self.questions)
+
+    @cached_property
+    def positions(self):
+        """question_id -> 题目在问卷中的位置（答卷向量下标）"""
+        return {q.id: i for i, q in enumerate(self.questions)}
+
+    def __len__(self):
+        return len(self.questions)
+
+    @cached_property
+    def payload(self):
+        """
+        客户端渲染用的题目 JSON：{"version", "per_page", "questions": [[id, text], ...]}，
+        数组顺序即题目顺序；不含维度、方向、权重等计分信息。每个快照只序列化一次。
+        """
+        data = {
+            "version": self.version,
+            "per_page": PER_PAGE,
+            "questions": [[q.id, q.text] for q in self.questions],
+        }
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    @cached_property
+    def content_version(self):
+        """
+        payload 内容的摘要：题目文字变化也会改变，用作题目 JSON 的 ETag 与 ?v= 缓存键。
+
+        version 只覆盖顺序与计分键（改错别字不会让已保存的进度失效），不能用来标识 JSON 内容。
+        """
+        return hashlib.sha1(self.payload).hexdigest()[:16]
+
+    @cached_property
+    def payload_gzip(self):
+        # mtime=0 使压缩结果只取决于内容，各进程生成的字节完全一致
+        return gzip.compress(self.payload, compresslevel=9, mtime=0)
+
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def generation_cache():
+    """存放失效代号的缓存；也用于类型档案注册表（mbti/profiles.py）。"""
+    return caches[GENERATION_CACHE if GENERATION_CACHE in settings.CACHES else "default"]
+
+
+async def aget_generation(key):
+    """
+    在线程中读取失效代号，供异步视图使用。
+
+    共享缓存通常是 FileBasedCache，读取是阻塞的文件 I/O，不能在事件循环中直接执行；
+    读取不访问数据库，不必占用 thread_sensitive 的同步线程。
+    """
+    return await sync_to_async(generation_cache().get, thread_sensitive=False)(key)
+
+
+def _build(generation):
+    from .models import Question, Questionnaire
+
+    qnn_id = Questionnaire.objects.filter(is_active=True).values_list("id", flat=True).first()
+    questions = Question.objects.filter(active=True)
+    if qnn_id is not None:
+        questions = questions.filter(questionnaire_id=qnn_id)
+    items = tuple(
+        QuestionItem(*row)
+        for row in questions.order_by("order", "id").values_list("id", "text", "dimension", "keyed_pole", "weight")
+    )
+    rows = [(q.id, q.dimension, q.keyed_pole, q.weight) for q in items]
+    return QuestionnaireSnapshot(
+        generation=generation,
+        questionnaire_id=qnn_id,
+        questions=items,
+        key=compile_questions(rows),
+        version=compute_version(qnn_id, rows),
+    )
+
+
+def compute_version(questionnaire_id, rows):
+    """
+    问卷版本号：只取决于题目顺序与计分键，用于识别答卷向量、客户端缓存等是否仍然对齐。
+
+    rows 为按问卷顺序排列的 (id, dimension, keyed_pole, weight) 元组。
+    """
+    digest = hashlib.sha1(repr((questionnaire_id, [tuple(row) for row in rows])).encode())
+    return digest.hexdigest()[:16]
+
+
+def get_active_snapshot():
+    """返回当前启用问卷的快照；仅在失效后的首次访问时查询数据库。"""
+    global _snapshot
+    # 先读代号再读数据库：重建期间若有新的失效，快照会带着旧代号，下次访问即重建
+    cache = generation_cache()
+    generation = cache.get(GENERATION_KEY)
+    snapshot = _snapshot
+    if snapshot is not None and generation is not None and snapshot.generation == generation:
+        return snapshot
+    with _lock:
+        if generation is None:
+            cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+            generation = cache.get(GENERATION_KEY)
+        snapshot = _snapshot
+        if snapshot is None or snapshot.generation != generation:
+            snapshot = _build(generation)
+            _snapshot = snapshot
+    return snapshot
+
+
+async def aget_active_snapshot():
+    """get_active_snapshot() 的异步版本：快照有效时直接返回，需要重建时在线程中查询数据库。"""
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.generation == await aget_generation(GENERATION_KEY):
+        return snapshot
+    return await sync_to_async(get_active_snapshot)()
+
+
+def invalidate():
+    """标记快照失效；在事务提交后生效，避免其他线程读到未提交的数据并缓存下来。"""
+
+    def bump():
+        global _snapshot
+        generation_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+        _snapshot = None
+
+    transaction.on_commit(bump)
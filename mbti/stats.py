@@ -0,0 +1,137 @@
+"""
+结果统计的增量维护与看板查询。
+
+ResultStatistic 按 (问卷, 日期, 类型码) 分桶，保存人数与各维度得分的累计和、平方和。
+提交时在写入 Result 的同一事务内，对旧结果所在的分桶做减法、对新结果所在的分桶做加法
+（F() 表达式原地累加，不需要先读出），因此看板只需对这张小表做一次分组汇总，
+不再扫描 Result、也不再逐条解析 score_detail。批量重算、清理结果时同样按差量维护；
+出现偏差（例如在 admin 中直接删除了结果）时用 ``rebuild_stats`` 命令重建。
+"""
+import datetime
+import math
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import ResultStatistic
+from .scoring import DIMENSIONS
+
+SUM_FIELDS = tuple(f"sum_{dim.lower()}" for dim in DIMENSIONS)
+SUMSQ_FIELDS = tuple(f"sumsq_{dim.lower()}" for dim in DIMENSIONS)
+VALUE_FIELDS = ("count",) + SUM_FIELDS + SUMSQ_FIELDS
+
+
+class StatsDelta:
+    """累积若干条结果的增减，按分桶合并后一次写入；同一分桶的加减会先在内存中抵消。"""
+
+    def __init__(self):
+        self._rows = {}
+
+    def add(self, questionnaire_id, created_at, type_code, score_detail, sign=1):
+        key = (questionnaire_id, timezone.localdate(created_at), type_code)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = [0] * len(VALUE_FIELDS)
+        row[0] += sign
+        detail = score_detail or {}
+        for i, dim in enumerate(DIMENSIONS):
+            value = float(detail.get(dim) or 0)
+            row[1 + i] += sign * value
+            row[1 + len(DIMENSIONS) + i] += sign * value * value
+
+    def add_result(self, result, sign=1):
+        self.add(result.questionnaire_id, result.created_at, result.type_code, result.score_detail, sign)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def apply(self):
+        """把差量累加到统计表；调用方负责与 Result 的写入放在同一事务中。"""
+        for key, row in self._rows.items():
+            if any(row):
+                _increment(key, row)
+        self._rows.clear()
+
+    def instances(self):
+        """以差量为全量构造统计行，供重建时批量插入。"""
+        return [
+            ResultStatistic(questionnaire_id=qnn_id, day=day, type_code=code, **dict(zip(VALUE_FIELDS, row)))
+            for (qnn_id, day, code), row in self._rows.items()
+            if row[0]
+        ]
+
+
+def _increment(key, row):
+    qnn_id, day, type_code = key
+    bucket = ResultStatistic.objects.filter(questionnaire_id=qnn_id, day=day, type_code=type_code)
+    increments = {name: F(name) + value for name, value in zip(VALUE_FIELDS, row)}
+    if bucket.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            ResultStatistic.objects.create(
+                questionnaire_id=qnn_id, day=day, type_code=type_code, **dict(zip(VALUE_FIELDS, row))
+            )
+    except IntegrityError:
+        # 并发提交抢先创建了同一分桶：改为累加
+        bucket.update(**increments)
+
+
+def _moments(count, total, total_sq):
+    if count <= 0:
+        return None, None
+    mean = total / count
+    return mean, math.sqrt(max(total_sq / count - mean * mean, 0.0))
+
+
+def dashboard(questionnaire_id=None, days=30):
+    """
+    看板数据：类型分布（含各类型的维度均值）、各维度总体均值/标准差、最近 days 天的每日提交数。
+
+    只对统计表做两次分组查询，开销取决于分桶数（类型 × 天数），与测试人数无关。
+    """
+    rows = ResultStatistic.objects.all()
+    if questionnaire_id is not None:
+        rows = rows.filter(questionnaire_id=questionnaire_id)
+
+    totals = {name: Sum(name) for name in VALUE_FIELDS}
+    by_type = list(rows.values("type_code").annotate(**{f"t_{k}": v for k, v in totals.items()}).order_by())
+    total = sum(row["t_count"] or 0 for row in by_type)
+
+    types = []
+    overall = [0.0] * (2 * len(DIMENSIONS))
+    for row in by_type:
+        count = row["t_count"] or 0
+        if count <= 0:
+            continue
+        sums = [row[f"t_{name}"] or 0.0 for name in SUM_FIELDS]
+        squares = [row[f"t_{name}"] or 0.0 for name in SUMSQ_FIELDS]
+        for i in range(len(DIMENSIONS)):
+            overall[i] += sums[i]
+            overall[len(DIMENSIONS) + i] += squares[i]
+        types.append({
+            "type_code": row["type_code"],
+            "count": count,
+            "share": count / total if total else 0.0,
+            "means": [value / count for value in sums],
+        })
+    types.sort(key=lambda item: (-item["count"], item["type_code"]))
+
+    dimensions = []
+    for i, dim in enumerate(DIMENSIONS):
+        mean, std = _moments(total, overall[i], overall[len(DIMENSIONS) + i])
+        dimensions.append({"dimension": dim, "mean": mean, "std": std})
+
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    daily = {
+        row["day"]: row["t_count"] or 0
+        for row in rows.filter(day__gte=since).values("day").annotate(t_count=Sum("count")).order_by()
+    }
+    calendar = [since + datetime.timedelta(days=i) for i in range(days)]
+    return {
+        "total": total,
+        "types": types,
+        "dimensions": dimensions,
+        "daily": [(day, daily.get(day, 0)) for day in calendar],
+    }
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import override_settings
+
+from mbti.models import Attempt, Result, TestProgress
+from mbti.snapshot import aget_active_snapshot
+
+from .test_views import FAKE_PDF
+from .utils import MbtiTestCase
+
+
+@override_settings(ROOT_URLCONF="mbti.tests.urls_async")
+class AsyncViewTests(MbtiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.user)
+        self.key = f"q_{self.questions[0].id}"
+
+    def asave(self, changes, rev, flush=False):
+        return self.async_client.post(
+            "/save-progress/", {"changes": changes, "rev": rev, "flush": flush}, content_type="application/json",
+        )
+
+    @staticmethod
+    @sync_to_async
+    def pending_callbacks():
+        """
+        测试事务中挂起的 on_commit 回调数。
+
+        视图的同步部分在测试事务所在的主线程中运行，事件循环线程里的 captureOnCommitCallbacks 看不到这些回调。
+        """
+        return len(connection.run_on_commit)
+
+    @staticmethod
+    @sync_to_async
+    def run_on_commit_callbacks(start):
+        for _, callback, _ in connection.run_on_commit[start:]:
+            callback()
+
+    async def test_save_progress_protocol(self):
+        response = await self.asave({self.key: 3}, rev=1, flush=True)
+        self.assertEqual(response.json(), {"status": "success", "revision": 1})
+        self.assertEqual(await TestProgress.objects.filter(user=self.user).acount(), 1)
+
+        response = await self.asave({self.key: 3}, rev=2)
+        self.assertEqual(response.json(), {"status": "noop", "revision": 2})
+        response = await self.asave({self.key: 5}, rev=2)
+        self.assertEqual((response.status_code, response.json()["revision"]), (409, 2))
+
+    async def test_submit_merges_stored_progress(self):
+        await self.asave({f"q_{q.id}": 4 for q in self.questions[:4]}, rev=1, flush=True)
+        posted = {f"q_{q.id}": "2" for q in self.questions[4:]}
+        start = await self.pending_callbacks()
+        response = await self.async_client.post("/submit/", posted)
+
+        self.assertEqual((response.status_code, response["Location"]), (302, "/result/"))
+        self.assertEqual(await Result.objects.filter(user=self.user).acount(), 1)
+        attempt = await Attempt.objects.select_related("version").aget(user=self.user)
+        self.assertEqual(attempt.choices(), [4] * 4 + [2] * 4)
+        # 进度在事务提交后清除
+        await self.run_on_commit_callbacks(start)
+        self.assertEqual((await self.store.aread(self.user.id, await aget_active_snapshot()))[0], {})
+
+    async def test_incomplete_submit_saves_progress(self):
+        response = await self.async_client.post("/submit/", {self.key: "5"})
+        self.assertEqual((response.status_code, response["Location"]), (302, "/test/"))
+        self.assertFalse(await Result.objects.filter(user=self.user).aexists())
+        self.assertEqual(await TestProgress.objects.filter(user=self.user).acount(), 1)
+
+    async def test_result_page_and_pdf_revalidate(self):
+        response = await self.async_client.get("/result/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        response = await self.async_client.get("/result/pdf/")
+        self.assertEqual((response.status_code, response["Location"]), (302, "/test/"))
+
+        await self.async_client.post("/submit/", self.answers(5))
+        await self.async_client.get("/result/")
+        etag = (await self.async_client.get("/result/"))["ETag"]
+        response = await self.async_client.get("/result/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        with mock.patch("mbti.views.render_result_pdf", return_value=FAKE_PDF) as render:
+            response = await self.async_client.get("/result/pdf/")
+            self.assertEqual((response.status_code, response.content), (200, FAKE_PDF))
+            response = await self.async_client.get("/result/pdf/", headers={"if-none-match": response["ETag"]})
+            self.assertEqual(response.status_code, 304)
+        self.assertEqual(render.call_count, 1)
+
+    async def test_requires_login(self):
+        await self.async_client.alogout()
+        response = await self.asave({self.key: 3}, rev=1)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("/users/login/"))
@@ -0,0 +1,234 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+
+from mbti.attempts import record_attempt
+from mbti.models import Attempt, Question, Questionnaire, Response, Result, ResultStatistic, TypeProfile
+from mbti.profiles import get_profile
+from mbti.scoring import score_answers
+from mbti.snapshot import get_active_snapshot
+from mbti.stats import StatsDelta
+
+from .utils import MbtiTestCase, make_questionnaire
+
+
+def run_command(name, *args):
+    out = StringIO()
+    call_command(name, *args, stdout=out)
+    return out.getvalue()
+
+
+class CommandTestCase(MbtiTestCase):
+    def temp_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+
+class RescoreResultsTests(MbtiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.snapshot = get_active_snapshot()
+        self.sheet = {q.id: (5, 4, 2, 1)[i % 4] for i, q in enumerate(self.questions)}
+
+    def submit(self, user, answers, type_code=None):
+        """模拟一次提交：写入 Result、统计与作答记录；type_code 用于制造需要重算的旧结果。"""
+        code, detail, confidence = score_answers(self.snapshot.key, answers)
+        if type_code is not None:
+            code, detail, confidence = type_code, {"IE": 1.0}, {"IE": 0.5}
+        result = Result.objects.create(
+            user=user, questionnaire=self.questionnaire, type_code=code, score_detail=detail, confidence=confidence,
+        )
+        stats = StatsDelta()
+        stats.add_result(result)
+        stats.apply()
+        if answers:
+            record_attempt(user.id, self.snapshot, answers, code, detail, confidence)
+        return result
+
+    def rescore(self, *args):
+        return run_command("rescore_results", *args)
+
+    def test_applies_changed_keys(self):
+        result = self.submit(self.user, self.sheet)
+        Question.objects.filter(dimension="IE").update(keyed_pole="I")
+        output = self.rescore()
+
+        result.refresh_from_db()
+        flipped = {**result.score_detail}
+        self.assertIn("1 updated; 0 skipped", output)
+        expected = score_answers(self.snapshot.key, self.sheet)[1]
+        self.assertEqual(flipped["IE"], -expected["IE"])
+        self.assertEqual(flipped["SN"], expected["SN"])
+        bucket = ResultStatistic.objects.get(type_code=result.type_code)
+        self.assertEqual((bucket.count, bucket.sum_ie), (1, flipped["IE"]))
+
+    def test_dry_run_writes_nothing(self):
+        result = self.submit(self.user, self.sheet, type_code="ESTJ")
+        self.assertIn("1 would change", self.rescore("--dry-run"))
+        result.refresh_from_db()
+        self.assertEqual(result.type_code, "ESTJ")
+
+    def test_skips_users_without_answers(self):
+        result = self.submit(self.user, {}, type_code="ENFP")
+        self.assertIn("0 updated; 1 skipped", self.rescore())
+        result.refresh_from_db()
+        self.assertEqual((result.type_code, result.score_detail), ("ENFP", {"IE": 1.0}))
+
+    def test_skips_empty_attempts(self):
+        result = self.submit(self.user, {}, type_code="ENFP")
+        record_attempt(self.user.id, self.snapshot, {}, "ENFP", {}, {})
+        self.assertIn("1 skipped", self.rescore())
+        result.refresh_from_db()
+        self.assertEqual(result.type_code, "ENFP")
+
+    def test_scores_against_the_attempts_own_questions(self):
+        result = self.submit(self.user, self.sheet)
+        expected = (result.type_code, result.score_detail, result.confidence)
+        # 换一套题并停用旧题（import_questions 的效果）：旧作答仍按作答时的题目计分
+        Question.objects.update(active=False)
+        self.questionnaire.is_active = False
+        self.questionnaire.save()
+        make_questionnaire(key="replacement")
+
+        self.assertIn("0 updated; 0 skipped", self.rescore())
+        result.refresh_from_db()
+        self.assertEqual((result.type_code, result.score_detail, result.confidence), expected)
+
+    def test_skips_sheets_with_deleted_questions(self):
+        result = self.submit(self.user, self.sheet, type_code="ENFP")
+        Question.objects.filter(pk=self.questions[0].pk).delete()
+        self.assertIn("1 skipped", self.rescore())
+        result.refresh_from_db()
+        self.assertEqual(result.type_code, "ENFP")
+
+    def test_falls_back_to_legacy_responses(self):
+        legacy = User.objects.create_user("legacy")
+        result = self.submit(legacy, {}, type_code="ENFP")
+        Response.objects.bulk_create(
+            Response(user=legacy, question_id=qid, choice=choice, questionnaire=self.questionnaire)
+            for qid, choice in self.sheet.items()
+        )
+        self.assertIn("1 updated; 0 skipped", self.rescore())
+        result.refresh_from_db()
+        self.assertEqual(result.type_code, score_answers(self.snapshot.key, self.sheet)[0])
+
+
+class ImportQuestionsTests(CommandTestCase):
+    ROWS = [
+        ("我喜欢热闹的聚会", "IE", "E", 1),
+        ("我更相信经验", "SN", "S", 1),
+        ("我做决定时看重逻辑", "TF", "T", 2),
+    ]
+
+    def write_csv(self, rows):
+        lines = ["text,dimension,keyed_pole,weight,order"]
+        lines += [f"{text},{dimension},{pole},{weight},{i}" for i, (text, dimension, pole, weight) in enumerate(rows)]
+        return self.temp_file("questions.csv", "\n".join(lines) + "\n")
+
+    def sync(self, rows, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            return run_command("import_questions", self.write_csv(rows), "--key", "imported", *args)
+
+    def test_first_import_creates_and_activates(self):
+        output = self.sync(self.ROWS)
+        self.assertIn("3 inserts, 0 updates, 0 deactivations, 0 unchanged", output)
+        imported = Questionnaire.objects.get(key="imported")
+        self.assertEqual(list(Questionnaire.objects.filter(is_active=True)), [imported])
+        # 事务提交后快照失效，下一次读取即是新题库
+        self.assertEqual(
+            get_active_snapshot().question_ids,
+            tuple(Question.objects.filter(questionnaire=imported).order_by("order").values_list("id", flat=True)),
+        )
+
+    def test_resync_applies_only_the_diff(self):
+        self.sync(self.ROWS)
+        rows = [self.ROWS[0], ("我更相信经验", "SN", "N", 1), ("我常常提前计划", "JP", "J", 1)]
+        output = self.sync(rows)
+        self.assertIn("1 inserts, 1 updates, 1 deactivations, 1 unchanged", output)
+        questions = dict(Question.objects.filter(questionnaire__key="imported").values_list("text", "active"))
+        self.assertEqual(len(questions), 4)
+        self.assertFalse(questions["我做决定时看重逻辑"])
+        self.assertEqual(Question.objects.get(text="我更相信经验").keyed_pole, "N")
+
+    def test_dry_run_and_no_activate(self):
+        self.assertIn("Would apply: 3 inserts", self.sync(self.ROWS, "--dry-run"))
+        self.assertFalse(Questionnaire.objects.filter(key="imported").exists())
+        self.sync(self.ROWS, "--no-activate")
+        self.assertEqual(Questionnaire.objects.get(is_active=True), self.questionnaire)
+
+    def test_invalid_rows_change_nothing(self):
+        rows = [self.ROWS[0], ("维度写错了", "XY", "X", 1), ("权重写错了", "IE", "E", 0)]
+        with self.assertRaisesMessage(CommandError, "2 invalid rows"):
+            self.sync(rows)
+        self.assertFalse(Questionnaire.objects.filter(key="imported").exists())
+
+
+class SyncTypeProfilesTests(CommandTestCase):
+    def write_profiles(self, version, profiles):
+        return self.temp_file("profiles.json", json.dumps({"version": version, "profiles": profiles}))
+
+    def sync(self, path, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            return run_command("sync_type_profiles", path, *args)
+
+    def test_creates_then_updates_only_changed_profiles(self):
+        profiles = {"INTJ": {"name": "建筑师", "strengths": "规划"}, "ENFP": {"name": "竞选者"}}
+        self.assertIn("2 created, 0 updated, 0 unchanged", self.sync(self.write_profiles(1, profiles)))
+        self.assertEqual(get_profile("INTJ").strengths, "规划")
+
+        self.assertIn("0 created, 0 updated, 2 unchanged", self.sync(self.write_profiles(1, profiles)))
+
+        profiles["INTJ"]["strengths"] = "长远规划"
+        output = self.sync(self.write_profiles(2, profiles))
+        self.assertIn("~ INTJ: strengths", output)
+        self.assertIn("0 created, 1 updated, 1 unchanged", output)
+        # 注册表在事务提交后失效，读到的是新内容
+        self.assertEqual(get_profile("INTJ").strengths, "长远规划")
+
+    def test_dry_run_and_untouched_profiles(self):
+        TypeProfile.objects.create(code="ISTP", name="鉴赏家")
+        output = self.sync(self.write_profiles(1, {"INTJ": {"name": "建筑师"}}), "--dry-run")
+        self.assertIn("? ISTP is not in the data file", output)
+        self.assertIn("Would sync type profiles v1: 1 created", output)
+        self.assertFalse(TypeProfile.objects.filter(code="INTJ").exists())
+
+    def test_rejects_invalid_files(self):
+        with self.assertRaisesMessage(CommandError, "invalid type code"):
+            self.sync(self.write_profiles(1, {"ABCD": {}}))
+        with self.assertRaisesMessage(CommandError, "unknown fields"):
+            self.sync(self.write_profiles(1, {"INTJ": {"motto": ""}}))
+
+
+class PurgeResultsTests(MbtiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user("other")
+        for user, choice in ((self.user, 5), (self.other, 1)):
+            self.client.force_login(user)
+            self.client.post("/submit/", self.answers(choice))
+
+    def test_purges_one_user_in_batches_and_keeps_statistics(self):
+        kept = Result.objects.get(user=self.other).type_code
+        output = run_command("purge_results", "--user", "taker", "--batch-size", "1")
+        self.assertIn("Purged 0 responses, 1 results and 1 attempts.", output)
+        self.assertEqual(list(Result.objects.values_list("user_id", flat=True)), [self.other.id])
+        self.assertEqual(list(Attempt.objects.values_list("user_id", flat=True)), [self.other.id])
+        # 减到 0 的统计分桶被删除
+        self.assertEqual(dict(ResultStatistic.objects.values_list("type_code", "count")), {kept: 1})
+
+    def test_dry_run_counts_only(self):
+        output = run_command("purge_results", "--dry-run")
+        self.assertIn("Would delete 0 responses, 2 results and 2 attempts.", output)
+        self.assertEqual(Result.objects.count(), 2)
+
+    def test_unknown_user_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "Unknown users: nobody"):
+            run_command("purge_results", "--user", "nobody")
+        self.assertEqual(Result.objects.count(), 2)
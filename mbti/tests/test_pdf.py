@@ -0,0 +1,98 @@
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from mbti.pdf_cache import FileSystemPdfStore
+from mbti.pdf_jobs import DONE, FAILED, PdfJobQueue, QueueFull
+
+from .utils import MbtiTestCase
+
+
+def temp_store(test):
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return FileSystemPdfStore(directory.name)
+
+
+class FileSystemPdfStoreTests(SimpleTestCase):
+    def test_overwrite_counts_only_the_difference(self):
+        store = temp_store(self)
+        store.set("a", b"x" * 100)
+        store.set("b", b"x" * 50)
+        for _ in range(3):
+            store.set("a", b"x" * 80)
+        self.assertEqual(store._size, 130)
+        self.assertEqual(store._size, store._scan_size())
+
+    def test_repeated_overwrites_do_not_scan_for_eviction(self):
+        store = temp_store(self)
+        store.max_bytes = 250
+        store.set("a", b"x" * 100)
+        store.set("b", b"x" * 100)
+        with mock.patch.object(store, "_evict") as evict:
+            for _ in range(5):
+                store.set("b", b"x" * 100)
+        evict.assert_not_called()
+
+
+class PdfJobQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.store = temp_store(self)
+        patcher = mock.patch("mbti.pdf_jobs.get_pdf_store", return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = PdfJobQueue(workers=1)
+        self.addCleanup(self.queue._executor.shutdown)
+
+    def wait(self, job_id):
+        self.queue._jobs[job_id].exception(timeout=5)
+
+    def test_done_job_is_read_from_the_store(self):
+        self.queue.submit("u1-a", lambda: b"%PDF")
+        self.wait("u1-a")
+        self.assertEqual(self.queue.status("u1-a"), DONE)
+        self.assertEqual(self.store.get("u1-a"), b"%PDF")
+
+    def test_failure_is_logged_once_by_the_worker(self):
+        def render():
+            raise ValueError("broken font")
+
+        with self.assertLogs("mbti.pdf_jobs", "ERROR") as logs:
+            self.queue.submit("u1-b", render)
+            self.wait("u1-b")
+        self.assertEqual(len(logs.records), 1)
+        with self.assertNoLogs("mbti.pdf_jobs"):
+            self.assertEqual([self.queue.status("u1-b") for _ in range(3)], [FAILED] * 3)
+
+    def test_requires_a_store(self):
+        with mock.patch("mbti.pdf_jobs.get_pdf_store", return_value=None):
+            with self.assertRaises(ImproperlyConfigured):
+                self.queue.submit("u1-c", lambda: b"%PDF")
+            self.assertIsNone(self.queue.status("u1-c"))
+        self.assertEqual(self.queue._jobs, {})
+
+
+class PdfBusyTests(MbtiTestCase):
+    def setUp(self):
+        super().setUp()
+        queue = mock.Mock(submit=mock.Mock(side_effect=QueueFull))
+        for patcher in (
+            mock.patch("mbti.views.get_job_queue", return_value=queue),
+            mock.patch("mbti.views.get_pdf_store", return_value=temp_store(self)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client.post("/submit/", self.answers(5))
+
+    def test_busy_is_a_503_without_an_error_log(self):
+        with self.assertNoLogs("django.request"):
+            response = self.client.get("/result/pdf/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "busy", "fallback_url": "/result/"})
+        self.assertEqual(response["Retry-After"], "10")
+
+    def test_busy_page_request_falls_back_to_the_result_page(self):
+        response = self.client.get("/result/pdf/")
+        self.assertRedirects(response, "/result/", fetch_redirect_response=False)
@@ -0,0 +1,134 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from mbti import snapshot
+from mbti.models import TestProgress
+from mbti.progress import APPLIED, NOOP, STALE, ProgressStore
+
+from .utils import MbtiTestCase, make_questionnaire
+
+
+class ProgressStoreTests(TestCase):
+    """两个 ProgressStore 实例模拟两个 worker 进程，共享同一张 TestProgress 表。"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("progress")
+        _, self.questions, self.snapshot = make_questionnaire()
+        self.q1, self.q2, self.q3 = (q.id for q in self.questions[:3])
+        self.a = ProgressStore(flush_interval=3600)
+        self.b = ProgressStore(flush_interval=3600)
+
+    def update(self, store, answers, revision, flush=False):
+        return store.update(self.user.id, self.snapshot, answers, revision=revision, flush=flush)
+
+    def stored(self):
+        row = TestProgress.objects.get(user=self.user)
+        answers = {q.id: row.answers[i] for i, q in enumerate(self.questions) if row.answers[i]}
+        return answers, row.revision
+
+    def test_delta_noop_and_stale(self):
+        self.assertEqual(self.update(self.a, {self.q1: 3}, 1), (APPLIED, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.update(self.a, {self.q1: 3}, 2), (NOOP, 2))
+            self.assertEqual(self.update(self.a, {self.q2: 5}, 2), (STALE, 2))
+        self.a.flush()
+        # NOOP 只推进修订号，随下一次落库写出
+        self.assertEqual(self.stored(), ({self.q1: 3}, 2))
+        self.assertEqual(self.a.read(self.user.id, self.snapshot), ({self.q1: 3}, 2))
+
+    def test_clean_entry_reloads_before_applying(self):
+        self.update(self.a, {self.q1: 3}, 1, flush=True)
+        self.update(self.b, {self.q2: 4}, 2, flush=True)
+        # a 的条目已落库（干净），应用增量前要读到 b 写入的 q2 与修订号
+        self.assertEqual(self.update(self.a, {self.q3: 5}, 3, flush=True), (APPLIED, 3))
+        self.assertEqual(self.stored(), ({self.q1: 3, self.q2: 4, self.q3: 5}, 3))
+        self.assertEqual(self.update(self.b, {self.q1: 6}, 3), (STALE, 3))
+
+    def test_dirty_entries_merge_on_flush(self):
+        self.update(self.a, {self.q1: 3}, 1)
+        self.update(self.b, {self.q2: 4}, 2, flush=True)
+        self.a.flush()
+        answers, revision = self.stored()
+        self.assertEqual(answers, {self.q1: 3, self.q2: 4})
+        self.assertGreater(revision, 2)
+        self.assertEqual(self.a.read(self.user.id, self.snapshot), (answers, revision))
+
+    def test_same_question_keeps_higher_revision(self):
+        self.update(self.a, {self.q1: 3, self.q3: 1}, 1)
+        self.update(self.b, {self.q1: 6}, 2, flush=True)
+        self.a.flush()
+        self.assertEqual(self.stored()[0], {self.q1: 6, self.q3: 1})
+
+    def test_revision_never_goes_back(self):
+        self.update(self.a, {self.q1: 3}, 1)
+        self.update(self.b, {self.q2: 4}, 2, flush=True)
+        self.update(self.b, {self.q3: 5}, 3, flush=True)
+        self.a.flush()
+        self.assertEqual(self.stored(), ({self.q1: 3, self.q2: 4, self.q3: 5}, 4))
+
+    def test_clear_in_other_process_drops_pending_changes(self):
+        self.update(self.a, {self.q1: 3}, 1, flush=True)
+        self.update(self.a, {self.q2: 4}, 2)
+        self.b.clear(self.user.id)
+        self.a.flush()
+        self.assertFalse(TestProgress.objects.filter(user=self.user).exists())
+        self.assertEqual(self.a.read(self.user.id, self.snapshot), ({}, 0))
+
+    def test_flush_request_behind_other_worker_is_stale(self):
+        self.update(self.a, {self.q1: 3}, 1)
+        self.update(self.b, {self.q2: 4}, 5, flush=True)
+        # a 的条目有未落库修改，内存里的修订号还是 1；落库时发现库中已是 5
+        status, current = self.update(self.a, {self.q3: 2}, 4, flush=True)
+        self.assertEqual(status, STALE)
+        answers, revision = self.stored()
+        self.assertEqual(current, revision)
+        self.assertGreater(revision, 5)
+        self.assertEqual(answers, {self.q1: 3, self.q2: 4, self.q3: 2})
+
+    def test_flush_request_ahead_of_other_worker_applies(self):
+        self.update(self.a, {self.q1: 3}, 1)
+        self.update(self.b, {self.q2: 4}, 2, flush=True)
+        self.assertEqual(self.update(self.a, {self.q3: 2}, 3, flush=True), (APPLIED, 3))
+        self.assertEqual(self.stored(), ({self.q1: 3, self.q2: 4, self.q3: 2}, 3))
+
+
+class SaveProgressViewTests(MbtiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.key = f"q_{self.questions[0].id}"
+
+    def test_delta_noop_and_stale(self):
+        response = self.save({self.key: 3}, rev=1, flush=True)
+        self.assertEqual(response.json(), {"status": "success", "revision": 1})
+        self.assertEqual(TestProgress.objects.get(user=self.user).revision, 1)
+
+        response = self.save({self.key: 3}, rev=2)
+        self.assertEqual(response.json(), {"status": "noop", "revision": 2})
+
+        response = self.save({self.key: 5}, rev=2)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {"status": "stale", "revision": 2})
+        self.assertEqual(self.store.answers(self.user.id, snapshot.get_active_snapshot()), {self.questions[0].id: 3})
+
+    def test_stale_against_revision_written_by_other_worker(self):
+        self.save({self.key: 3}, rev=1, flush=True)
+        other = ProgressStore(flush_interval=3600)
+        other.update(self.user.id, snapshot.get_active_snapshot(), {self.questions[1].id: 4}, revision=7, flush=True)
+        response = self.save({self.key: 6}, rev=3, flush=True)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["revision"], 7)
+
+    def test_ignores_unknown_questions_and_out_of_range_choices(self):
+        response = self.save({self.key: 9, "q_999999": 3, "other": 1}, rev=1, flush=True)
+        self.assertEqual(response.json()["status"], "noop")
+        self.assertFalse(TestProgress.objects.filter(user=self.user).exists())
+
+    def test_legacy_answers_payload(self):
+        response = self.client.post(
+            "/save-progress/", {"answers": {self.key: "4"}}, content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"status": "success", "revision": 1})
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.save({self.key: 3}, rev=1).status_code, 302)
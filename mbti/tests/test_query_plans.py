@@ -0,0 +1,16 @@
+from django.db import connection
+from django.test import TestCase
+
+from mbti.management.commands.check_query_plans import SCAN_PATTERNS, full_scans, hot_queries
+
+
+class QueryPlanTests(TestCase):
+    """热点查询不能退化为全表扫描（与 ``check_query_plans`` 命令使用同一份查询清单）。"""
+
+    def test_hot_queries_use_an_index(self):
+        if connection.vendor not in SCAN_PATTERNS:
+            self.skipTest(f"no scan detection for {connection.vendor}")
+        for name, queryset in hot_queries():
+            with self.subTest(name):
+                plan, scans = full_scans(queryset)
+                self.assertEqual(scans, [], f"{name} scans {scans}:\n{plan}")
@@ -0,0 +1,91 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from mbti.item_analysis import ItemAccumulator
+from mbti.scoring import LIKERT_MIDPOINT, MISSING, compile_questions, pack_answers, unpack_answers
+
+
+class PackAnswersTests(SimpleTestCase):
+    def test_round_trip(self):
+        choices = [1, 7, MISSING, 4, 15, 0, 2]
+        data = pack_answers(choices)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(unpack_answers(data, len(choices)).tolist(), choices)
+
+    def test_nibble_layout(self):
+        # 高 4 位在前；奇数长度用 MISSING 补齐最后一个字节
+        self.assertEqual(pack_answers([1, 2, 3]), bytes([0x12, 0x30]))
+
+    def test_unpack_truncates_to_length(self):
+        data = pack_answers([5, 6, 7, 1])
+        self.assertEqual(unpack_answers(data, 3).tolist(), [5, 6, 7])
+
+    def test_empty(self):
+        self.assertEqual(pack_answers([]), b"")
+        self.assertEqual(unpack_answers(b"", 0).tolist(), [])
+
+    def test_out_of_range(self):
+        for value in (-1, 16):
+            with self.subTest(value), self.assertRaises(ValueError):
+                pack_answers([1, value])
+
+
+class ItemAccumulatorTests(SimpleTestCase):
+    def setUp(self):
+        # IE 维度 4 题（第 3 题反向计分），SN 维度 1 题（题目不足，不计算 alpha）
+        self.key = compile_questions([
+            (1, "IE", "E", 1), (2, "IE", "E", 1), (3, "IE", "I", 2), (4, "IE", "E", 1), (5, "SN", "N", 1),
+        ])
+        rng = np.random.default_rng(20)
+        trait = rng.normal(size=(200, 1))
+        raw = np.clip(np.rint(LIKERT_MIDPOINT + 1.5 * trait * [1, 1, -1, 1, 0] + rng.normal(size=(200, 5))), 1, 5)
+        self.matrix = raw.astype(np.int8)
+        self.matrix[::17, 1] = MISSING
+
+    def test_merge_matches_single_pass(self):
+        whole_items, whole_alphas = ItemAccumulator(self.key).update(self.matrix).results()
+        left = ItemAccumulator(self.key).update(self.matrix[:73])
+        right = ItemAccumulator(self.key).update(self.matrix[73:])
+        items, alphas = left.merge(right).results()
+        self.assertEqual(alphas.keys(), whole_alphas.keys())
+        for dim, alpha in whole_alphas.items():
+            if alpha is None:
+                self.assertIsNone(alphas[dim])
+            else:
+                self.assertAlmostEqual(alphas[dim], alpha)
+        for qid, item in whole_items.items():
+            for name, value in item.items():
+                with self.subTest(qid=qid, metric=name):
+                    if value is None:
+                        self.assertIsNone(items[qid][name])
+                    else:
+                        self.assertAlmostEqual(items[qid][name], value)
+
+    def test_matches_direct_computation(self):
+        items, alphas = ItemAccumulator(self.key).update(self.matrix).results()
+
+        answered = self.matrix[:, 1] != MISSING
+        column = self.matrix[answered, 1].astype(float)
+        self.assertEqual(items[2]["responses"], answered.sum())
+        self.assertAlmostEqual(items[2]["mean"], column.mean())
+        self.assertAlmostEqual(items[2]["variance"], column.var(ddof=1))
+
+        # 只用 IE 维度全部作答的样本，按方向定向
+        complete = (self.matrix[:, :4] != MISSING).all(axis=1)
+        keyed = (self.matrix[complete, :4].astype(float) - LIKERT_MIDPOINT) * [1, 1, -1, 1]
+        k = keyed.shape[1]
+        expected_alpha = k / (k - 1) * (1 - keyed.var(axis=0, ddof=1).sum() / keyed.sum(axis=1).var(ddof=1))
+        self.assertAlmostEqual(alphas["IE"], expected_alpha)
+        for j, qid in enumerate((1, 2, 3, 4)):
+            rest = np.delete(keyed, j, axis=1)
+            with self.subTest(qid=qid):
+                self.assertAlmostEqual(items[qid]["item_total_r"], np.corrcoef(keyed[:, j], rest.sum(axis=1))[0, 1])
+                self.assertGreater(items[qid]["item_total_r"], 0)
+                rest_alpha = (k - 1) / (k - 2) * (
+                    1 - rest.var(axis=0, ddof=1).sum() / rest.sum(axis=1).var(ddof=1)
+                )
+                self.assertAlmostEqual(items[qid]["alpha_if_deleted"], rest_alpha)
+
+        self.assertIsNone(alphas["SN"])
+        self.assertIsNone(alphas["TF"])
+        self.assertIsNone(items[5]["item_total_r"])
@@ -0,0 +1,46 @@
+import asyncio
+from unittest import mock
+
+from django.test import TestCase
+
+from mbti import profiles, snapshot
+from mbti.models import Question, Questionnaire, TypeProfile
+from mbti.snapshot import _build
+
+from .utils import MbtiTestCase
+
+
+class SnapshotVersionTests(TestCase):
+    def test_text_change_moves_content_version_only(self):
+        qnn = Questionnaire.objects.create(key="snap", name="snap")
+        question = Question.objects.create(questionnaire=qnn, text="原文", dimension="IE", keyed_pole="E")
+        before = _build("a")
+        question.text = "改过的题目"
+        question.save()
+        after = _build("b")
+        # 进度向量只看顺序与计分键；题目 JSON 的缓存键必须随文字变化
+        self.assertEqual(after.version, before.version)
+        self.assertNotEqual(after.content_version, before.content_version)
+
+
+class AsyncGenerationTests(MbtiTestCase):
+    async def test_stamps_are_read_off_the_event_loop(self):
+        cache = snapshot.generation_cache()
+        read = cache.get
+        loops = []
+
+        def get(key, *args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return read(key, *args, **kwargs)
+
+        active = await snapshot.aget_active_snapshot()
+        await TypeProfile.objects.acreate(code="INTJ", name="建筑师")
+        await profiles.aget_profile("INTJ")
+        with mock.patch.object(cache, "get", get):
+            # 快照与档案注册表都已载入：只需比对代号
+            self.assertIs(await snapshot.aget_active_snapshot(), active)
+            self.assertEqual((await profiles.aget_profile("INTJ")).name, "建筑师")
+        self.assertEqual(loops, [None, None])
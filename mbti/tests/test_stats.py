@@ -0,0 +1,50 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from mbti.models import Questionnaire, ResultStatistic
+from mbti.stats import StatsDelta
+
+
+class StatsDeltaTests(TestCase):
+    def setUp(self):
+        self.qnn = Questionnaire.objects.create(key="stats", name="stats")
+        self.now = timezone.now()
+
+    def test_add_and_subtract_cancel(self):
+        delta = StatsDelta()
+        detail = {"IE": 2.0, "SN": -1.0, "TF": 0.5, "JP": 0}
+        delta.add(self.qnn.id, self.now, "ENFP", detail)
+        delta.add(self.qnn.id, self.now, "ENFP", detail, sign=-1)
+        self.assertEqual(delta.instances(), [])
+        delta.apply()
+        self.assertFalse(ResultStatistic.objects.exists())
+
+    def test_apply_creates_then_increments(self):
+        delta = StatsDelta()
+        delta.add(self.qnn.id, self.now, "INTJ", {"IE": -3.0, "SN": 2.0, "TF": -1.0, "JP": -2.0})
+        delta.add(self.qnn.id, self.now, "INTJ", {"IE": -1.0, "SN": 4.0, "TF": -5.0, "JP": -2.0})
+        self.assertEqual(len(delta), 1)
+        delta.apply()
+        self.assertEqual(len(delta), 0)
+
+        # 换类型：旧分桶减一条，新分桶加一条
+        delta.add(self.qnn.id, self.now, "INTJ", {"IE": -1.0, "SN": 4.0, "TF": -5.0, "JP": -2.0}, sign=-1)
+        delta.add(self.qnn.id, self.now, "ENTJ", {"IE": 3.0, "SN": 4.0, "TF": -5.0, "JP": -2.0})
+        delta.apply()
+
+        intj = ResultStatistic.objects.get(questionnaire=self.qnn, type_code="INTJ")
+        self.assertEqual(intj.day, timezone.localdate(self.now))
+        self.assertEqual(intj.count, 1)
+        self.assertEqual((intj.sum_ie, intj.sum_sn, intj.sum_tf, intj.sum_jp), (-3.0, 2.0, -1.0, -2.0))
+        self.assertEqual((intj.sumsq_ie, intj.sumsq_sn, intj.sumsq_tf, intj.sumsq_jp), (9.0, 4.0, 1.0, 4.0))
+        entj = ResultStatistic.objects.get(questionnaire=self.qnn, type_code="ENTJ")
+        self.assertEqual((entj.count, entj.sum_ie, entj.sumsq_tf), (1, 3.0, 25.0))
+
+    def test_buckets_by_local_day(self):
+        delta = StatsDelta()
+        delta.add(self.qnn.id, self.now, "ISTP", {})
+        delta.add(self.qnn.id, self.now - datetime.timedelta(days=1), "ISTP", {})
+        days = sorted(row.day for row in delta.instances())
+        self.assertEqual(days, [timezone.localdate(self.now) - datetime.timedelta(days=1), timezone.localdate(self.now)])
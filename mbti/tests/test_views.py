@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.contrib.messages import get_messages
+
+from mbti.attempts import answered_count
+from mbti.models import Attempt, Result, ResultStatistic, TestProgress
+from mbti.scoring import score_answers
+from mbti.snapshot import get_active_snapshot
+
+from .utils import MbtiTestCase
+
+FAKE_PDF = b"%PDF-1.4 test"
+
+
+class SubmitViewTests(MbtiTestCase):
+    def test_merges_stored_progress(self):
+        half = len(self.questions) // 2
+        # 前半部分已在前几页自动保存，本页只提交后半部分
+        self.save({f"q_{q.id}": 4 for q in self.questions[:half]}, rev=1, flush=True)
+        posted = {f"q_{q.id}": "2" for q in self.questions[half:]}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/submit/", posted)
+
+        self.assertRedirects(response, "/result/", fetch_redirect_response=False)
+        sheet = {q.id: 4 if i < half else 2 for i, q in enumerate(self.questions)}
+        code, detail, _ = score_answers(get_active_snapshot().key, sheet)
+        result = Result.objects.get(user=self.user)
+        self.assertEqual((result.type_code, result.score_detail), (code, detail))
+        self.assertEqual(answered_count(self.user.id), len(self.questions))
+        self.assertEqual(ResultStatistic.objects.get(type_code=code).count, 1)
+        # 提交成功后进度在事务提交时清除
+        self.assertFalse(TestProgress.objects.filter(user=self.user).exists())
+        self.assertEqual(self.store.answers(self.user.id, get_active_snapshot()), {})
+
+    def test_incomplete_submission_keeps_posted_answers(self):
+        posted = {f"q_{q.id}": "5" for q in self.questions[:3]}
+        response = self.client.post("/submit/", posted)
+
+        self.assertRedirects(response, "/test/", fetch_redirect_response=False)
+        self.assertIn("5 道题未完成", str(list(get_messages(response.wsgi_request))[0]))
+        self.assertFalse(Result.objects.exists())
+        row = TestProgress.objects.get(user=self.user)
+        self.assertEqual(sum(1 for choice in row.answers if choice), 3)
+
+    def test_resubmit_moves_the_statistics_bucket(self):
+        self.client.post("/submit/", self.answers(5))
+        first = Result.objects.get(user=self.user).type_code
+        self.client.post("/submit/", self.answers(1))
+
+        result = Result.objects.get(user=self.user)
+        self.assertNotEqual(result.type_code, first)
+        self.assertEqual(Attempt.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            dict(ResultStatistic.objects.filter(count__gt=0).values_list("type_code", "count")),
+            {result.type_code: 1},
+        )
+
+
+class ConditionalGetTests(MbtiTestCase):
+    def submit(self, choice):
+        self.client.post("/submit/", self.answers(choice))
+        # 读掉提交成功的消息，之后的页面才能用 ETag 验证
+        self.client.get("/result/")
+
+    def test_result_page_revalidates_by_etag(self):
+        self.submit(5)
+        response = self.client.get("/result/")
+        etag = response["ETag"]
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertNotIn("Last-Modified", response)
+
+        self.assertEqual(self.client.get("/result/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.submit(1)
+        response = self.client.get("/result/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_result_page_with_pending_message_is_not_a_304(self):
+        self.submit(5)
+        etag = self.client.get("/result/")["ETag"]
+        self.client.post("/submit/", self.answers(5))
+        response = self.client.get("/result/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    @mock.patch("mbti.views.render_result_pdf", return_value=FAKE_PDF)
+    def test_pdf_revalidates_without_rendering(self, render):
+        self.submit(5)
+        response = self.client.get("/result/pdf/")
+        self.assertEqual((response.status_code, response.content), (200, FAKE_PDF))
+        self.assertEqual(render.call_count, 1)
+
+        response = self.client.get("/result/pdf/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(render.call_count, 1)
+
+    def test_pdf_without_result_redirects_to_test(self):
+        response = self.client.get("/result/pdf/")
+        self.assertRedirects(response, "/test/", fetch_redirect_response=False)
+
+    def test_questionnaire_json_revalidates_each_representation(self):
+        plain = self.client.get("/questionnaire.json")
+        gzipped = self.client.get("/questionnaire.json", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertNotEqual(plain["ETag"], gzipped["ETag"])
+        self.assertEqual([qid for qid, _ in plain.json()["questions"]], [q.id for q in self.questions])
+
+        response = self.client.get("/questionnaire.json", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(response.status_code, 304)
+        # 另一种表示的 ETag 不能命中
+        response = self.client.get("/questionnaire.json", HTTP_IF_NONE_MATCH=gzipped["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_versioned_questionnaire_json_is_immutable(self):
+        version = get_active_snapshot().content_version
+        self.assertIn("immutable", self.client.get(f"/questionnaire.json?v={version}")["Cache-Control"])
+        self.assertNotIn("immutable", self.client.get("/questionnaire.json?v=old")["Cache-Control"])
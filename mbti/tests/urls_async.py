@@ -0,0 +1,21 @@
+"""测试用的 URL 配置：与 ASGI 部署（MBTI_ASYNC_VIEWS 开启）时相同，I/O 密集的端点换成异步视图。"""
+from django.urls import include, path
+
+from mbti import urls, views
+
+ASYNC_VIEWS = {
+    "save_progress": views.save_progress_async_view,
+    "submit": views.submit_async_view,
+    "result": views.result_async_view,
+    "result_pdf": views.result_pdf_async_view,
+}
+
+app_patterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+    for pattern in urls.urlpatterns
+]
+
+urlpatterns = [
+    path("", include((app_patterns, "mbti"), namespace="mbti")),
+    path("users/", include(("users.urls", "users"), namespace="users")),
+]
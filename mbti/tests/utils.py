@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from mbti import profiles, snapshot
+from mbti.models import Question, Questionnaire
+from mbti.progress import ProgressStore
+from mbti.snapshot import _build
+
+# 失效代号放在测试独享的内存缓存里，不写入开发环境的 var/generations
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "mbti-tests"},
+    "mbti_generations": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "mbti-tests-gen"},
+}
+
+
+def make_questionnaire(count=8, key="qnn"):
+    """建一份启用的问卷（四个维度轮流出题），返回 (问卷, 题目列表, 快照)。"""
+    qnn = Questionnaire.objects.create(key=key, name=key)
+    poles = [("IE", "E"), ("SN", "N"), ("TF", "F"), ("JP", "P")]
+    questions = [
+        Question.objects.create(
+            questionnaire=qnn, text=f"题目 {i}", dimension=poles[i % 4][0], keyed_pole=poles[i % 4][1], order=i,
+        )
+        for i in range(count)
+    ]
+    return qnn, questions, _build(key)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    MBTI_PDF_CACHE=None,
+    MBTI_PDF_ASYNC={"ENABLED": False},
+    MBTI_ADAPTIVE={"ENABLED": False},
+    MBTI_PROFILING={"ENABLED": False},
+    MBTI_TEST_CLIENT_RENDERED=False,
+)
+class MbtiTestCase(TestCase):
+    """
+    视图与命令测试的基类：一份启用的问卷、一个已登录的用户，以及本测试独享的进度存储。
+
+    进程级缓存（快照、类型档案、问卷版本的题目顺序）在每个测试开始时清空，
+    测试回滚后复用的主键不会命中上一个测试留下的缓存。
+    """
+
+    question_count = 8
+
+    def setUp(self):
+        self.questionnaire, self.questions, _ = make_questionnaire(self.question_count)
+        # 测试在事务中运行，on_commit 的失效回调需要显式执行
+        with self.captureOnCommitCallbacks(execute=True):
+            snapshot.invalidate()
+            profiles.invalidate()
+        self.store = ProgressStore(flush_interval=3600)
+        for patcher in (
+            mock.patch("mbti.progress._store", self.store),
+            mock.patch.dict("mbti.attempts._version_ids", clear=True),
+            mock.patch.dict("mbti.attempts._question_ids", clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user("taker")
+        self.client.force_login(self.user)
+
+    def answers(self, choice=2):
+        """全部题目的表单数据 {"q_<id>": choice}。"""
+        return {f"q_{q.id}": str(choice) for q in self.questions}
+
+    def save(self, changes, rev=None, flush=False):
+        body = {"changes": changes, "flush": flush}
+        if rev is not None:
+            body["rev"] = rev
+        return self.client.post("/save-progress/", body, content_type="application/json")
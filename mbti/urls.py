@@ -1,11 +1,29 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASGI 部署时 I/O 密集的端点改用异步视图（settings.MBTI_ASYNC_VIEWS）
+if (getattr(settings, 'MBTI_ASYNC_VIEWS', None) or {}).get('ENABLED'):
+    save_progress_view = views.save_progress_async_view
+    submit_view = views.submit_async_view
+    result_view = views.result_async_view
+    result_pdf_view = views.result_pdf_async_view
+else:
+    save_progress_view = views.save_progress_view
+    submit_view = views.submit_view
+    result_view = views.result_view
+    result_pdf_view = views.result_pdf_view
+
 urlpatterns = [
     path('', views.home_view, name='home'),
     path('test/', views.test_view, name='test'),
-    path('save-progress/', views.save_progress_view, name='save_progress'),
-    path('submit/', views.submit_view, name='submit'),
-    path('result/', views.result_view, name='result'),
-    path('result/pdf/', views.result_pdf_view, name='result_pdf'),
-]
\ No newline at end of file
+    path('questionnaire.json', views.questionnaire_json_view, name='questionnaire_json'),
+    path('save-progress/', save_progress_view, name='save_progress'),
+    path('submit/', submit_view, name='submit'),
+    path('result/', result_view, name='result'),
+    path('result/pdf/', result_pdf_view, name='result_pdf'),
+    path('result/pdf/jobs/<str:job_id>/', views.result_pdf_status_view, name='result_pdf_status'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('stats/', views.stats_view, name='stats'),
+    path('export/<str:kind>/', views.export_view, name='export'),
+]
@@ -1,580 +1,599 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
-from django.http import JsonResponse
-from .models import Question, Response, Result, Questionnaire, TypeProfile
+from django.db import transaction
+from django.utils import timezone
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from . import adaptive, metrics
+from .attempts import aanswered_count, answered_count, record_attempt
+from .export import CONTENT_TYPES, EXPORT_KINDS, FORMATS, build_filters, export_filename, stream_export
+from .models import Questionnaire, Response, Result
+from .pdf_cache import get_pdf_store
+from .pdf_jobs import DONE, FAILED, PENDING, QueueFull, get_job_queue, get_render_pool
+from .profiles import aget_profile, get_profile
+from .profiling import profile_view, profile_worker
+from .progress import APPLIED, MAX_CHOICE, MIN_CHOICE, STALE, get_progress_store
+from .reports import render_result_pdf, report_cache_key
+from .scoring import DIMENSIONS, score_answers
+from .snapshot import PER_PAGE, aget_active_snapshot, get_active_snapshot
+from .stats import StatsDelta, dashboard
+import hashlib
 import json
+import re
+from functools import wraps
 
 
 
+def parse_answers(data):
+    """把 {"q_<id>": value} 形式的答案转换为 {question_id: choice}，忽略无法解析的条目。"""
+    answers = {}
+    for key, val in data.items():
+        if isinstance(key, str) and key.startswith('q_'):
+            try:
+                answers[int(key.split('_')[1])] = int(val)
+            except (ValueError, IndexError, TypeError):
+                pass
+    return answers
+
+
 def home_view(request):
     return render(request, 'mbti/home.html')
 
 
 @login_required
 def test_view(request):
-    qnn = Questionnaire.objects.filter(is_active=True).first()
-    questions = Question.objects.filter(active=True, questionnaire=qnn).order_by('order', 'id') if qnn else Question.objects.filter(active=True).order_by('order', 'id')
+    snapshot = get_active_snapshot()
     
     # 检查是否有题目
-    if not questions.exists():
+    if not snapshot.questions:
         messages.error(request, '暂可用测试题目，请联系管理员。')
         return redirect('mbti:home')
     
-    # 分页处理
-    from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-    page_number = request.GET.get('page', 1)
-    paginator = Paginator(questions, 10)  # 每页10题
-    
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        # 如果页码不是整数，显示第一页
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        # 如果页码超出范围，显示最后一页
-        page_obj = paginator.page(paginator.num_pages)
+    # 获取已保存的答案（进度存储中的答卷向量，转换为 {question_id: value} 供模板回填）
+    # 同时下发当前修订号，前端的增量保存从这里继续递增
+    answers, revision = get_progress_store().read(request.user.id, snapshot)
+    saved_answers = {qid: str(value) for qid, value in answers.items()}
     
-    # 获取已保存的答案（会话中以 q_<id> 形式存储，这里转换为 {question_id: value}）
-    saved_answers = {}
-    if hasattr(request, 'session'):
-        raw_answers = request.session.get('test_answers', {})
-        normalized = {}
-        for k, v in raw_answers.items():
-            try:
-                if isinstance(k, str) and k.startswith('q_'):
-                    qid = int(k.split('_')[1])
-                    normalized[qid] = str(v)
-            except Exception:
-                continue
-        saved_answers = normalized
+    from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+    adaptive_mode = adaptive.is_enabled()
+    if not adaptive_mode and getattr(settings, 'MBTI_TEST_CLIENT_RENDERED', False):
+        # 客户端渲染：页面只带已保存的答案，题目由前端从长期缓存的题目 JSON 分页渲染
+        return render(request, 'mbti/test_client.html', {
+            "saved_answers": answers,
+            "revision": revision,
+            "total_questions": len(snapshot),
+            "questionnaire_url": f"{reverse('mbti:questionnaire_json')}?v={snapshot.content_version}",
+        })
+    
+    if adaptive_mode:
+        # 自适应模式：只出尚未确定的维度中未作答的题目，每次一批，提交后再决定下一批
+        remaining = adaptive.remaining_questions(snapshot, answers)
+        page_obj = Paginator(remaining[:PER_PAGE], PER_PAGE).page(1)
+        completed = len(answers)
+        total_questions = completed + len(remaining)
+    else:
+        # 分页处理：对快照中的题目元组分页，不再产生 COUNT/切片查询
+        page_number = request.GET.get('page', 1)
+        paginator = Paginator(snapshot.questions, PER_PAGE)  # 每页10题
+        
+        try:
+            page_obj = paginator.page(page_number)
+        except PageNotAnInteger:
+            # 如果页码不是整数，显示第一页
+            page_obj = paginator.page(1)
+        except EmptyPage:
+            # 如果页码超出范围，显示最后一页
+            page_obj = paginator.page(paginator.num_pages)
+        completed = page_obj.start_index() - 1
+        total_questions = len(snapshot)
     
     return render(request, 'mbti/test.html', {
         "page_obj": page_obj,
         "saved_answers": saved_answers,
-        "total_questions": questions.count(),
+        "revision": revision,
+        "adaptive": adaptive_mode,
+        "completed": completed,  # 本页之前已完成的题数，用于题号与进度条
+        "total_questions": total_questions,
         "current_page": page_obj.number,
-        "total_pages": paginator.num_pages  # 明确传递总页数
+        "total_pages": page_obj.paginator.num_pages  # 明确传递总页数
     })
 
 
+_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+def _accepts_gzip(request):
+    return bool(_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def _questionnaire_etag(request):
+    # gzip 与未压缩是两种表示，ETag 需要区分
+    version = get_active_snapshot().content_version
+    return f'{version}-gzip' if _accepts_gzip(request) else version
+
+
+@condition(etag_func=_questionnaire_etag)
+def questionnaire_json_view(request):
+    """
+    当前启用问卷的题目 JSON（只含 id 与题目文字，见 QuestionnaireSnapshot.payload）。
+
+    内容对所有用户相同，由快照预先序列化并压缩，请求时只做 ETag 比对；
+    带当前内容摘要 ?v=<content_version> 的 URL 内容不会再变，允许任意缓存长期保存。
+    """
+    snapshot = get_active_snapshot()
+    if _accepts_gzip(request):
+        response = HttpResponse(snapshot.payload_gzip, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(snapshot.payload, content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if request.GET.get('v') == snapshot.content_version:
+        patch_cache_control(response, public=True, max_age=365 * 24 * 3600, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+
 @login_required
 def save_progress_view(request):
-    """保存测试进度的AJAX视图"""
+    """
+    保存测试进度的AJAX视图（增量协议）
+
+    请求体：{"rev": 修订号, "changes": {"q_<id>": value, ...}, "flush": bool}
+    只发送变化的答案，rev 必须大于服务端当前修订号，否则返回 409 与当前修订号，
+    前端据此合并未确认的修改后重发。旧客户端发送的 {"answers": {...}} 仍然兼容。
+    """
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
-            answers = data.get('answers', {})
+            changes, revision, flush = _parse_progress(request)
             
-            # 保存到session
-            if not request.session.get('test_answers'):
-                request.session['test_answers'] = {}
-            request.session['test_answers'].update(answers)
-            request.session.modified = True
-            
-            return JsonResponse({'status': 'success'})
+            # 原地写入进度向量；前端翻页/提交时传 flush=true 立即落库，其余自动保存合并写入
+            status, current = get_progress_store().update(
+                request.user.id, get_active_snapshot(), changes, revision=revision, flush=flush,
+            )
+            return _progress_response(status, current)
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)})
     
     return JsonResponse({'status': 'error', 'message': 'Invalid method'})
 
 
+def _parse_progress(request):
+    """解析自动保存请求体，返回 (changes, revision, flush)。"""
+    data = json.loads(request.body)
+    changes = parse_answers(data.get('changes') or data.get('answers') or {})
+    revision = data.get('rev')
+    if revision is not None:
+        revision = int(revision)
+    return changes, revision, bool(data.get('flush'))
+
+
+def _progress_response(status, current):
+    if status == STALE:
+        return JsonResponse({'status': 'stale', 'revision': current}, status=409)
+    return JsonResponse({'status': 'success' if status == APPLIED else 'noop', 'revision': current})
+
+
 @login_required
+@profile_view('submit')
 def submit_view(request):
     if request.method != 'POST':
         return redirect('mbti:test')
 
-    # 合并session中的答案和当前提交的答案
-    all_answers = {}
-    if hasattr(request, 'session'):
-        all_answers.update(request.session.get('test_answers', {}))
+    # 合并进度存储中的答案和当前提交的答案
+    snapshot = get_active_snapshot()
+    store = get_progress_store()
+    answers = store.answers(request.user.id, snapshot)
     
-    # 添加当前页面的答案
-    for key, val in request.POST.items():
-        if key.startswith('q_'):
-            all_answers[key] = val
+    # 添加当前页面的答案（越界的取值视为未作答）
+    answers.update(_posted_answers(request))
 
-    qnn = Questionnaire.objects.filter(is_active=True).first()
-    answers = {}
-    for key, val in all_answers.items():
-        if key.startswith('q_'):
-            try:
-                qid = int(key.split('_')[1])
-                answers[qid] = int(val)
-            except (ValueError, IndexError):
-                pass
-
-    # 检查是否所有题目都已回答
-    questions = Question.objects.filter(active=True, questionnaire=qnn).order_by('order', 'id') if qnn else Question.objects.filter(active=True).order_by('order', 'id')
-    required_questions = set(questions.values_list('id', flat=True))
-    answered_questions = set(answers.keys())
-    
-    if not required_questions.issubset(answered_questions):
-        missing_count = len(required_questions - answered_questions)
-        messages.error(request, f'还有 {missing_count} 道题未完成，请完成所有题目后再提交。')
+    complete, error = _check_submission(snapshot, answers)
+    if not complete:
+        # 保留本页已作答的题目，返回后不丢失
+        store.update(request.user.id, snapshot, answers, flush=True)
+        if error:
+            messages.error(request, error)
         return redirect('mbti:test')
 
-    # 清除session中的答案
-    if hasattr(request, 'session') and 'test_answers' in request.session:
-        del request.session['test_answers']
-
-    for qid, choice in answers.items():
-        Response.objects.update_or_create(
-            user=request.user,
-            question_id=qid,
-            defaults={"choice": choice, "questionnaire": qnn},
-        )
-
-    # 计算得分
-    dims = {"IE": 0.0, "SN": 0.0, "TF": 0.0, "JP": 0.0}
-    counts = {"IE": 0, "SN": 0, "TF": 0, "JP": 0}
-    for resp in Response.objects.filter(user=request.user).select_related('question'):
-        dim = resp.question.dimension
-        if dim in dims:
-            # 标准化计分：Likert(1..5)→[-2..+2]；确保各维度正分恒指向“第二字母”
-            raw = resp.choice - 3  # -2..+2
-            pole_pair = {
-                "IE": ("I", "E"),
-                "SN": ("S", "N"),
-                "TF": ("T", "F"),
-                "JP": ("J", "P"),
-            }[dim]
-            # 若题目倾向的是第二极性（如E、N、F、P），则正向；否则反向
-            direction = 1 if resp.question.keyed_pole == pole_pair[1] else -1
-            score = raw * direction * max(1, resp.question.weight)
-            dims[dim] += score
-            counts[dim] += 1
-
-    # 生成类型码
-    type_map = {
-        "IE": ("I", "E"),
-        "SN": ("S", "N"),
-        "TF": ("T", "F"),
-        "JP": ("J", "P"),
-    }
-    # 映射逻辑修正：dims中分数的正负与模板一致：
-    # 约定 v>0 代表维度字符串的第二极性（如 IE 中的 E），v<0 代表第一极性（如 I）。
-    # 过去用 v>=0 归到第一极性会造成边界与符号反转，引发类型与维度不一致。
-    code = "".join([type_map[k][1] if v > 0 else type_map[k][0] for k, v in dims.items()])
-    # 置信度：按每维度平均绝对分值归一化（0..1），分值越高置信度越高
-    confidence = {}
-    for k, v in dims.items():
-        n = max(counts[k], 1)
-        # 每题最大绝对分值=2*weight，这里按weight最小值1近似；平均绝对值/2归一到[0,1]
-        confidence[k] = min(1.0, max(0.0, (abs(v) / n) / 2))
-
-    qnn = Questionnaire.objects.filter(is_active=True).first()
-    result, _ = Result.objects.update_or_create(
-        user=request.user,
-        defaults={"type_code": code, "score_detail": dims, "confidence": confidence, "questionnaire": qnn},
-    )
+    # 计算得分：使用快照中编译好的计分键，对本次答卷做一次向量化计算
+    code, dims, confidence = score_answers(snapshot.key, answers)
+    _save_submission(request.user, snapshot, answers, code, dims, confidence)
 
     messages.success(request, '提交成功，以下是你的测试结果')
     return redirect('mbti:result')
 
 
+def _posted_answers(request):
+    return {qid: c for qid, c in parse_answers(request.POST).items() if MIN_CHOICE <= c <= MAX_CHOICE}
+
+
+def _check_submission(snapshot, answers):
+    """
+    判断答卷能否计分，返回 (complete, error)。
+
+    complete 为 False 时应保存进度并回到测试页，error 为要提示的消息（自适应模式下继续出题时为 None）。
+    """
+    if adaptive.is_enabled():
+        # 自适应模式：还有未确定的维度时保存本批答案并继续出题，全部确定后才计分
+        return not adaptive.remaining_questions(snapshot, answers), None
+
+    # 检查是否所有题目都已回答
+    missing_count = len(set(snapshot.question_ids) - answers.keys())
+    if missing_count:
+        return False, f'还有 {missing_count} 道题未完成，请完成所有题目后再提交。'
+    return True, None
+
+
+def _save_submission(user, snapshot, answers, code, dims, confidence):
+    """写入一次提交：结果、统计增量与作答记录在同一事务中完成，随后清除作答进度。"""
+    # 整张答卷只写一行打包的作答记录（见 mbti/attempts.py），不再逐题写 Response；
+    # 用户迁移前留下的 Response 行已被这次作答取代，一并删除
+    with transaction.atomic():
+        Response.objects.filter(user=user).delete()
+        # 读出旧结果（加行锁）以便对统计表做"旧分桶减、新分桶加"的增量维护；
+        # 重新测试时 created_at 记为本次提交时间，统计按最近一次提交的日期分桶
+        stats = StatsDelta()
+        result = Result.objects.select_for_update().filter(user=user).first()
+        if result is None:
+            result = Result.objects.create(
+                user=user, type_code=code, score_detail=dims, confidence=confidence,
+                questionnaire_id=snapshot.questionnaire_id,
+            )
+        else:
+            stats.add_result(result, sign=-1)
+            result.type_code, result.score_detail, result.confidence = code, dims, confidence
+            result.questionnaire_id = snapshot.questionnaire_id
+            result.created_at = timezone.now()
+            result.save(update_fields=["type_code", "score_detail", "confidence", "questionnaire", "created_at"])
+        stats.add_result(result)
+        stats.apply()
+        # 作答历史：每次提交追加一行打包的答卷
+        record_attempt(user.id, snapshot, answers, code, dims, confidence)
+        # 清除作答进度：在事务提交后进行，提交失败回滚时进度仍然保留
+        transaction.on_commit(lambda: get_progress_store().clear(user.id))
+
+
+# 结果页模板版本号：修改 result.html 后递增，浏览器缓存中的旧页面随 ETag 变化而失效
+RESULT_PAGE_VERSION = 1
+
+
+def _current_result(request):
+    """当前用户的结果；每个请求只查询一次，条件请求的校验函数与视图共用。"""
+    if not hasattr(request, '_mbti_result'):
+        request._mbti_result = Result.objects.filter(user=request.user).first()
+    return request._mbti_result
+
+
+def _current_profile(request):
+    if not hasattr(request, '_mbti_profile'):
+        result = _current_result(request)
+        request._mbti_profile = get_profile(result.type_code) if result else None
+    return request._mbti_profile
+
+
+def _result_page_etag(request):
+    # 页面还取决于类型档案与模板版本，Result.created_at 不能代表修改时间，因此只用 ETag 做条件请求
+    result = _current_result(request)
+    # 有待显示的消息时页面内容不同，不能返回 304（否则消息会一直滞留）
+    if result is None or len(messages.get_messages(request)):
+        return None
+    profile = _current_profile(request)
+    parts = [
+        RESULT_PAGE_VERSION, request.user.id, result.pk, result.created_at.isoformat(),
+        result.type_code, result.score_detail, result.confidence,
+        profile.content_hash if profile else '', get_job_queue() is not None,
+    ]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
 @login_required
+@condition(etag_func=_result_page_etag)
 def result_view(request):
-    result = Result.objects.filter(user=request.user).first()
+    return _render_result_page(request)
+
+
+def _render_result_page(request):
+    result = _current_result(request)
     score_items = list(result.score_detail.items()) if result else []
     confidence = result.confidence if result else {}
     detail_items = [(k, v, confidence.get(k)) for (k, v) in score_items]
-    profile = TypeProfile.objects.filter(code=result.type_code).first() if result else None
-    return render(request, 'mbti/result.html', {"result": result, "detail_items": detail_items, "profile": profile})
+    response = render(request, 'mbti/result.html', {
+        "result": result,
+        "detail_items": detail_items,
+        "profile": _current_profile(request),
+        "pdf_async": get_job_queue() is not None,
+    })
+    if result:
+        # 结果属于个人：只允许浏览器缓存，每次使用前用 ETag 重新验证
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _report_inputs(request):
+    """报告的全部输入与按内容寻址的缓存键；每个请求只计算一次。"""
+    if not hasattr(request, '_mbti_report'):
+        report = None
+        result = _current_result(request)
+        if result:
+            response_count = answered_count(request.user.id)
+            report = _build_report(result, _current_profile(request), request.user.username, response_count)
+        request._mbti_report = report
+    return request._mbti_report
+
+
+def _build_report(result, profile, username, response_count):
+    return result, profile, username, response_count, report_cache_key(result, profile, username, response_count)
+
+
+def _report_etag(request):
+    report = _report_inputs(request)
+    if report is None:
+        return None
+    # 缓存键即报告内容的摘要，可直接作为 ETag；后台渲染模式下报告尚未生成时视图返回任务信息，不带验证器
+    cache_key = report[-1]
+    if get_job_queue() is not None:
+        store = get_pdf_store()
+        if not (store and store.exists(cache_key)):
+            return None
+    return cache_key
 
 
 @login_required
+@profile_view('result_pdf')
+@condition(etag_func=_report_etag)
 def result_pdf_view(request):
-    result = Result.objects.filter(user=request.user).first()
-    if not result:
+    report = _report_inputs(request)
+    if report is None:
         return redirect('mbti:test')
+    result, profile, username, response_count, cache_key = report
+
+    # 按报告内容寻址的缓存：结果与档案未变化时直接读取已生成的文件
+    store = get_pdf_store()
+    pdf = store.get(cache_key) if store else None
+    metrics.PDF_CACHE.inc(result='hit' if pdf is not None else 'miss')
+    queue = get_job_queue()
+    if pdf is None and queue is not None:
+        return _enqueue_pdf(request, queue, cache_key, result, profile, username, response_count)
+    if pdf is None:
+        try:
+            pdf = render_result_pdf(result, profile, username, response_count)
+        except ImportError:
+            return _pdf_unavailable(request)
+        if store:
+            store.set(cache_key, pdf)
+    return _pdf_response(pdf, result, username)
+
+
+def _pdf_response(pdf, result, username):
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="MBTI测试报告_{username}_{result.created_at.strftime("%Y%m%d") if hasattr(result, "created_at") else "report"}.pdf"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 
-    # 延迟导入报告库，给出友好降级
+def _pdf_unavailable(request):
+    messages.error(request, 'PDF导出模块未安装，请稍后重试或联系管理员安装 reportlab')
+    return redirect('mbti:result')
+
+
+def _wants_json(request):
+    return 'application/json' in request.headers.get('Accept', '')
+
+
+def _pdf_busy(request):
+    """渲染队列已满：不再继续排队，引导用户先查看网页版结果。"""
+    if _wants_json(request):
+        response = JsonResponse({'status': 'busy', 'fallback_url': reverse('mbti:result')}, status=503)
+        response['Retry-After'] = '10'
+        # 繁忙是预期内的限流，不是服务器错误：不让 django.request 按 5xx 记 ERROR 日志
+        # （次数见 /metrics 中按状态码统计的请求数）
+        response._has_been_logged = True
+        return response
+    messages.warning(request, '报告生成繁忙，请先查看网页版结果，稍后再导出PDF。')
+    return redirect('mbti:result')
+
+
+def _enqueue_pdf(request, queue, cache_key, result, profile, username, response_count):
+    """异步模式：把渲染交给后台队列，返回任务号与状态查询地址。"""
     try:
-        from reportlab.lib.pagesizes import A4, letter
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-        from reportlab.lib.units import inch
-    except Exception:
-        messages.error(request, 'PDF导出模块未安装，请稍后重试或联系管理员安装 reportlab')
-        return redirect('mbti:result')
-
-    # 注册中文字体，避免乱码（跨平台）
-    base_font = 'Helvetica'
+        import reportlab  # noqa: F401
+    except ImportError:
+        return _pdf_unavailable(request)
+
     try:
-        import os, sys
-        # 常见平台字体路径（包含 Windows、Linux(Ubuntu) 与 macOS）
-        font_paths = [
-            # Windows
-            r'C:\Windows\Fonts\msyh.ttf',  # 微软雅黑 (TTF)
-            r'C:\Windows\Fonts\msyh.ttc',  # 微软雅黑 (TTC)
-            r'C:\Windows\Fonts\simhei.ttf',  # 黑体
-            r'C:\Windows\Fonts\simsun.ttc',  # 宋体（可能不被TTFont识别）
-            r'C:\Windows\Fonts\simsun.ttf',  # 宋体 (TTF)
-            r'C:\Windows\Fonts\NSimSun.ttf',  # 新宋体
-            r'C:\Windows\Fonts\SIMKAI.TTF',  # 楷体
-        ]
-
-        # Linux 常见中文字体（优先使用 Noto/思源系列，ReportLab 对 OTF/TTF支持更稳定）
-        linux_candidates = [
-            '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
-            '/usr/share/fonts/opentype/noto/NotoSansCJKsc-Regular.otf',
-            '/usr/share/fonts/noto-cjk/NotoSansCJKsc-Regular.otf',
-            '/usr/share/fonts/noto/NotoSansCJKsc-Regular.otf',
-            '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
-            '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
-            '/usr/share/fonts/truetype/arphic/ukai.ttf',
-            '/usr/share/fonts/truetype/arphic/uming.ttf',
-        ]
-
-        # macOS 常见中文字体
-        mac_candidates = [
-            '/System/Library/Fonts/PingFang.ttc',
-            '/System/Library/Fonts/STSong.ttf',
-            '/Library/Fonts/Songti.ttc',
-            '/Library/Fonts/Heiti.ttc',
-        ]
-
-        if sys.platform.startswith('linux'):
-            font_paths.extend(linux_candidates)
-        elif sys.platform == 'darwin':
-            font_paths.extend(mac_candidates)
-
-        # 项目内置字体（如存在）：static/fonts/NotoSansCJKsc-Regular.otf
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        project_font = os.path.join(BASE_DIR, 'static', 'fonts', 'NotoSansCJKsc-Regular.otf')
-        font_paths.append(project_font)
-
-        for font_path in font_paths:
-            try:
-                if os.path.exists(font_path):
-                    pdfmetrics.registerFont(TTFont('CN', font_path))
-                    base_font = 'CN'
-                    break
-            except Exception:
-                # 某些 .ttc 字体包不被 TTFont 支持，继续尝试下一个
-                continue
-        # 若仍未找到可用 TTF/TTC，尝试使用内置的 CJK 字体（不需外部文件）
-        if base_font == 'Helvetica':
-            try:
-                pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
-                base_font = 'STSong-Light'
-            except Exception:
-                pass
-    except Exception:
-        # 字体注册失败时退回默认英文字体（中文可能出现方块）
-        pass
-
-    # 样式
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=base_font,
-        fontSize=20,
-        spaceAfter=30,
-        alignment=1,  # 居中
-        textColor=colors.darkblue
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontName=base_font,
-        fontSize=14,
-        spaceAfter=12,
-        spaceBefore=20,
-        textColor=colors.darkblue,
-        borderWidth=1,
-        borderColor=colors.lightgrey,
-        borderPadding=5,
-        backColor=colors.lightgrey
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=10,
-        spaceAfter=8,
-        leftIndent=20,
-        rightIndent=20
-    )
-    
-    info_style = ParagraphStyle(
-        'InfoStyle',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=10,
-        spaceAfter=6,
-        leftIndent=10
-    )
+        job_id = queue.submit(cache_key, render_result_pdf, result, profile, username, response_count)
+    except QueueFull:
+        return _pdf_busy(request)
+
+    if _wants_json(request):
+        return JsonResponse({
+            'status': PENDING,
+            'job_id': job_id,
+            'status_url': reverse('mbti:result_pdf_status', args=[job_id]),
+            'download_url': reverse('mbti:result_pdf'),
+        }, status=202)
+    messages.info(request, '报告正在生成，请稍后再次点击导出。')
+    return redirect('mbti:result')
 
-    # 类型档案
-    profile = TypeProfile.objects.filter(code=result.type_code).first()
-    strengths = getattr(profile, 'strengths', '') or '—'
-    growth = getattr(profile, 'growth', '') or '—'
-    description = getattr(profile, 'description', '') or '—'
-
-    # 构建文档
-    from io import BytesIO
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=50, bottomMargin=50, title='MBTI人格测试报告')
-    story = []
-    
-    # 添加标题
-    story.append(Paragraph('MBTI人格测试报告', title_style))
-    story.append(Spacer(1, 30))
-    
-    # 基本信息表格
-    story.append(Paragraph('基本信息', heading_style))
-    basic_data = [
-        ['用户名', request.user.username],
-        ['测试时间', result.created_at.strftime('%Y年%m月%d日 %H:%M') if hasattr(result, 'created_at') else '—'],
-        ['人格类型', f"{result.type_code} - {getattr(profile, 'name', '未知类型') if profile else '未知类型'}"],
-        ['测试题目数', Response.objects.filter(user=request.user).count()]
-    ]
-    
-    basic_table = Table(basic_data, colWidths=[2*inch, 4*inch])
-    basic_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), base_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(basic_table)
-    story.append(Spacer(1, 20))
-    
-    # 类型描述
-    story.append(Paragraph('性格概述', heading_style))
-    story.append(Paragraph(description, normal_style))
-    story.append(Spacer(1, 20))
-    
-    # 维度分析表格
-    story.append(Paragraph('维度分析', heading_style))
-    
-    dimension_data = [['维度', '分数', '置信度', '倾向']] + [
-        [
-            k, 
-            f"{v:+.2f}", 
-            f"{result.confidence.get(k, 0):.2f}",
-            {'IE': ('内向', '外向'), 'SN': ('感觉', '直觉'), 'TF': ('思考', '情感'), 'JP': ('判断', '知觉')}[k][1 if v > 0 else 0]
-        ] for k, v in result.score_detail.items()
-    ]
-    
-    dimension_table = Table(dimension_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1.5*inch])
-    dimension_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), base_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(dimension_table)
-    story.append(Spacer(1, 20))
-    
-    # 多维度深度分析
-    story.append(Paragraph('多维度深度分析', heading_style))
-    
-    analysis_sections = [
-        ('性格特点', getattr(profile, 'personality_traits', '') if profile else ''),
-        ('工作风格', getattr(profile, 'work_style', '') if profile else ''),
-        ('人际关系', getattr(profile, 'interpersonal_relations', '') if profile else ''),
-        ('情感表达', getattr(profile, 'emotional_expression', '') if profile else ''),
-        ('决策方式', getattr(profile, 'decision_making', '') if profile else ''),
-        ('压力管理', getattr(profile, 'stress_management', '') if profile else ''),
-        ('学习方式', getattr(profile, 'learning_style', '') if profile else ''),
-        ('职业建议', getattr(profile, 'career_suggestions', '') if profile else ''),
-        ('生活哲学', getattr(profile, 'life_philosophy', '') if profile else ''),
-        ('沟通风格', getattr(profile, 'communication_style', '') if profile else '')
-    ]
-    
-    for section_title, content in analysis_sections:
-        if content:  # 只显示有内容的部分
-            story.append(Paragraph(f"• {section_title}", ParagraphStyle(
-                'SectionTitle',
-                parent=normal_style,
-                fontSize=12,
-                textColor=colors.darkblue,
-                spaceAfter=6,
-                leftIndent=10,
-                fontName=base_font
-            )))
-            story.append(Paragraph(content, normal_style))
-            story.append(Spacer(1, 10))
-    
-    # 详细维度分析
-    story.append(Paragraph('维度详细分析', heading_style))
-    
-    # 为每个维度提供详细解释
-    dimension_explanations = {
-        'IE': {
-            'name': '外向性 vs 内向性',
-            'description': '这个维度反映了你获取能量的方式和注意力的方向。',
-            'I': '内向型：从内部世界获取能量，喜欢独处思考，更关注内心世界。',
-            'E': '外向型：从外部世界获取能量，喜欢与人交往，思考时倾向于外化表达。'
-        },
-        'SN': {
-            'name': '感觉 vs 直觉',
-            'description': '这个维度反映了你收集和处理信息的偏好方式。',
-            'S': '感觉型：关注具体事实和细节，相信经验和实际观察，注重现实。',
-            'N': '直觉型：关注可能性和模式，相信灵感和想象，注重未来潜力。'
-        },
-        'TF': {
-            'name': '思考 vs 情感',
-            'description': '这个维度反映了你做决策时的主要考虑因素。',
-            'T': '思考型：基于逻辑分析做决策，重视客观标准和公平原则。',
-            'F': '情感型：基于价值观和人际关系做决策，重视和谐与个人价值。'
-        },
-        'JP': {
-            'name': '判断 vs 知觉',
-            'description': '这个维度反映了你对外部世界的态度和生活方式偏好。',
-            'J': '判断型：喜欢有计划和结构的生活，倾向于做决定和完成任务。',
-            'P': '知觉型：喜欢灵活和开放的生活，倾向于保持选择余地和适应变化。'
-        }
-    }
-    
-    for dim_code, score in result.score_detail.items():
-        if dim_code in dimension_explanations:
-            dim_info = dimension_explanations[dim_code]
-            confidence = result.confidence.get(dim_code, 0)
-            
-            # 维度标题
-            story.append(Paragraph(f"{dim_info['name']} ({dim_code})", ParagraphStyle(
-                'DimensionTitle',
-                parent=normal_style,
-                fontSize=13,
-                textColor=colors.darkred,
-                spaceAfter=8,
-                spaceBefore=15,
-                fontName=base_font,
-                bold=True
-            )))
-            
-            # 维度描述
-            story.append(Paragraph(dim_info['description'], normal_style))
-            
-            # 分数与倾向：按分数符号选择维度对应字母的解释
-            type_map = {
-                'IE': ('I', 'E'),
-                'SN': ('S', 'N'),
-                'TF': ('T', 'F'),
-                'JP': ('J', 'P'),
-            }
-            chosen_letter = type_map[dim_code][1] if score > 0 else type_map[dim_code][0]
-            tendency = dim_info.get(chosen_letter, '')
-            score_text = f"您的分数：{score:+.2f}，置信度：{confidence:.2f}"
-            
-            story.append(Paragraph(f"<b>{score_text}</b>", ParagraphStyle(
-                'ScoreText',
-                parent=normal_style,
-                fontSize=11,
-                textColor=colors.darkgreen,
-                spaceAfter=6,
-                leftIndent=20,
-                fontName=base_font
-            )))
-            
-            story.append(Paragraph(tendency, ParagraphStyle(
-                'TendencyText',
-                parent=normal_style,
-                fontSize=10,
-                leftIndent=20,
-                rightIndent=20,
-                spaceAfter=10,
-                fontName=base_font,
-                backColor=colors.lightgrey,
-                borderWidth=1,
-                borderColor=colors.grey,
-                borderPadding=8
-            )))
-    
-    # 综合分析
-    story.append(Paragraph('综合人格分析', heading_style))
-    
-    # 计算整体倾向强度
-    total_strength = sum(abs(score) for score in result.score_detail.values()) / len(result.score_detail)
-    avg_confidence = sum(result.confidence.values()) / len(result.confidence) if result.confidence else 0
-    
-    overall_analysis = f"""
-    根据您的测试结果，您的人格类型为 {result.type_code}。
-    
-    整体特征强度：{total_strength:.2f}（范围0-4，数值越高表示特征越明显）
-    平均置信度：{avg_confidence:.2f}（范围0-1，数值越高表示结果越可靠）
-    
-    这意味着您在各个维度上的倾向性{'较为明显' if total_strength > 2 else '相对温和'}，
-    测试结果的可靠性{'较高' if avg_confidence > 0.7 else '中等' if avg_confidence > 0.5 else '需要进一步验证'}。
-    """
-    
-    story.append(Paragraph(overall_analysis, normal_style))
-    story.append(Spacer(1, 15))
-    
-    # 发展建议增强版
-    story.append(Paragraph('个人发展建议', heading_style))
-    
-    # 基于分数提供个性化建议
-    development_suggestions = []
-    
-    for dim_code, score in result.score_detail.items():
-        confidence = result.confidence.get(dim_code, 0)
-        if confidence < 0.6:  # 低置信度的维度
-            if dim_code == 'IE':
-                development_suggestions.append("在内外向维度上，您可能处于平衡状态。建议在不同情境下尝试不同的行为模式，找到最适合的能量获取方式。")
-            elif dim_code == 'SN':
-                development_suggestions.append("在感觉-直觉维度上，您展现出灵活性。建议培养既关注细节又把握大局的能力。")
-            elif dim_code == 'TF':
-                development_suggestions.append("在思考-情感维度上，您能够平衡理性和感性。建议在决策时综合考虑逻辑分析和人际影响。")
-            elif dim_code == 'JP':
-                development_suggestions.append("在判断-知觉维度上，您具有适应性。建议根据情况需要，灵活运用计划性和开放性。")
-    
-    if development_suggestions:
-        story.append(Paragraph("基于您的测试结果，以下是个性化的发展建议：", normal_style))
-        for i, suggestion in enumerate(development_suggestions, 1):
-            story.append(Paragraph(f"{i}. {suggestion}", ParagraphStyle(
-                'SuggestionText',
-                parent=normal_style,
-                leftIndent=30,
-                rightIndent=20,
-                spaceAfter=8,
-                fontName=base_font
-            )))
-    
-    # 原有的发展建议
-    if growth:
-        story.append(Paragraph("通用发展建议：", normal_style))
-        story.append(Paragraph(growth, normal_style))
-    
-    story.append(Spacer(1, 20))
-
-    # 页脚信息
-    story.append(Spacer(1, 30))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=8,
-        alignment=1,
-        textColor=colors.grey
-    )
-    story.append(Paragraph('本报告由MBTI人格测试系统生成', footer_style))
-    story.append(Paragraph(f"生成时间：{result.created_at.strftime('%Y年%m月%d日 %H:%M:%S') if hasattr(result, 'created_at') else '—'}", footer_style))
 
-    doc.build(story)
-    buffer.seek(0)
+@login_required
+def result_pdf_status_view(request, job_id):
+    """查询后台渲染任务状态；任务号即缓存键，只允许查询本人的报告。"""
+    queue = get_job_queue()
+    if queue is None or not job_id.startswith(f'u{request.user.id}-'):
+        return JsonResponse({'status': 'error', 'message': 'Unknown job'}, status=404)
+    status = queue.status(job_id)
+    if status is None:
+        return JsonResponse({'status': 'error', 'message': 'Unknown job'}, status=404)
+    payload = {'status': status, 'job_id': job_id}
+    if status == DONE:
+        payload['download_url'] = reverse('mbti:result_pdf')
+    elif status == FAILED:
+        payload['fallback_url'] = reverse('mbti:result')
+    return JsonResponse(payload)
+
+
+# ---- 异步视图 ----
+# ASGI 部署（mbti_site/asgi.py）时由 settings.MBTI_ASYNC_VIEWS 开启，替换上面的 I/O 密集视图，行为相同：
+# 等待数据库、进度落库与 PDF 渲染期间不占用工作线程。异步 ORM 不支持事务，提交的写入部分仍在线程中同步执行。
+
 
-    from django.http import HttpResponse
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="MBTI测试报告_{request.user.username}_{result.created_at.strftime("%Y%m%d") if hasattr(result, "created_at") else "report"}.pdf"'
-    return response
\ No newline at end of file
+def _async_login_required(view):
+    """异步视图的登录校验；载入的用户直接放到 request.user，之后的同步代码不会再查询数据库。"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+
+    return login_required(wrapper)
+
+
+@_async_login_required
+async def save_progress_async_view(request):
+    if request.method == 'POST':
+        try:
+            changes, revision, flush = _parse_progress(request)
+            status, current = await get_progress_store().aupdate(
+                request.user.id, await aget_active_snapshot(), changes, revision=revision, flush=flush,
+            )
+            return _progress_response(status, current)
+        except Exception as e:
+            return JsonResponse({'status': 'error', 'message': str(e)})
+
+    return JsonResponse({'status': 'error', 'message': 'Invalid method'})
+
+
+@_async_login_required
+@profile_view('submit')
+async def submit_async_view(request):
+    if request.method != 'POST':
+        return redirect('mbti:test')
+
+    snapshot = await aget_active_snapshot()
+    store = get_progress_store()
+    answers, _ = await store.aread(request.user.id, snapshot)
+    answers.update(_posted_answers(request))
+
+    complete, error = _check_submission(snapshot, answers)
+    if not complete:
+        await store.aupdate(request.user.id, snapshot, answers, flush=True)
+        if error:
+            messages.error(request, error)
+        return redirect('mbti:test')
+
+    code, dims, confidence = score_answers(snapshot.key, answers)
+    await sync_to_async(_save_submission)(request.user, snapshot, answers, code, dims, confidence)
+
+    messages.success(request, '提交成功，以下是你的测试结果')
+    return redirect('mbti:result')
+
+
+async def _load_result(request):
+    """预先载入 _current_result/_current_profile 的数据，条件请求的校验函数与渲染不再访问数据库。"""
+    result = await Result.objects.filter(user=request.user).afirst()
+    request._mbti_result = result
+    request._mbti_profile = await aget_profile(result.type_code) if result else None
+    return result
+
+
+@_async_login_required
+async def result_async_view(request):
+    await _load_result(request)
+    return await _result_page(request)
+
+
+@condition(etag_func=_result_page_etag)
+async def _result_page(request):
+    return _render_result_page(request)
+
+
+@_async_login_required
+@profile_view('result_pdf')
+async def result_pdf_async_view(request):
+    result = await _load_result(request)
+    report = None
+    if result:
+        response_count = await aanswered_count(request.user.id)
+        report = _build_report(result, request._mbti_profile, request.user.username, response_count)
+    request._mbti_report = report
+    return await _result_pdf(request)
+
+
+@condition(etag_func=_report_etag)
+async def _result_pdf(request):
+    report = _report_inputs(request)
+    if report is None:
+        return redirect('mbti:test')
+    result, profile, username, response_count, cache_key = report
+
+    store = get_pdf_store()
+    pdf = await sync_to_async(store.get, thread_sensitive=False)(cache_key) if store else None
+    metrics.PDF_CACHE.inc(result='hit' if pdf is not None else 'miss')
+    queue = get_job_queue()
+    if pdf is None and queue is not None:
+        return _enqueue_pdf(request, queue, cache_key, result, profile, username, response_count)
+    if pdf is None:
+        # 渲染是 CPU 密集的，交给有界线程池，事件循环继续处理其他请求
+        try:
+            pdf = await get_render_pool().render(
+                profile_worker(render_result_pdf), result, profile, username, response_count
+            )
+        except QueueFull:
+            return _pdf_busy(request)
+        except ImportError:
+            return _pdf_unavailable(request)
+        if store:
+            await sync_to_async(store.set, thread_sensitive=False)(cache_key, pdf)
+    return _pdf_response(pdf, result, username)
+
+
+@staff_member_required
+def metrics_view(request):
+    """Prometheus 文本格式的进程内指标，仅管理员可见。"""
+    return HttpResponse(metrics.REGISTRY.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@staff_member_required
+def export_view(request, kind):
+    """
+    流式导出作答/结果数据，仅管理员可用。
+
+    查询参数：format=csv|jsonl、gzip=1、questionnaire=<id或key>、since/until=YYYY-MM-DD。
+    """
+    fmt = request.GET.get('format', 'csv')
+    if kind not in EXPORT_KINDS or fmt not in FORMATS:
+        return JsonResponse({'status': 'error', 'message': 'Unknown export'}, status=404)
+    try:
+        filters = build_filters(request.GET.get('questionnaire'), request.GET.get('since'), request.GET.get('until'))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        stream_export(kind, fmt, compress, filters),
+        content_type='application/gzip' if compress else CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, compress)}"'
+    return response
+
+
+@staff_member_required
+def stats_view(request):
+    """结果统计看板：只读物化统计表，页面开销与测试人数无关。"""
+    questionnaire_id = request.GET.get('questionnaire')
+    questionnaire_id = int(questionnaire_id) if questionnaire_id and questionnaire_id.isdigit() else None
+    context = dashboard(questionnaire_id)
+    context.update({
+        'questionnaires': Questionnaire.objects.order_by('id').values_list('id', 'name'),
+        'questionnaire_id': questionnaire_id,
+        'dimension_names': DIMENSIONS,
+    })
+    return render(request, 'mbti/stats.html', context)
@@ -21,6 +21,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # 放在会话中间件之外，统计到的 SQL 包含会话读写
+    "mbti.middleware.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -48,6 +50,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "mbti_site.wsgi.application"
+ASGI_APPLICATION = "mbti_site.asgi.application"
 
 DATABASES = {
     "default": {
@@ -56,6 +59,19 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # 问卷快照与类型档案的失效代号（见 mbti/snapshot.py）：必须对所有进程可见——Web worker 之间、
+    # 以及 import_questions / sync_type_profiles 等管理命令与 Web 进程之间。
+    # 单机部署使用文件缓存即可；多机部署请改为 Redis/Memcached 等共享缓存
+    "mbti_generations": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("MBTI_GENERATION_CACHE_DIR", str(BASE_DIR / "var" / "generations")),
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -77,9 +93,58 @@ LOGIN_URL = "users:login"
 LOGIN_REDIRECT_URL = "mbti:home"
 LOGOUT_REDIRECT_URL = "users:login"
 
-# PDF font path to avoid Chinese garbled text
+# PDF font path to avoid Chinese garbled text（优先于内置候选路径，见 mbti/fonts.py）
 PDF_FONT_PATH = os.getenv("PDF_FONT_PATH", r"C:\\Windows\\Fonts\\msyh.ttf")
 
+# PDF 报告缓存（按内容寻址，LRU 按容量淘汰）；设为 None 可关闭
+MBTI_PDF_CACHE = {
+    "BACKEND": "mbti.pdf_cache.FileSystemPdfStore",
+    "LOCATION": BASE_DIR / "var" / "pdf_cache",
+    "MAX_BYTES": 256 * 1024 * 1024,
+}
+
+# PDF 后台渲染（可选）：开启后报告在进程内线程池中生成，前端轮询任务状态；需同时启用 MBTI_PDF_CACHE
+MBTI_PDF_ASYNC = {
+    "ENABLED": os.getenv("MBTI_PDF_ASYNC", "0") == "1",
+    "WORKERS": 2,
+    "MAX_PENDING": 16,
+}
+
+# 作答进度存储：自动保存只修改内存中的答卷向量，最多每 FLUSH_INTERVAL 秒（或翻页时）写一次数据库
+MBTI_PROGRESS = {
+    "FLUSH_INTERVAL": 5.0,
+    "MAX_ENTRIES": 10000,
+}
+
+# 自适应测试（提前停止）：维度至少作答 MIN_ITEMS 题且平均得分强度（同结果置信度，0..1）达到 THRESHOLD 后不再出该维度的题
+MBTI_ADAPTIVE = {
+    "ENABLED": os.getenv("MBTI_ADAPTIVE", "0") == "1",
+    "MIN_ITEMS": int(os.getenv("MBTI_ADAPTIVE_MIN_ITEMS", "8")),
+    "THRESHOLD": float(os.getenv("MBTI_ADAPTIVE_THRESHOLD", "0.35")),
+}
+
+# 客户端渲染测试页：一次加载整份题目 JSON（带版本号的 URL 长期缓存），翻页不再请求服务器；自适应模式开启时不生效
+MBTI_TEST_CLIENT_RENDERED = os.getenv("MBTI_TEST_CLIENT_RENDERED", "0") == "1"
+
+# 异步视图：以 ASGI 部署（mbti_site/asgi.py）时开启，自动保存、提交、结果页与 PDF 导出改用异步视图；
+# 同步渲染 PDF 时交给最多 PDF_WORKERS 个线程，正在渲染与排队的请求达到 PDF_MAX_PENDING 后提示稍后再试
+MBTI_ASYNC_VIEWS = {
+    "ENABLED": os.getenv("MBTI_ASYNC_VIEWS", "0") == "1",
+    "PDF_WORKERS": 2,
+    "PDF_MAX_PENDING": 16,
+}
+
+# 采样式性能剖析（submit / result_pdf 视图）：按比例抽样请求，管理员可用 ?profile=1 强制剖析
+MBTI_PROFILING = {
+    "ENABLED": os.getenv("MBTI_PROFILING", "0") == "1",
+    "SAMPLE_RATE": float(os.getenv("MBTI_PROFILING_SAMPLE_RATE", "0.01")),
+    "INTERVAL": 0.005,  # 栈采样间隔（秒）
+    "DIR": BASE_DIR / "var" / "profiles",
+}
+
+# 日志目录不纳入版本库，首次启动时创建
+os.makedirs(BASE_DIR / "logs", exist_ok=True)
+
 # 日志配置（参考 django-auth-system），过滤开发环境下的 /@vite/client 噪音
 LOGGING = {
     'version': 1,
@@ -1,288 +1,23 @@
 #!/usr/bin/env python
+"""
+兼容旧入口：等价于 ``python manage.py sync_type_profiles [参数]``。
+
+16 种人格类型资料已移至版本化的数据文件 data/type_profiles.json，
+同步时按内容摘要跳过未变化的档案，只批量更新有变化的字段。
+"""
 import os
-import django
+import sys
 
-# 设置Django环境
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mbti_site.settings')
-django.setup()
 
-from mbti.models import TypeProfile
 
-# 详细的16种人格类型数据
-personality_data = {
-    'INTJ': {
-        'name': '建筑师',
-        'description': '富有想象力和战略性的思想家，一切皆在计划之中。',
-        'strengths': '独立思考、战略规划、创新能力强、目标导向、逻辑分析能力出色',
-        'growth': '学会更好地与他人合作，提高情感表达能力，保持开放心态接受反馈',
-        'personality_traits': '内向、直觉、理性、判断型。喜欢独处思考，善于看到事物的整体图景和未来可能性。重视效率和能力，对自己和他人都有很高的标准。',
-        'work_style': '偏好独立工作，喜欢有挑战性的项目。善于制定长期战略和系统性解决方案。注重质量胜过数量，追求完美和创新。',
-        'interpersonal_relations': '朋友圈较小但关系深厚。在社交场合可能显得冷漠，但对亲近的人非常忠诚。更愿意通过行动而非言语表达关心。',
-        'emotional_expression': '情感表达较为内敛，不善于表达内心感受。更倾向于通过理性分析处理情感问题，有时会忽视他人的情感需求。',
-        'decision_making': '基于逻辑分析和长远考虑做决策。会收集充分信息，权衡利弊后做出理性选择。不易受情绪影响，但可能忽视人际因素。',
-        'stress_management': '通过独处和深度思考来缓解压力。喜欢制定详细计划来应对挑战。压力过大时可能变得更加孤僻和完美主义。',
-        'learning_style': '偏好自主学习和深度研究。喜欢理论性强的内容，善于从抽象概念中提取规律。更愿意通过阅读和思考而非讨论来学习。',
-        'career_suggestions': '适合科研、工程、管理咨询、软件开发、建筑设计、投资分析等需要战略思维和独立工作的职业。',
-        'life_philosophy': '相信通过理性思考和系统规划可以改善世界。追求个人成长和知识积累，重视效率和成果。',
-        'communication_style': '直接、简洁、重点突出。更愿意讨论想法和概念而非日常琐事。在熟悉的领域表达自信，但在情感交流方面可能显得生硬。'
-    },
-    'INTP': {
-        'name': '逻辑学家',
-        'description': '具有创新精神的发明家，对知识有着不可抑制的渴望。',
-        'strengths': '逻辑思维强、创新能力突出、学习能力强、适应性好、客观公正',
-        'growth': '提高执行力和时间管理能力，加强与他人的情感连接，学会坚持完成项目',
-        'personality_traits': '内向、直觉、理性、感知型。好奇心强，喜欢探索新想法和理论。重视逻辑一致性，对不合理的事物会提出质疑。',
-        'work_style': '喜欢灵活的工作环境，不喜欢严格的规章制度。善于发现问题和提出创新解决方案。工作节奏不规律，但在感兴趣的项目上会全身投入。',
-        'interpersonal_relations': '社交圈较小，更喜欢与志同道合的人深入交流。在群体中可能显得安静，但在讨论感兴趣的话题时会变得活跃。',
-        'emotional_expression': '情感表达相对克制，更习惯通过理性分析处理情感。对他人的情感需求敏感度较低，但一旦意识到会努力回应。',
-        'decision_making': '基于逻辑分析和客观事实做决策。喜欢探索多种可能性，有时会因为过度分析而延迟决策。重视决策的合理性胜过效率。',
-        'stress_management': '通过独处和思考来处理压力。喜欢从不同角度分析问题，寻找创新解决方案。压力过大时可能会逃避或拖延。',
-        'learning_style': '偏好探索式学习，喜欢自己发现规律和联系。对理论和抽象概念有很强的理解能力。学习兴趣广泛但可能不够深入。',
-        'career_suggestions': '适合研究、软件开发、数据分析、学术工作、咨询、创意设计等需要创新思维和独立思考的职业。',
-        'life_philosophy': '追求真理和知识，相信理性思考的力量。重视个人自由和独立性，不喜欢被束缚或限制。',
-        'communication_style': '逻辑清晰、善于分析。喜欢讨论抽象概念和理论问题。表达方式可能较为学术化，有时会忽视听众的理解程度。'
-    },
-    'ENTJ': {
-        'name': '指挥官',
-        'description': '大胆、富有想象力、意志强烈的领导者，总能找到或创造解决方法。',
-        'strengths': '领导能力强、目标导向、决策果断、组织能力出色、善于激励他人',
-        'growth': '学会倾听他人意见，提高耐心和同理心，避免过于强势和控制欲过强',
-        'personality_traits': '外向、直觉、理性、判断型。天生的领导者，善于看到大局和长远目标。自信、果断，喜欢挑战和竞争。',
-        'work_style': '喜欢领导团队，善于制定战略和推动执行。工作效率高，目标导向强。偏好有挑战性和成长空间的工作环境。',
-        'interpersonal_relations': '社交能力强，善于建立广泛的人际网络。在团队中通常扮演领导角色。重视能力和成果，对无能的人可能缺乏耐心。',
-        'emotional_expression': '情感表达较为直接，不喜欢拐弯抹角。更关注目标和结果，有时会忽视他人的情感需求。在压力下可能显得强势。',
-        'decision_making': '决策迅速果断，基于逻辑分析和战略考虑。善于在不确定性中做出决策。有时可能因为过于自信而忽视风险。',
-        'stress_management': '通过行动和解决问题来缓解压力。喜欢挑战，将压力转化为动力。压力过大时可能变得更加强势和不耐烦。',
-        'learning_style': '偏好实用性强的学习内容。善于从经验中学习，喜欢通过实践来掌握知识。学习目标明确，效率较高。',
-        'career_suggestions': '适合企业管理、创业、销售、法律、政治、投资银行等需要领导力和战略思维的职业。',
-        'life_philosophy': '相信通过努力和正确的策略可以实现任何目标。重视成功和成就，追求个人和职业发展。',
-        'communication_style': '直接、有说服力、目标导向。善于激励和影响他人。表达自信有力，但有时可能显得过于强势。'
-    },
-    'ENTP': {
-        'name': '辩论家',
-        'description': '聪明好奇的思想家，不会拒绝任何智力上的挑战。',
-        'strengths': '创新思维、适应能力强、沟通能力出色、学习能力强、善于激发他人',
-        'growth': '提高专注力和执行力，学会坚持完成项目，加强细节管理能力',
-        'personality_traits': '外向、直觉、理性、感知型。充满好奇心和创造力，喜欢探索新想法。善于辩论和挑战传统观念，思维敏捷。',
-        'work_style': '喜欢多样化和有挑战性的工作。善于头脑风暴和创新，但可能在执行细节上有所欠缺。工作节奏灵活，不喜欢单调重复的任务。',
-        'interpersonal_relations': '社交能力强，善于与各种类型的人交流。在团队中通常是创意的源泉。喜欢智力上的交锋，有时可能显得争强好胜。',
-        'emotional_expression': '情感表达相对开放，但更关注理性层面的交流。对他人的情感需求有一定敏感度，但可能不够深入。',
-        'decision_making': '喜欢探索多种可能性，决策过程较为开放和灵活。有时会因为看到太多选择而难以做出最终决定。',
-        'stress_management': '通过与他人交流和探索新想法来缓解压力。喜欢从不同角度看待问题。压力过大时可能变得散漫或逃避。',
-        'learning_style': '偏好互动式学习，喜欢讨论和辩论。学习兴趣广泛，善于快速掌握新概念。可能在深度学习方面有所不足。',
-        'career_suggestions': '适合创业、市场营销、咨询、媒体、教育、研发等需要创新思维和沟通能力的职业。',
-        'life_philosophy': '相信创新和变化的力量，追求智力上的刺激和成长。重视自由和可能性，不喜欢被限制。',
-        'communication_style': '生动有趣、富有感染力。善于用类比和故事来表达观点。喜欢辩论和智力交锋，有时可能显得过于好辩。'
-    },
-    'INFJ': {
-        'name': '提倡者',
-        'description': '安静而神秘，同时鼓舞人心且不知疲倦的理想主义者。',
-        'strengths': '洞察力强、同理心强、创造力丰富、价值观坚定、善于启发他人',
-        'growth': '学会设定界限，避免过度承担他人情感，提高现实感和实用性',
-        'personality_traits': '内向、直觉、情感、判断型。具有强烈的理想主义色彩，关心他人福祉。内心世界丰富，善于洞察他人的动机和情感。',
-        'work_style': '偏好有意义和价值的工作，不仅仅追求物质回报。工作认真负责，注重质量。喜欢独立工作，但也重视团队和谐。',
-        'interpersonal_relations': '朋友不多但关系深厚。善于理解和支持他人，经常成为朋友的倾诉对象。在人际关系中投入很多情感，有时会感到疲惫。',
-        'emotional_expression': '情感丰富但表达相对内敛。对他人的情感需求非常敏感，善于提供情感支持。有时会为了维护和谐而压抑自己的需求。',
-        'decision_making': '基于价值观和对他人影响的考虑做决策。会综合考虑各方面因素，特别关注决策的道德和情感层面。',
-        'stress_management': '通过独处和反思来处理压力。需要安静的环境来恢复能量。压力过大时可能变得过度敏感或退缩。',
-        'learning_style': '偏好有意义和相关性的学习内容。善于理解抽象概念和人文知识。学习动机与个人价值观密切相关。',
-        'career_suggestions': '适合心理咨询、教育、社会工作、写作、艺术、非营利组织等能够帮助他人和体现价值的职业。',
-        'life_philosophy': '相信每个人都有独特的价值和潜力。追求个人成长和精神满足，希望为世界带来积极改变。',
-        'communication_style': '温和、体贴、善于倾听。表达深思熟虑，注重言语的影响。在熟悉的人面前更加开放和真诚。'
-    },
-    'INFP': {
-        'name': '调停者',
-        'description': '诗意、善良、利他主义，总是热切地寻求帮助好的事业。',
-        'strengths': '创造力强、价值观坚定、适应性好、同理心强、真诚善良',
-        'growth': '提高自信心和表达能力，学会处理冲突，加强目标设定和执行力',
-        'personality_traits': '内向、直觉、情感、感知型。具有强烈的个人价值观，追求真实和和谐。创造力丰富，对美和艺术有很高的敏感度。',
-        'work_style': '偏好灵活和自主的工作环境。工作必须与个人价值观一致才能全身投入。创造力强，但可能在结构化任务上有困难。',
-        'interpersonal_relations': '重视深度和真诚的关系。对朋友非常忠诚和支持。在群体中可能显得安静，但与亲近的人会分享内心世界。',
-        'emotional_expression': '情感丰富且真诚，但表达可能较为含蓄。对他人的情感变化很敏感。有时会因为过度共情而承担他人的情感负担。',
-        'decision_making': '主要基于个人价值观和情感考虑做决策。会花时间思考决策的意义和影响。有时会因为过度考虑而延迟决策。',
-        'stress_management': '通过创造性活动和独处来缓解压力。需要时间来处理情感和恢复能量。压力过大时可能变得过度敏感或逃避。',
-        'learning_style': '偏好个性化和有意义的学习体验。善于通过故事和个人经历来理解概念。学习动机与兴趣和价值观密切相关。',
-        'career_suggestions': '适合写作、艺术、心理咨询、教育、社会工作、非营利组织等能够表达创造力和帮助他人的职业。',
-        'life_philosophy': '追求真实和意义，相信每个人都应该按照自己的价值观生活。重视个人成长和精神追求胜过物质成功。',
-        'communication_style': '温和、真诚、富有同理心。更愿意倾听而非主导对话。表达方式可能较为间接，注重维护和谐氛围。'
-    },
-    'ENFJ': {
-        'name': '主人公',
-        'description': '富有魅力、鼓舞人心的领导者，有能力让听众全神贯注。',
-        'strengths': '领导能力强、同理心强、沟通能力出色、善于激励他人、组织能力好',
-        'growth': '学会关注自己的需求，避免过度付出，提高客观分析能力',
-        'personality_traits': '外向、直觉、情感、判断型。天生的领导者和导师，关心他人的成长和发展。具有强烈的使命感和责任感。',
-        'work_style': '喜欢与人合作，善于激励和指导团队成员。工作热情高，目标导向强。偏好有社会意义和能够帮助他人的工作。',
-        'interpersonal_relations': '社交能力强，善于建立和维护人际关系。在团队中通常扮演协调者和激励者的角色。对他人的需求非常敏感。',
-        'emotional_expression': '情感表达开放和真诚。善于理解和回应他人的情感需求。有时会为了他人的幸福而忽视自己的感受。',
-        'decision_making': '综合考虑逻辑和情感因素，特别关注决策对他人的影响。善于在团队中建立共识。有时可能过于关注人际和谐。',
-        'stress_management': '通过与他人交流和帮助他人来缓解压力。需要得到他人的认可和支持。压力过大时可能变得过度关注他人反应。',
-        'learning_style': '偏好互动式和合作式学习。善于从他人经验中学习。学习动机与帮助他人和实现价值密切相关。',
-        'career_suggestions': '适合教育、管理、人力资源、咨询、社会工作、政治等需要领导力和人际技能的职业。',
-        'life_philosophy': '相信每个人都有潜力实现自己的目标。追求个人成长和帮助他人成长，希望为社会做出积极贡献。',
-        'communication_style': '热情、鼓舞人心、善于倾听。能够激发他人的潜力和动机。表达方式温暖而有说服力。'
-    },
-    'ENFP': {
-        'name': '竞选者',
-        'description': '热情、有创造力、社交能力强，总是能找到微笑的理由。',
-        'strengths': '创造力强、热情洋溢、适应能力强、沟通能力出色、善于激发他人',
-        'growth': '提高专注力和执行力，学会管理时间和优先级，加强细节关注能力',
-        'personality_traits': '外向、直觉、情感、感知型。充满热情和创造力，善于发现生活中的可能性。对人和想法都很感兴趣，具有感染力。',
-        'work_style': '喜欢多样化和有创意的工作。善于与人合作，能够激发团队的创造力。工作节奏灵活，不喜欢过于结构化的环境。',
-        'interpersonal_relations': '社交能力强，朋友众多。善于理解和支持他人，经常成为团队的精神支柱。喜欢与不同类型的人交流。',
-        'emotional_expression': '情感表达开放和热情。对他人的情感需求很敏感，善于提供情感支持。有时会因为过度投入而情感波动较大。',
-        'decision_making': '主要基于价值观和对他人影响的考虑。喜欢探索多种可能性，有时会因为选择太多而难以决定。',
-        'stress_management': '通过与他人交流和从事创造性活动来缓解压力。需要积极的反馈和支持。压力过大时可能变得散漫或情绪化。',
-        'learning_style': '偏好互动式和体验式学习。善于通过讨论和实践来掌握知识。学习兴趣广泛，但可能缺乏深度。',
-        'career_suggestions': '适合市场营销、公关、教育、咨询、艺术、媒体等需要创造力和人际技能的职业。',
-        'life_philosophy': '相信生活充满可能性和机会。追求个人成长和帮助他人实现潜力，重视关系和体验胜过物质成功。',
-        'communication_style': '热情、生动、富有感染力。善于用故事和比喻来表达观点。能够激发他人的兴趣和热情。'
-    },
-    'ISTJ': {
-        'name': '物流师',
-        'description': '实用主义的逻辑学家，可靠性无人能及。',
-        'strengths': '责任心强、组织能力好、可靠稳定、注重细节、执行力强',
-        'growth': '提高灵活性和适应能力，学会接受变化，加强创新思维',
-        'personality_traits': '内向、感觉、理性、判断型。务实可靠，重视传统和稳定。做事有条理，注重细节和准确性。责任心强，值得信赖。',
-        'work_style': '偏好结构化和有序的工作环境。工作认真负责，注重质量和准确性。善于制定和执行详细计划，但可能对变化适应较慢。',
-        'interpersonal_relations': '朋友圈相对固定，重视长期稳定的关系。在团队中通常是可靠的执行者。可能在表达情感方面较为保守。',
-        'emotional_expression': '情感表达相对内敛和稳定。更倾向于通过行动而非言语表达关心。在处理情感问题时偏好实用的解决方案。',
-        'decision_making': '基于事实和经验做决策。喜欢有充分信息和时间来考虑。决策过程谨慎，重视风险控制。',
-        'stress_management': '通过制定计划和按部就班地解决问题来管理压力。需要稳定和可预测的环境。压力过大时可能变得更加固执。',
-        'learning_style': '偏好结构化和循序渐进的学习方式。善于记忆和应用具体知识。学习目标明确，注重实用性。',
-        'career_suggestions': '适合会计、行政管理、工程、法律、医疗、银行等需要精确性和可靠性的职业。',
-        'life_philosophy': '相信通过努力工作和遵守规则可以实现稳定和成功。重视责任和义务，追求安全感和稳定性。',
-        'communication_style': '直接、准确、重点突出。更愿意讨论具体事实而非抽象概念。表达方式可能较为正式和保守。'
-    },
-    'ISFJ': {
-        'name': '守护者',
-        'description': '非常专注、温暖的守护者，时刻准备保护爱着的人们。',
-        'strengths': '同理心强、责任心强、细心体贴、忠诚可靠、善于支持他人',
-        'growth': '学会表达自己的需求，提高自信心，避免过度自我牺牲',
-        'personality_traits': '内向、感觉、情感、判断型。温暖体贴，关心他人福祉。具有强烈的服务精神和责任感。注重和谐，避免冲突。',
-        'work_style': '偏好稳定和支持性的工作环境。工作认真负责，特别关注他人的需求。善于处理细节工作，但可能缺乏自我推销能力。',
-        'interpersonal_relations': '重视和谐的人际关系，善于照顾他人。在团队中通常扮演支持者的角色。对朋友非常忠诚，但可能忽视自己的需求。',
-        'emotional_expression': '情感表达温暖而真诚。对他人的情感需求非常敏感，善于提供情感支持。有时会为了维护和谐而压抑自己的感受。',
-        'decision_making': '主要考虑决策对他人的影响。会征求他人意见，寻求共识。有时可能因为过度考虑他人感受而延迟决策。',
-        'stress_management': '通过帮助他人和维护和谐来缓解压力。需要得到他人的认可和感谢。压力过大时可能变得过度敏感或自我怀疑。',
-        'learning_style': '偏好合作式和支持性的学习环境。善于通过实践和服务他人来学习。学习动机与帮助他人密切相关。',
-        'career_suggestions': '适合护理、教育、社会工作、人力资源、客户服务等能够帮助和支持他人的职业。',
-        'life_philosophy': '相信通过关心和帮助他人可以创造更美好的世界。重视关系和和谐，追求稳定和安全感。',
-        'communication_style': '温和、体贴、善于倾听。更愿意支持他人而非主导对话。表达方式谦逊，注重他人感受。'
-    },
-    'ESTJ': {
-        'name': '总经理',
-        'description': '出色的管理者，在管理事物或人员方面无与伦比。',
-        'strengths': '组织能力强、领导能力好、执行力强、目标导向、决策果断',
-        'growth': '提高灵活性和同理心，学会倾听不同意见，避免过于强势',
-        'personality_traits': '外向、感觉、理性、判断型。天生的组织者和领导者，善于制定和执行计划。重视效率和结果，具有强烈的责任感。',
-        'work_style': '喜欢结构化和目标导向的工作环境。善于组织资源和人员，推动项目执行。工作效率高，注重结果和绩效。',
-        'interpersonal_relations': '社交能力强，善于建立工作关系。在团队中通常扮演领导者角色。重视能力和贡献，对无效率的行为缺乏耐心。',
-        'emotional_expression': '情感表达较为直接和实用。更关注解决问题而非情感交流。在工作中可能显得强势，但对家人朋友很关心。',
-        'decision_making': '基于事实和逻辑做决策，决策迅速果断。善于权衡利弊，注重实用性和效率。有时可能忽视他人的情感需求。',
-        'stress_management': '通过制定计划和采取行动来管理压力。喜欢控制局面，解决问题。压力过大时可能变得更加强势和不耐烦。',
-        'learning_style': '偏好实用性强的学习内容。善于通过实践和应用来学习。学习目标明确，注重效率和结果。',
-        'career_suggestions': '适合企业管理、项目管理、销售、法律、金融、政府管理等需要组织和领导能力的职业。',
-        'life_philosophy': '相信通过努力工作和有效管理可以实现成功。重视成就和地位，追求稳定和安全。',
-        'communication_style': '直接、有条理、目标导向。善于指导和激励他人。表达方式可能较为权威，注重效率和结果。'
-    },
-    'ESFJ': {
-        'name': '执政官',
-        'description': '极有同情心、受欢迎、总是热心帮助他人。',
-        'strengths': '同理心强、组织能力好、责任心强、善于合作、关心他人',
-        'growth': '学会处理冲突，提高客观分析能力，避免过度取悦他人',
-        'personality_traits': '外向、感觉、情感、判断型。温暖友善，关心他人福祉。具有强烈的服务精神，善于营造和谐氛围。重视传统和稳定。',
-        'work_style': '偏好合作和支持性的工作环境。善于组织团队活动，关注团队成员的需求。工作认真负责，但可能过于关注他人反应。',
-        'interpersonal_relations': '社交能力强，朋友众多。善于维护和谐的人际关系，经常成为团队的粘合剂。对他人的需求非常敏感。',
-        'emotional_expression': '情感表达开放和温暖。善于理解和回应他人的情感需求。有时会为了维护和谐而压抑自己的真实感受。',
-        'decision_making': '主要考虑决策对他人和团队的影响。会征求多方意见，寻求共识。有时可能因为过度考虑他人感受而难以做出决定。',
-        'stress_management': '通过与他人交流和获得支持来缓解压力。需要和谐的环境和积极的反馈。压力过大时可能变得过度敏感或自我怀疑。',
-        'learning_style': '偏好合作式和互动式学习。善于通过讨论和分享来学习。学习动机与帮助他人和获得认可密切相关。',
-        'career_suggestions': '适合教育、人力资源、客户服务、医疗保健、社会工作等需要人际技能和服务精神的职业。',
-        'life_philosophy': '相信通过关心和帮助他人可以创造更美好的世界。重视关系和和谐，追求稳定和归属感。',
-        'communication_style': '温暖、友善、善于倾听。能够营造轻松愉快的氛围。表达方式体贴，注重他人感受和反应。'
-    },
-    'ISTP': {
-        'name': '鉴赏家',
-        'description': '大胆而实际的实验家，擅长使用各种工具。',
-        'strengths': '动手能力强、适应性好、冷静理性、独立自主、解决问题能力强',
-        'growth': '提高沟通和表达能力，学会长期规划，加强团队合作意识',
-        'personality_traits': '内向、感觉、理性、感知型。实用主义者，善于用手解决问题。冷静客观，适应性强。喜欢独立工作，不喜欢被束缚。',
-        'work_style': '偏好灵活和自主的工作环境。善于处理技术性和实际性问题。工作节奏不规律，但在紧急情况下表现出色。',
-        'interpersonal_relations': '朋友不多但关系真诚。在团队中可能显得安静，但在需要技术支持时会主动帮助。更愿意通过行动而非言语表达关心。',
-        'emotional_expression': '情感表达相对内敛。更习惯通过实际行动表达关心。在处理情感问题时偏好实用的解决方案。',
-        'decision_making': '基于逻辑分析和实际考虑做决策。善于在压力下快速做出实用的决定。不喜欢长期规划，更关注当下的问题。',
-        'stress_management': '通过独处和从事实际活动来缓解压力。喜欢用手工作或运动来放松。压力过大时可能变得更加孤僻。',
-        'learning_style': '偏好实践式和体验式学习。善于通过动手操作来掌握技能。学习内容必须有实用价值才能保持兴趣。',
-        'career_suggestions': '适合工程、技术、机械、建筑、运动、军事等需要实际操作技能的职业。',
-        'life_philosophy': '相信实践胜过理论，重视个人自由和独立性。追求技能的完善和问题的解决。',
-        'communication_style': '简洁、直接、重点突出。更愿意讨论具体问题而非抽象概念。表达方式可能较为简短，但内容实用。'
-    },
-    'ISFP': {
-        'name': '探险家',
-        'description': '灵活、迷人的艺术家，时刻准备探索新的可能性。',
-        'strengths': '创造力强、适应性好、同理心强、真诚善良、审美能力强',
-        'growth': '提高自信心和表达能力，学会处理冲突，加强目标设定能力',
-        'personality_traits': '内向、感觉、情感、感知型。温和友善，具有强烈的个人价值观。对美和艺术有很高的敏感度。喜欢和谐，避免冲突。',
-        'work_style': '偏好灵活和创造性的工作环境。工作必须与个人价值观一致。善于处理人际关系，但可能在竞争环境中感到不适。',
-        'interpersonal_relations': '重视真诚和深度的关系。对朋友非常忠诚和支持。在群体中可能显得安静，但与亲近的人会分享内心世界。',
-        'emotional_expression': '情感丰富且真诚，但表达可能较为含蓄。对他人的情感变化很敏感。有时会因为避免冲突而不表达真实想法。',
-        'decision_making': '主要基于个人价值观和情感考虑做决策。会考虑决策对他人的影响。有时会因为过度考虑而延迟决策。',
-        'stress_management': '通过创造性活动和独处来缓解压力。需要美好和和谐的环境。压力过大时可能变得过度敏感或退缩。',
-        'learning_style': '偏好个性化和体验式学习。善于通过实践和感受来理解概念。学习动机与兴趣和价值观密切相关。',
-        'career_suggestions': '适合艺术、设计、心理咨询、教育、社会工作、医疗保健等能够表达创造力和帮助他人的职业。',
-        'life_philosophy': '追求真实和美好，相信每个人都应该按照自己的价值观生活。重视个人成长和精神追求。',
-        'communication_style': '温和、真诚、富有同理心。更愿意倾听而非主导对话。表达方式可能较为艺术化，注重情感色彩。'
-    },
-    'ESTP': {
-        'name': '企业家',
-        'description': '聪明、精力充沛、善于感知的企业家，真正享受生活在边缘的感觉。',
-        'strengths': '适应能力强、行动力强、沟通能力好、现实感强、善于应变',
-        'growth': '提高长期规划能力，学会深度思考，加强耐心和坚持性',
-        'personality_traits': '外向、感觉、理性、感知型。精力充沛，喜欢行动和冒险。善于适应变化，关注当下的机会。实用主义者，重视结果。',
-        'work_style': '喜欢动态和有挑战性的工作环境。善于处理紧急情况和危机。工作节奏快，但可能缺乏长期规划。',
-        'interpersonal_relations': '社交能力强，善于与各种类型的人交流。在团队中通常是活跃的参与者。喜欢竞争和挑战。',
-        'emotional_expression': '情感表达直接和开放。更关注行动而非深度的情感交流。在处理情感问题时偏好实用的解决方案。',
-        'decision_making': '基于当前情况和实际考虑快速做决策。善于在压力下做出实用的选择。可能缺乏长期考虑。',
-        'stress_management': '通过行动和社交来缓解压力。喜欢通过运动或娱乐活动来放松。压力过大时可能变得冲动或逃避。',
-        'learning_style': '偏好实践式和互动式学习。善于通过体验和实际操作来学习。学习内容必须有立即的应用价值。',
-        'career_suggestions': '适合销售、市场营销、体育、娱乐、紧急服务、创业等需要行动力和适应能力的职业。',
-        'life_philosophy': '相信抓住当下的机会，享受生活的乐趣。重视自由和灵活性，不喜欢被束缚。',
-        'communication_style': '生动、有趣、富有感染力。善于用故事和实例来表达观点。表达方式直接，注重实际效果。'
-    },
-    'ESFP': {
-        'name': '娱乐家',
-        'description': '自发的、精力充沛、热情的表演者，生活对他们来说从不无聊。',
-        'strengths': '热情洋溢、适应能力强、同理心强、创造力好、善于激励他人',
-        'growth': '提高专注力和执行力，学会长期规划，加强批判性思维能力',
-        'personality_traits': '外向、感觉、情感、感知型。热情友善，喜欢与人交往。对生活充满热情，善于发现乐趣。重视和谐，关心他人感受。',
-        'work_style': '偏好灵活和人际导向的工作环境。善于与人合作，能够营造积极的工作氛围。工作热情高，但可能缺乏长期专注。',
-        'interpersonal_relations': '社交能力强，朋友众多。善于理解和支持他人，经常成为团队的开心果。对他人的情感需求很敏感。',
-        'emotional_expression': '情感表达开放和热情。善于营造轻松愉快的氛围。有时会因为过度关注他人反应而忽视自己的需求。',
-        'decision_making': '主要基于价值观和对他人影响的考虑。会征求他人意见，重视团队和谐。有时可能因为过度考虑他人感受而延迟决策。',
-        'stress_management': '通过与他人交流和从事有趣的活动来缓解压力。需要积极的环境和支持。压力过大时可能变得情绪化或逃避。',
-        'learning_style': '偏好互动式和体验式学习。善于通过讨论和实践来学习。学习动机与兴趣和社交需求密切相关。',
-        'career_suggestions': '适合教育、娱乐、销售、客户服务、公关、艺术等需要人际技能和创造力的职业。',
-        'life_philosophy': '相信生活应该充满乐趣和意义。重视关系和体验，追求快乐和和谐。',
-        'communication_style': '热情、生动、富有感染力。善于用幽默和故事来表达观点。能够激发他人的兴趣和参与。'
-    }
-}
+def main():
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('sync_type_profiles', *sys.argv[1:])
 
-def populate_personality_data():
-    """填充人格类型的详细数据"""
-    for code, data in personality_data.items():
-        profile, created = TypeProfile.objects.get_or_create(
-            code=code,
-            defaults=data
-        )
-        if not created:
-            # 更新现有记录
-            for field, value in data.items():
-                setattr(profile, field, value)
-            profile.save()
-        
-        print(f"{'创建' if created else '更新'} {code} - {data['name']}")
 
 if __name__ == '__main__':
-    populate_personality_data()
-    print("人格类型数据填充完成！")
\ No newline at end of file
+    main()